@@ -1,7 +1,7 @@
 from functools import lru_cache
+from agents.executor import run_blocking
 from agents.task_generator.agent.create_agent import build_agent
 from agents.code_analyzer.tools.analyze_and_advise import analyze_and_advise_tool
-from agents.code_analyzer.tools.compare_task_and_solution_tool import compare_task_and_solution_tool
 
 
 # Singleton pattern to get the agent instance
@@ -13,11 +13,11 @@ def get_agent():
 agent = get_agent()
 
 
-def analyze_code(task_text: str, user_code: str, error_text: str):
+async def analyze_code(task_text: str, user_code: str, error_text: str):
     """
     Function to analyze user code and provide advice.
     """
-    result = analyze_and_advise_tool.invoke({
+    result = await run_blocking(analyze_and_advise_tool.invoke, {
         "task_text": task_text,
         "user_code": user_code,
         "error_text": error_text
@@ -28,12 +28,3 @@ def analyze_code(task_text: str, user_code: str, error_text: str):
     result = result["advice"]
 
     return result
-
-
-def compare_task_and_solution(task_text: str, solution_code: str) -> bool:
-    result = compare_task_and_solution_tool.invoke({
-        "task_text": task_text,
-        "solution_code": solution_code
-    })
-
-    return result
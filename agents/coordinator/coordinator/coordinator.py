@@ -15,6 +15,7 @@ from agents.coordinator.middleware.context_manager import trim_and_summarize_con
 from agents.coordinator.middleware.logging_middleware import log_execution_and_save_memory_middleware
 
 from agents.coordinator.memory.manager import CoordinatorMemoryManager
+from agents.executor import on_agent_executor
 
 from agents.coordinator.coordinator.system_prompt import SYSTEM_PROMPT
 from logging_config import setup_logging
@@ -22,6 +23,19 @@ from config import Config
 
 logger = setup_logging()
 
+TOOLS = [
+    task_generator_tool,
+    code_checker_tool,
+    tutor_tool,
+    quiz_maker_tool,
+    stats_advisor_tool,
+]
+
+# The coordinator is awaited, so it awaits its tools too; without a coroutine a sync tool would run
+# on the event loop's default executor instead of the bounded agent executor
+for coordinator_tool in TOOLS:
+    coordinator_tool.coroutine = on_agent_executor(coordinator_tool.func)
+
 coordinator = create_agent(
     model=ChatDeepSeek(
         model="deepseek-chat",
@@ -30,13 +44,7 @@ coordinator = create_agent(
         max_tokens=4096,
         timeout=120,
     ),
-    tools=[
-        task_generator_tool,
-        code_checker_tool,
-        tutor_tool,
-        quiz_maker_tool,
-        stats_advisor_tool,
-    ],
+    tools=TOOLS,
     system_prompt=SYSTEM_PROMPT,
     middleware=[
         validate_and_enrich_input_middleware,
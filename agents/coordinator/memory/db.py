@@ -1,14 +1,13 @@
-from pymongo import MongoClient
 import logging
+from database.client import get_client
 
 logger = logging.getLogger(__name__)
 
-MONGO_URI = "mongodb://localhost:27017"
 MONGO_DB_NAME = "coordinator_memory"
 MONGO_COLLECTION_NAME = "sessions"
 
 try:
-    client = MongoClient(MONGO_URI)
+    client = get_client()
     db = client[MONGO_DB_NAME]
     memory_collection = db[MONGO_COLLECTION_NAME]
     logger.info("MongoDB подключена")
@@ -20,7 +20,7 @@ class CoordinatorMemoryManager:
                          metadata: Dict[str, Any] = None):
         """Saves an interaction to memory"""
 
-        if not self.memory_collection:
+        if self.memory_collection is None:
             logger.warning("⚠️ MongoDB недоступна, памяти не сохранены")
             return
 
@@ -43,7 +43,7 @@ class CoordinatorMemoryManager:
     def get_recent_context(self, limit: int = 5) -> List[Dict[str, Any]]:
         """Retrieves recent interactions from memory"""
 
-        if not self.memory_collection:
+        if self.memory_collection is None:
             return []
 
         try:
@@ -67,7 +67,7 @@ class CoordinatorMemoryManager:
     def get_agent_statistics(self) -> Dict[str, int]:
         """Retrieves statistics of agent interactions"""
 
-        if not self.memory_collection:
+        if self.memory_collection is None:
             return {}
 
         try:
@@ -0,0 +1,28 @@
+import asyncio
+import functools
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Awaitable, Callable
+from config import Config
+
+# Dedicated pool for blocking LLM calls (synchronous tools and chains), so a slow generation never blocks
+# the event loop and the number of concurrent generations is bounded by AGENT_MAX_WORKERS
+agent_executor = ThreadPoolExecutor(max_workers=Config.AGENT_MAX_WORKERS, thread_name_prefix="agent")
+
+
+async def run_blocking(func: Callable[..., Any], *args, **kwargs) -> Any:
+    """
+    Run a blocking function on the agent executor.
+    Calls beyond AGENT_MAX_WORKERS wait in the executor queue without blocking the event loop.
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(agent_executor, functools.partial(func, *args, **kwargs))
+
+
+def on_agent_executor(func: Callable[..., Any]) -> Callable[..., Awaitable[Any]]:
+    """
+    Async twin of a blocking function that runs it on the agent executor, e.g. as the coroutine of a LangChain tool.
+    """
+    @functools.wraps(func)
+    async def wrapper(*args, **kwargs) -> Any:
+        return await run_blocking(func, *args, **kwargs)
+    return wrapper
@@ -1,5 +1,6 @@
 import json
 from functools import lru_cache
+from agents.executor import run_blocking
 from agents.quiz_generator.agent.factory import build_agent
 from agents.quiz_generator.tools.create_blitz import create_blitz_quiz
 from agents.quiz_generator.tools.create_mini import create_mini_quiz
@@ -15,11 +16,11 @@ def get_agent():
 agent = get_agent()
 
 
-def blitz(topic: str):
+async def blitz(topic: str):
     """
     Generate a blitz quiz for a given C topic.
     """
-    result = create_blitz_quiz.invoke({
+    result = await run_blocking(create_blitz_quiz.invoke, {
         "topic": topic
     })
 
@@ -30,11 +31,11 @@ def blitz(topic: str):
     return result
 
 
-def mini(topic: str):
+async def mini(topic: str):
     """
     Generate a mini quiz for a given C topic.
     """
-    result = create_mini_quiz.invoke({
+    result = await run_blocking(create_mini_quiz.invoke, {
         "topic": topic
     })
 
@@ -45,11 +46,11 @@ def mini(topic: str):
     return result
 
 
-def full(topic: str):
+async def full(topic: str):
     """
     Generate a full quiz for a given C topic.
     """
-    result = create_full_quiz.invoke({
+    result = await run_blocking(create_full_quiz.invoke, {
         "topic": topic,
     })
 
@@ -1,4 +1,5 @@
 from functools import lru_cache
+from agents.executor import run_blocking
 from agents.stats_analyzer.agent.create_agent import build_agent
 from agents.stats_analyzer.tools.brief_summary import brief_summary_tool
 from agents.stats_analyzer.tools.detailed_summary import detailed_summary_tool
@@ -13,11 +14,11 @@ def get_agent():
 agent = get_agent()
 
 
-def brief_summary(user_data: str):
+async def brief_summary(user_data: str):
     """
     Function to get a brief summary of user statistics.
     """
-    result = brief_summary_tool.invoke({
+    result = await run_blocking(brief_summary_tool.invoke, {
         "user_data": user_data
     })
 
@@ -28,11 +29,11 @@ def brief_summary(user_data: str):
     return result
 
 
-def detailed_summary(user_data: str):
+async def detailed_summary(user_data: str):
     """
     Function to get a detailed summary of user statistics.
     """
-    result = detailed_summary_tool.invoke({
+    result = await run_blocking(detailed_summary_tool.invoke, {
         "user_data": user_data
     })
 
@@ -1,4 +1,7 @@
+import asyncio
 from functools import lru_cache
+from config import Config
+from agents.executor import run_blocking
 from agents.task_generator.agent.create_agent import build_agent
 from agents.task_generator.tools.generate_test_cases import generate_test_cases_tool
 from agents.task_generator.tools.generate_solution import generate_solution_tool
@@ -14,34 +17,49 @@ def get_agent():
 agent = get_agent()
 
 
-def generate_task_full(topic_id: str, difficulty: int):
-    # Generate full task package: task, test cases, solution
-    task_res = generate_task_tool.invoke({"topic_id": topic_id, "difficulty": difficulty})
+async def generate_task_full(topic_id: str, difficulty: int, timeout: float = Config.TASK_GENERATION_TIMEOUT):
+    """
+    Generate full task package: task, test cases, solution.
+    Test cases and solution depend only on the task text, so they are generated concurrently.
+    The whole pipeline is bounded by `timeout` seconds.
+    """
+    try:
+        return await asyncio.wait_for(_generate_task_full(topic_id, difficulty), timeout)
+    except asyncio.TimeoutError:
+        return {"success": False, "error": f"Генерация задания не уложилась в {timeout:g} с"}
+
+
+async def _generate_task_full(topic_id: str, difficulty: int):
+    task_res = await run_blocking(generate_task_tool.invoke, {"topic_id": topic_id, "difficulty": difficulty})
     if not task_res.get("success"):
         return {"success": False, "error": task_res.get("error")}
     task_text = task_res["task_text"]
 
-    test_result = generate_test_cases_tool.invoke({"task_text": task_text})
-    if not test_result.get("success"):
-        return {"success": False, "error": f"Ошибка генерации тестов: {test_result.get('error')}"}
-    test_cases = test_result["test_cases"]
-
-    solution_result = generate_solution_tool.invoke({"task_text": task_text})
-    if not solution_result.get("success"):
-        return {"success": False, "error": f"Ошибка генерации решения: {solution_result.get('error')}"}
-    solution_code = solution_result["solution_code"]
+    test_result, solution_result = await asyncio.gather(
+        run_blocking(generate_test_cases_tool.invoke, {"task_text": task_text}),
+        run_blocking(generate_solution_tool.invoke, {"task_text": task_text}),
+        return_exceptions=True
+    )
+    errors = []
+    for name, result in (("тестов", test_result), ("решения", solution_result)):
+        if isinstance(result, Exception):
+            errors.append(f"Ошибка генерации {name}: {result}")
+        elif not result.get("success"):
+            errors.append(f"Ошибка генерации {name}: {result.get('error')}")
+    if errors:
+        return {"success": False, "error": "; ".join(errors)}
 
     return {
         "success": True,
         "task_text": task_text,
-        "test_cases": test_cases,
-        "solution_code": solution_code
+        "test_cases": test_result["test_cases"],
+        "solution_code": solution_result["solution_code"]
     }
 
 
-def regenerate_task_solution(task_text: str):
+async def regenerate_task_solution(task_text: str):
     # Regenerate solution for an existing task
-    solution_result = generate_solution_tool.invoke({"task_text": task_text})
+    solution_result = await run_blocking(generate_solution_tool.invoke, {"task_text": task_text})
     if not solution_result.get("success"):
         return {"success": False, "error": f"Ошибка генерации решения: {solution_result.get('error')}"}
     solution_code = solution_result["solution_code"]
@@ -1,5 +1,6 @@
 from langchain_core.tools import tool
 from agents.task_generator.llm.model import llm
+from compiler.checkers import CHECKERS, DEFAULT_CHECKER
 import json
 import re
 
@@ -48,10 +49,16 @@ def generate_test_cases_tool(task_text: str) -> dict:
 
 Формат:
 [
-  {{"input":"...", "expected_output":"...", "description":"...", "type":"normal"}},
+  {{"input":"...", "expected_output":"...", "description":"...", "type":"normal", "checker":"exact"}},
   ...
 ]
 
+Поле "checker" задаёт способ сравнения вывода программы с expected_output:
+- "exact" — точное совпадение (по умолчанию);
+- "tokens" — совпадение слов и чисел без учёта пробелов и переносов строк;
+- "float" — числа с плавающей точкой сравниваются с погрешностью, укажи её в поле "tolerance" (например, 0.001);
+- "unordered" — строки вывода могут идти в любом порядке.
+
 Верни только JSON.
 """
 
@@ -64,6 +71,9 @@ def generate_test_cases_tool(task_text: str) -> dict:
             return {"success": False, "error": "LLM не вернул JSON"}
 
         cases = json.loads(match.group(1))
+        for case in cases:
+            if case.get("checker") not in CHECKERS:
+                case["checker"] = DEFAULT_CHECKER
         return {"success": True, "test_cases": cases}
 
     except Exception as ex:
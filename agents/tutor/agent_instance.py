@@ -5,12 +5,12 @@ from html import escape
 agent = create_c_agent()
 
 
-def answer_question(question: str, user_id: str):
+async def answer_question(question: str, user_id: str):
     """
     Answer a C programming question.
     """
     config = {"configurable": {"thread_id": user_id}}
-    response = agent.invoke(
+    response = await agent.ainvoke(
         {"messages": [HumanMessage(content=question)]},
         config=config
     )
@@ -1,6 +1,7 @@
 from config import Config
-from database.user_db import UserDB
-from database.task_db import TaskDB
+from database.user_db import AsyncUserDB
+from database.task_db import AsyncTaskDB
+from database.solution_db import AsyncSolutionDB
 from logging_config import setup_logging
 from telebot.async_telebot import AsyncTeleBot
 
@@ -11,8 +12,9 @@ from agents.stats_analyzer.agent_instance import brief_summary, detailed_summary
 logger = setup_logging()
 
 # Initialize database
-user_db = UserDB()
-task_db = TaskDB()
+user_db = AsyncUserDB()
+task_db = AsyncTaskDB()
+solution_db = AsyncSolutionDB()
 
 # Constants
 THEMES = Config.C_TOPICS
@@ -73,7 +75,7 @@ async def callbacks_handler(bot: AsyncTeleBot):
     @bot.callback_query_handler(func=lambda call: call.data == "profile")
     async def profile_callback(call):
         chat_id = call.message.chat.id
-        user = user_db.get_user(chat_id)
+        user = await user_db.get_user(chat_id)
 
         if user:
             username = user.username
@@ -114,14 +116,21 @@ async def callbacks_handler(bot: AsyncTeleBot):
     @bot.callback_query_handler(func=lambda call: call.data.startswith("summary_"))
     async def brief_statistics_callback(call):
         chat_id = call.message.chat.id
-        user = user_db.get_user(chat_id)
-        solutions = user.solutions if user else []
+        solutions = await solution_db.get_user_solutions(chat_id, limit=Config.STATISTICS_SOLUTIONS_LIMIT)
+        tasks = await task_db.get_task_summaries(list({solution.task_id for solution in solutions}))
         report = ''
 
-        for solution in enumerate(solutions, start=1):
-            task = task_db.get_task(solution[1]['task_id'])
-            report += (f"Решена задача сложности {task.difficulty}/3 по теме '{C_TOPICS[task.topic_id]}' "
-                       f"с оценкой {solution[1]['score']}/100.\n")
+        # Oldest first, as the solutions were submitted
+        for solution in reversed(solutions):
+            task = tasks.get(solution.task_id)
+            if not task:
+                continue
+            if solution.score is None:
+                report += (f"Отправлено решение задачи сложности {task['difficulty']}/3 по теме "
+                           f"'{C_TOPICS[task['topic_id']]}', проверка остановлена досрочно.\n")
+                continue
+            report += (f"Решена задача сложности {task['difficulty']}/3 по теме '{C_TOPICS[task['topic_id']]}' "
+                       f"с оценкой {solution.score:g}/100.\n")
 
         if not report:
             report = "У вас пока нет решённых задач."
@@ -133,7 +142,7 @@ async def callbacks_handler(bot: AsyncTeleBot):
                     text=f"🔄 Загружаем вашу краткую статистику...",
                 )
 
-                ai_report = brief_summary(report)
+                ai_report = await brief_summary(report)
                 await bot.edit_message_text(
                     chat_id=chat_id,
                     message_id=call.message.message_id,
@@ -147,7 +156,7 @@ async def callbacks_handler(bot: AsyncTeleBot):
                     text=f"🔄 Загружаем вашу подробную статистику...",
                 )
 
-                ai_report = detailed_summary(report)
+                ai_report = await detailed_summary(report)
                 await bot.edit_message_text(
                     chat_id=chat_id,
                     message_id=call.message.message_id,
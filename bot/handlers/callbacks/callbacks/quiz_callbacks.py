@@ -1,23 +1,22 @@
-import random
 from html import escape
 
 from config import Config
-from database.user_db import UserDB
-from database.task_db import TaskDB
-from database.quiz_db import QuizDB
+from database.user_db import AsyncUserDB
+from database.task_db import AsyncTaskDB
+from database.quiz_db import AsyncQuizDB
 from logging_config import setup_logging
 from telebot.async_telebot import AsyncTeleBot
 from bot.keyboards import inline
-from models.database_models import QuizModel
-from agents.quiz_generator.agent_instance import blitz, mini, full
+from inventory.quiz_pool import generate_quiz, get_quiz_pool
 
 # Initialize logger
 logger = setup_logging()
 
 # Initialize database
-user_db = UserDB()
-task_db = TaskDB()
-quiz_db = QuizDB()
+user_db = AsyncUserDB()
+task_db = AsyncTaskDB()
+quiz_db = AsyncQuizDB()
+quiz_pool = get_quiz_pool()
 
 # Constants
 THEMES = Config.C_TOPICS
@@ -75,34 +74,25 @@ async def callbacks_handler(bot: AsyncTeleBot):
         theme_name = THEMES.get(theme_id, "Неизвестная тема")
 
         try:
-            await bot.edit_message_text(
-                chat_id=chat_id,
-                message_id=call.message.message_id,
-                text=f"📚 Вы выбрали тему: {theme_name}\n"
-                     f"🧠 Вы выбрали тип викторины: {quiz_type.capitalize()}\n\n"
-                     "Викторина будет сгенерирована в ближайшее время. Пожалуйста, подождите...",
-            )
+            quiz_data = None
+            if Config.QUIZ_POOL_SIZE > 0:
+                quiz_data = await quiz_pool.take(theme_id, quiz_type)
 
-            quiz = {}
-            if quiz_type == "blitz":
-                quiz = blitz(topic=theme_name)
-            elif quiz_type == "mini":
-                quiz = mini(topic=theme_name)
-            elif quiz_type == "full":
-                quiz = full(topic=theme_name)
-
-            logger.info(f"Generated quiz: {quiz}")
-
-            quiz_id = random.randint(100000, 999999)
-            quiz_data = QuizModel(
-                quiz_id=str(quiz_id),
-                topic=theme_id,
-                type=quiz_type,
-                quiz_title=quiz.get("quiz_title", "Викторина"),
-                questions=quiz.get("questions", []),
-            )
+            # The slot is empty, generate the quiz on demand
+            if not quiz_data:
+                await bot.edit_message_text(
+                    chat_id=chat_id,
+                    message_id=call.message.message_id,
+                    text=f"📚 Вы выбрали тему: {theme_name}\n"
+                         f"🧠 Вы выбрали тип викторины: {quiz_type.capitalize()}\n\n"
+                         "Викторина будет сгенерирована в ближайшее время. Пожалуйста, подождите...",
+                )
+
+                quiz_data = await generate_quiz(theme_id, quiz_type)
+                logger.info(f"Generated quiz: {quiz_data}")
+                await quiz_db.add_quiz(quiz_data)
 
-            quiz_db.add_quiz(quiz_data)
+            quiz_id = quiz_data.quiz_id
 
             await bot.edit_message_text(
                 chat_id=chat_id,
@@ -116,7 +106,7 @@ async def callbacks_handler(bot: AsyncTeleBot):
                      f"2️⃣. {quiz_data.questions[0]['options'][1]}\n"
                      f"3️⃣. {quiz_data.questions[0]['options'][2]}\n"
                      f"4️⃣. {quiz_data.questions[0]['options'][3]}",
-                reply_markup=inline.quiz_question_keyboard(str(quiz_id), 0, 0)
+                reply_markup=inline.quiz_question_keyboard(quiz_id, 0, 0)
             )
 
         except Exception as e:
@@ -136,7 +126,7 @@ async def callbacks_handler(bot: AsyncTeleBot):
         correct_answers_count = int(parts[5])
 
         try:
-            quiz = quiz_db.get_quiz(quiz_id)
+            quiz = await quiz_db.get_quiz(quiz_id)
             if not quiz:
                 raise ValueError("Quiz not found")
 
@@ -165,7 +155,7 @@ async def callbacks_handler(bot: AsyncTeleBot):
                     reply_markup=inline.quiz_question_keyboard(quiz_id, next_question_index, correct_answers_count)
                 )
             else:
-                user_db.add_solved_quiz(
+                await user_db.add_solved_quiz(
                     user_id=chat_id,
                     quiz_id=quiz_id,
                     score=correct_answers_count
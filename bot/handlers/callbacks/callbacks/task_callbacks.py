@@ -1,23 +1,25 @@
-import random
-
 from html import escape
 from config import Config
-from database.user_db import UserDB
-from database.task_db import TaskDB
-from models.database_models import TaskModel
+from database.user_db import AsyncUserDB
+from database.task_db import AsyncTaskDB
+from database.solution_db import AsyncSolutionDB
+from compiler.solution_search import search_solution
+from inventory.task_inventory import generate_task, get_task_inventory
 from logging_config import setup_logging
 from telebot.async_telebot import AsyncTeleBot
 
 import bot.keyboards.inline as inline_keyboards
-from agents.task_generator.agent_instance import generate_task_full, regenerate_task_solution
-from agents.code_analyzer.agent_instance import analyze_code, compare_task_and_solution
+from agents.task_generator.agent_instance import regenerate_task_solution
+from agents.code_analyzer.agent_instance import analyze_code
 
 # Initialize logger
 logger = setup_logging()
 
 # Initialize database
-user_db = UserDB()
-task_db = TaskDB()
+user_db = AsyncUserDB()
+task_db = AsyncTaskDB()
+solution_db = AsyncSolutionDB()
+task_inventory = get_task_inventory()
 
 # Constants
 THEMES = Config.C_TOPICS
@@ -78,29 +80,23 @@ async def callbacks_handler(bot: AsyncTeleBot):
         difficulty_name = DIFFICULTIES.get(difficulty_id, "Неизвестная сложность")
 
         try:
-            await bot.edit_message_text(
-                chat_id=chat_id,
-                message_id=call.message.message_id,
-                text="⏳ Генерируем задание, пожалуйста подождите..."
-            )
-
-            logger.info(f"Generating task for theme: {theme_name}, difficulty: {difficulty_name}")
-            task = generate_task_full(topic_id=theme_id, difficulty=int(difficulty_id))
-            task_id = str(random.randint(100000, 999999))
+            task = None
+            if Config.TASK_INVENTORY_SIZE > 0:
+                task = await task_inventory.take(theme_id, int(difficulty_id))
 
-            task_model = TaskModel(
-                task_id=task_id,
-                topic_id=theme_id,
-                difficulty=difficulty_id,
-                task_text=task.get("task_text", ""),
-                test_cases=task.get("test_cases", {}),
-                solution_code=task.get("solution_code", ""),
-            )
+            # The slot is empty, generate the task on demand
+            if not task:
+                await bot.edit_message_text(
+                    chat_id=chat_id,
+                    message_id=call.message.message_id,
+                    text="⏳ Генерируем задание, пожалуйста подождите..."
+                )
 
-            TaskDB().add_task(task_model)
+                logger.info(f"Generating task for theme: {theme_name}, difficulty: {difficulty_name}")
+                task = await generate_task(topic_id=theme_id, difficulty=int(difficulty_id))
 
-            if not task.get("success"):
-                raise Exception(task.get("error", "Unknown error during task generation"))
+            await task_db.add_task(task)
+            task_id = task.task_id
 
             await bot.edit_message_text(
                 chat_id=chat_id,
@@ -108,7 +104,7 @@ async def callbacks_handler(bot: AsyncTeleBot):
                 text=f"✅ Вы выбрали тему: {theme_name}\n"
                      f"🧠 Сложность: {difficulty_name}\n\n"
                      "📝 Вот ваше задание:\n\n"
-                     "" + escape(task["task_text"]) + "\n\n",
+                     "" + escape(task.task_text) + "\n\n",
                 reply_markup=inline_keyboards.task_interaction_keyboard(
                     task_id=task_id
                 )
@@ -156,30 +152,41 @@ async def callbacks_handler(bot: AsyncTeleBot):
         task_id = call.data.split("_")[-1]
 
         try:
-            task = TaskDB().tasks.find_one({"task_id": task_id})
+            task = await task_db.get_task(task_id)
             if not task:
                 raise Exception("Task not found")
 
-            solution_code = task.get("solution_code", "Решение не найдено.")
-            task_text = task.get("task_text", "")
-
-            answer = compare_task_and_solution(
-                task_text=task_text,
-                solution_code=solution_code
-            )
-            while not answer:
-                new_code = regenerate_task_solution(
-                    task_text=task_text
-                )
-                task_db.update_task_solution(
-                    task_id=int(task_id),
-                    solution_code=new_code.get("solution_code", "")
-                )
-                solution_code = new_code.get("solution_code", "")
-                answer = compare_task_and_solution(
-                    task_text=task_text,
-                    solution_code=solution_code
+            solution_code = task.solution_code
+            verified = task.solution_verified
+            if not verified:
+                waiter = await bot.send_message(
+                    chat_id=chat_id,
+                    text="⏳ Проверяем решение на тестах, пожалуйста подождите..."
                 )
+                try:
+                    search = await search_solution(
+                        generate=lambda: regenerate_task_solution(task_text=task.task_text),
+                        test_cases=task.test_cases,
+                        solution_code=solution_code
+                    )
+                finally:
+                    await bot.delete_message(
+                        chat_id=chat_id,
+                        message_id=waiter.message_id
+                    )
+                verified = search.verified
+                if verified:
+                    solution_code = search.solution_code
+                    await task_db.update_task_solution(
+                        task_id=task_id,
+                        solution_code=solution_code,
+                        verified=True
+                    )
+
+            if not solution_code:
+                solution_code = "Решение не найдено."
+            elif not verified:
+                solution_code = f"// Решение не удалось проверить на тестах\n{solution_code}"
 
             await bot.send_message(
                 chat_id=chat_id,
@@ -210,18 +217,14 @@ async def callbacks_handler(bot: AsyncTeleBot):
                 text="🔍 Анализируем ваше решение, пожалуйста подождите..."
             )
 
-            user = user_db.get_user(chat_id)
-            if not user:
-                raise Exception("User not found")
-
-            solution = next((sol for sol in user.solutions if sol['solution_id'] == solution_id), None)
+            solution = await solution_db.get_solution(chat_id, solution_id)
             if not solution:
                 raise Exception("Solution not found")
 
-            analysis_result = analyze_code(
-                task_text=solution['task_id'],
-                user_code=solution['solution_code'],
-                error_text=solution['log']
+            analysis_result = await analyze_code(
+                task_text=solution.task_id,
+                user_code=solution.solution_code,
+                error_text=solution.log
             )
 
             await bot.delete_message(
@@ -1,5 +1,5 @@
 import datetime
-from database.user_db import UserDB
+from database.user_db import AsyncUserDB
 from logging_config import setup_logging
 from telebot.async_telebot import AsyncTeleBot
 
@@ -10,7 +10,7 @@ from models.database_models import UserModel
 logger = setup_logging()
 
 # Initialize database
-user_db = UserDB()
+user_db = AsyncUserDB()
 
 
 # Function to handle commands
@@ -29,7 +29,7 @@ async def commands_handler(bot: AsyncTeleBot):
                 username=message.from_user.username or "",
                 register_date=time_now
             )
-            user_db.add_user(
+            await user_db.add_user(
                 user=user
             )
 
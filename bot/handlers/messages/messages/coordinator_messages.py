@@ -1,6 +1,6 @@
 from config import Config
-from database.user_db import UserDB
-from database.task_db import TaskDB
+from database.user_db import AsyncUserDB
+from database.task_db import AsyncTaskDB
 from logging_config import setup_logging
 import bot.keyboards.inline as inline_keyboards
 from agents.coordinator.coordinator.coordinator import get_session_statistics, coordinator
@@ -9,8 +9,8 @@ from agents.coordinator.coordinator.coordinator import get_session_statistics, c
 logger = setup_logging()
 
 # Initialize database
-user_db = UserDB()
-task_db = TaskDB()
+user_db = AsyncUserDB()
+task_db = AsyncTaskDB()
 
 # Constants
 FEEDBACK_CHAT_ID = Config.FEEDBACK_CHAT_ID
@@ -23,7 +23,7 @@ async def messages_handler(bot):
                          content_types=['text'])
     async def handle_task_submission(message):
         user_input = message.text
-        result = coordinator.invoke(
+        result = await coordinator.ainvoke(
             {
                 "messages": [{"role": "user", "content": user_input}]
             }
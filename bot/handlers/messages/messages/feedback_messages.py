@@ -1,9 +1,9 @@
 import datetime
 
 from config import Config
-from database.user_db import UserDB
+from database.user_db import AsyncUserDB
 from logging_config import setup_logging
-from database.feedback_db import FeedbackDB
+from database.feedback_db import AsyncFeedbackDB
 from telebot.async_telebot import AsyncTeleBot
 from models.database_models import FeedbackModel
 import bot.keyboards.inline as inline_keyboards
@@ -12,8 +12,8 @@ import bot.keyboards.inline as inline_keyboards
 logger = setup_logging()
 
 # Initialize database
-user_db = UserDB()
-feedback_db = FeedbackDB()
+user_db = AsyncUserDB()
+feedback_db = AsyncFeedbackDB()
 
 # Constants
 FEEDBACK_CHAT_ID = Config.FEEDBACK_CHAT_ID
@@ -47,7 +47,7 @@ async def messages_handler(bot: AsyncTeleBot):
                 message_id=message_id.message_id,
                 date=time_now
             )
-            feedback_db.add_feedback(
+            await feedback_db.add_feedback(
                 feedback=feedback
             )
 
@@ -78,7 +78,7 @@ async def messages_handler(bot: AsyncTeleBot):
     async def handle_feedback_response(message):
         try:
             original_message_id = message.reply_to_message.message_id
-            feedback = feedback_db.get_feedback(original_message_id)
+            feedback = await feedback_db.get_feedback(original_message_id)
 
             if feedback:
                 if feedback.status != 'new':
@@ -105,7 +105,7 @@ async def messages_handler(bot: AsyncTeleBot):
                     text="✅ Ответ успешно отправлен пользователю."
                 )
 
-                feedback_db.mark_feedback_as_answered(original_message_id)
+                await feedback_db.mark_feedback_as_answered(original_message_id)
                 logger.info(f"Sent feedback response to user {user_id}")
             else:
                 await bot.send_message(
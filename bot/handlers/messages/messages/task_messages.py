@@ -1,16 +1,26 @@
 from config import Config
-from database.user_db import UserDB
-from database.task_db import TaskDB
+from database.user_db import AsyncUserDB
+from database.task_db import AsyncTaskDB
+from database.solution_db import AsyncSolutionDB
+from database.result_db import AsyncResultDB
+from models.database_models import GradingResultModel
 from logging_config import setup_logging
 import bot.keyboards.inline as inline_keyboards
-from compiler.compiler import run_c_task_in_sandbox
+from grading.broker import GradingJobError, get_broker
+from compiler.compiler import RUN_ALL_TESTS
+from bot.progress import ProgressMessage
 
 # Initialize logger
 logger = setup_logging()
 
 # Initialize database
-user_db = UserDB()
-task_db = TaskDB()
+user_db = AsyncUserDB()
+task_db = AsyncTaskDB()
+solution_db = AsyncSolutionDB()
+result_db = AsyncResultDB()
+
+# Initialize grading queue
+broker = get_broker()
 
 # Constants
 FEEDBACK_CHAT_ID = Config.FEEDBACK_CHAT_ID
@@ -45,29 +55,83 @@ async def messages_handler(bot):
         ) as data:
             task_id = data.get("current_task_id")
 
+        progress = None
         try:
             file_info = await bot.get_file(document.file_id)
             file_path = file_info.file_path
             downloaded_file = await bot.download_file(file_path)
 
-            user_file_path = f'temp/{chat_id}_{task_id}_solution.c'
-            with open(user_file_path, 'wb') as new_file:
-                new_file.write(downloaded_file)
-
-            task = TaskDB().tasks.find_one({"task_id": task_id})
-            test_cases = task.get("test_cases", [])
-
-            result = await run_c_task_in_sandbox(
-                filename=user_file_path,
-                test_cases=test_cases
-            )
-
-            log = result["log"]
-            passed = result["passed"]
-            total = result["total"]
-            score = (passed / total) * 100 if total > 0 else 0
+            task = await task_db.get_task(task_id)
+            if not task:
+                raise Exception("Task not found")
+            test_cases = task.test_cases
+
+            # Identical resubmissions of the same task reuse the memoized grading result
+            result_key = result_db.make_key(task_id, test_cases, downloaded_file)
+            cached = await result_db.get_result(result_key)
+            if cached:
+                logger.info(f"Reusing grading result for user {chat_id}, task {task_id}")
+                # Only complete runs are memoized
+                log, passed, total, skipped = cached.log, cached.passed, cached.total, 0
+            else:
+                # Resubmissions of a task get quick feedback: grading stops after the first failed tests
+                max_failures = RUN_ALL_TESTS
+                if Config.GRADING_RESUBMIT_MAX_FAILURES and await solution_db.has_solution(chat_id, task_id):
+                    max_failures = Config.GRADING_RESUBMIT_MAX_FAILURES
+
+                waiter = await bot.send_message(
+                    chat_id=chat_id,
+                    text="⏳ Решение отправлено на проверку, пожалуйста подождите..."
+                )
+                # Show every finished test right away, editing a single message
+                progress = ProgressMessage(bot, chat_id, waiter.message_id)
+                job_id = await broker.enqueue(
+                    source=downloaded_file,
+                    test_cases=test_cases,
+                    user_id=chat_id,
+                    max_failures=max_failures
+                )
 
-            solution_id = user_db.add_solution(
+                marks = ["⏳"] * len(test_cases)
+                result = None
+                try:
+                    async for event in broker.events(job_id):
+                        if event["type"] == "restart":
+                            marks = ["⏳"] * len(test_cases)
+                        elif event["type"] == "test":
+                            test = event["test"]
+                            if test["passed"]:
+                                marks[test["index"] - 1] = "✅"
+                            else:
+                                marks[test["index"] - 1] = "⏭" if test["status"] == "skipped" else "❌"
+                            done = sum(mark != "⏳" for mark in marks)
+                            await progress.update(f"🧪 Проверяем решение: {done}/{len(marks)} тестов\n\n"
+                                                  f"{' '.join(marks)}")
+                        elif event["type"] == "result":
+                            result = event["result"]
+                finally:
+                    # Nobody will read the result anymore, so a job still queued must not be graded later
+                    if result is None:
+                        await broker.cancel(job_id)
+                if result is None:
+                    raise GradingJobError(f"Grading job {job_id} ended without a result")
+
+                log = result["log"]
+                passed = result["passed"]
+                total = result["total"]
+                skipped = result["skipped"]
+                if result["cacheable"]:
+                    await result_db.add_result(GradingResultModel(
+                        key=result_key,
+                        task_id=task_id,
+                        log=log,
+                        passed=passed,
+                        total=total
+                    ))
+            # After an early exit the skipped tests are unknown rather than failed, so such a run gets no score
+            score = None if skipped else (passed / total) * 100 if total > 0 else 0
+
+            solution_id = await solution_db.add_solution(
                 user_id=chat_id,
                 task_id=task_id,
                 solution_code=downloaded_file.decode('utf-8'),
@@ -75,15 +139,19 @@ async def messages_handler(bot):
                 log=log
             )
 
-            await bot.send_message(
-                chat_id=chat_id,
-                text=f"🧪 Результаты тестирования вашего решения:\n\n"
-                     f"{log}\n",
-                reply_markup=inline_keyboards.after_submission_keyboard(
-                    task_id=task_id,
-                    solution_id=solution_id
-                )
+            result_text = f"🧪 Результаты тестирования вашего решения:\n\n{log}\n"
+            result_markup = inline_keyboards.after_submission_keyboard(
+                task_id=task_id,
+                solution_id=solution_id
             )
+            if progress:
+                await progress.finish(result_text, reply_markup=result_markup)
+            else:
+                await bot.send_message(
+                    chat_id=chat_id,
+                    text=result_text,
+                    reply_markup=result_markup
+                )
 
             await bot.delete_state(
                 chat_id=chat_id,
@@ -93,7 +161,12 @@ async def messages_handler(bot):
             logger.info(f"Processed task submission from user {chat_id} for task {task_id}")
         except Exception as e:
             logger.error(f"Error in handle_task_submission: {e}")
-            await bot.send_message(
-                chat_id=chat_id,
-                text="❗ Произошла ошибка при обработке вашего решения. Пожалуйста, попробуйте снова позже."
-            )
+            error_text = "❗ Произошла ошибка при обработке вашего решения. Пожалуйста, попробуйте снова позже."
+            # The progress message is replaced, so it does not keep showing a check that is not running
+            if progress:
+                await progress.finish(error_text)
+            else:
+                await bot.send_message(
+                    chat_id=chat_id,
+                    text=error_text
+                )
@@ -29,7 +29,7 @@ async def messages_handler(bot):
 
         try:
             logger.info(f"Received tutor question from user {chat_id}: {question}")
-            tutor_response = answer_question(
+            tutor_response = await answer_question(
                 question=question,
                 user_id=str(chat_id)
             )
@@ -0,0 +1,76 @@
+import asyncio
+from typing import Optional
+from config import Config
+from logging_config import setup_logging
+from telebot.async_telebot import AsyncTeleBot
+
+logger = setup_logging()
+
+
+# ProgressMessage keeps one Telegram message up to date with the progress of a long operation.
+# Edits are throttled to one per PROGRESS_EDIT_INTERVAL_MS; intermediate states are coalesced
+# and only the latest one is sent, so bursts of updates do not hit Telegram's edit rate limits.
+# Edits are serialised by a lock, so the final text of finish() is always the last edit to land.
+class ProgressMessage:
+    def __init__(self, bot: AsyncTeleBot, chat_id: int, message_id: int,
+                 interval_ms: int = Config.PROGRESS_EDIT_INTERVAL_MS):
+        self.bot = bot
+        self.chat_id = chat_id
+        self.message_id = message_id
+        self.interval = interval_ms / 1000
+        self._last_edit = 0.0
+        self._shown: Optional[str] = None
+        self._pending: Optional[str] = None
+        self._flush_task: Optional[asyncio.Task] = None
+        self._lock = asyncio.Lock()
+        self._finished = False
+
+    async def update(self, text: str) -> None:
+        if self._finished:
+            return
+        self._pending = text
+        wait = self._last_edit + self.interval - asyncio.get_running_loop().time()
+        if wait <= 0:
+            await self._flush()
+        elif self._flush_task is None:
+            self._flush_task = asyncio.create_task(self._flush_later(wait))
+
+    async def finish(self, text: str, reply_markup=None) -> None:
+        """
+        Replace the progress with the final text, cancelling a throttled edit that has not been sent yet.
+        A progress edit already in flight is waited for, so it cannot overwrite the final text.
+        """
+        self._finished = True
+        self._pending = None
+        if self._flush_task:
+            self._flush_task.cancel()
+            self._flush_task = None
+        async with self._lock:
+            await self.bot.edit_message_text(
+                chat_id=self.chat_id,
+                message_id=self.message_id,
+                text=text,
+                reply_markup=reply_markup
+            )
+
+    async def _flush_later(self, wait: float) -> None:
+        await asyncio.sleep(wait)
+        self._flush_task = None
+        await self._flush()
+
+    async def _flush(self) -> None:
+        async with self._lock:
+            text, self._pending = self._pending, None
+            if self._finished or text is None or text == self._shown:
+                return
+            self._last_edit = asyncio.get_running_loop().time()
+            try:
+                await self.bot.edit_message_text(
+                    chat_id=self.chat_id,
+                    message_id=self.message_id,
+                    text=text
+                )
+                self._shown = text
+            except Exception as e:
+                # Progress is best effort; the final result is still delivered by finish()
+                logger.warning(f"Failed to update progress message in chat {self.chat_id}: {e}")
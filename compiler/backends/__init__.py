@@ -0,0 +1,13 @@
+from functools import lru_cache
+from config import Config
+from compiler.backends.base import SandboxBackend
+
+
+# Singleton backend selected by SANDBOX_BACKEND
+@lru_cache(maxsize=1)
+def get_sandbox_backend() -> SandboxBackend:
+    if Config.SANDBOX_BACKEND == "native":
+        from compiler.backends.native import NativeBackend
+        return NativeBackend()
+    from compiler.backends.docker import DockerBackend
+    return DockerBackend()
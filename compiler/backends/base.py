@@ -0,0 +1,34 @@
+from typing import AsyncContextManager, Optional
+from compiler.workspace import Workspace
+
+
+# SandboxBackend is where submissions are compiled and run: it hands out isolated per-job workspaces
+# and tells the compiler how to start the test driver inside them.
+class SandboxBackend:
+    # Command that starts compiler/sandbox_driver.py inside a workspace
+    driver_command: list[str]
+    # Path to the measure launcher passed to the driver, None for the driver's default
+    measure_path: Optional[str] = None
+    # Resource limits the driver applies to every run ({"RLIMIT_AS": bytes, ...})
+    rlimits: dict[str, int] = {}
+    # Directory with the headers built by compiler/pch.py, None if there are no precompiled headers
+    pch_dir: Optional[str] = None
+
+    async def start(self) -> None:
+        pass
+
+    async def close(self) -> None:
+        pass
+
+    async def fingerprint(self) -> str:
+        """
+        Identify the toolchain builds are made with, so cached binaries are never reused across toolchains.
+        """
+        raise NotImplementedError
+
+    def workspace(self, job_id: Optional[str] = None) -> AsyncContextManager[Workspace]:
+        """
+        Create an isolated workspace for one job and clean it up when the job is done.
+        :param job_id: Optional job identifier used in names and logs.
+        """
+        raise NotImplementedError
@@ -0,0 +1,35 @@
+from contextlib import asynccontextmanager
+from typing import Optional
+from compiler.pool import SandboxPool, sandbox_pool
+from compiler.workspace import ContainerWorkspace
+from compiler.backends.base import SandboxBackend
+
+# Location of compiler/sandbox_driver.py inside the c-sandbox image
+DRIVER_PATH = "/opt/clearn/sandbox_driver.py"
+
+# Precompiled headers baked into the c-sandbox image
+PCH_DIR = "/opt/clearn/pch"
+
+
+# DockerBackend runs every job in a workspace of a container leased from the warm sandbox pool.
+# Limits and isolation come from the container itself (see CONTAINER_OPTIONS).
+class DockerBackend(SandboxBackend):
+    driver_command = ["python3", DRIVER_PATH]
+    pch_dir = PCH_DIR
+
+    def __init__(self, pool: SandboxPool = sandbox_pool):
+        self.pool = pool
+
+    async def start(self) -> None:
+        await self.pool.start()
+
+    async def close(self) -> None:
+        await self.pool.close()
+
+    async def fingerprint(self) -> str:
+        return await self.pool.image_digest()
+
+    @asynccontextmanager
+    async def workspace(self, job_id: Optional[str] = None):
+        async with self.pool.lease() as container, ContainerWorkspace.create(container, job_id) as workspace:
+            yield workspace
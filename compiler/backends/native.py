@@ -0,0 +1,206 @@
+import os
+import sys
+import uuid
+import errno
+import asyncio
+import shutil
+import hashlib
+import platform
+from pathlib import Path
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Optional
+from config import Config
+from logging_config import setup_logging
+from compiler import pch
+from compiler.process import run_process, stream_process_lines
+from compiler.scheduler import JOB_CPUS, JOB_MEMORY, parse_size
+from compiler.workspace import Workspace
+from compiler.backends.base import SandboxBackend
+
+try:
+    import seccomp
+except ImportError:
+    seccomp = None
+
+logger = setup_logging()
+
+COMPILER_DIR = Path(__file__).resolve().parent.parent
+DRIVER_SOURCE = COMPILER_DIR / "sandbox_driver.py"
+MEASURE_SOURCE = COMPILER_DIR / "measure.c"
+CONFINE_SOURCE = COMPILER_DIR / "confine.c"
+
+# Host paths the compiler and the driver need, bound read-only into the sandbox's root filesystem;
+# the Python installation and the driver's directory are added to them
+HOST_PATHS = [
+    "/usr", "/bin", "/sbin", "/lib", "/lib32", "/lib64", "/libx32",
+    "/etc/alternatives", "/etc/ld.so.cache", "/etc/ld.so.conf", "/etc/ld.so.conf.d"
+]
+
+# Syscalls a submission or the compiler never needs; they fail with EPERM
+DENIED_SYSCALLS = [
+    "socket", "socketpair", "connect", "bind", "listen", "accept", "accept4",
+    "ptrace", "process_vm_readv", "process_vm_writev",
+    "mount", "umount2", "pivot_root", "chroot", "unshare", "setns",
+    "bpf", "perf_event_open", "keyctl", "add_key", "request_key",
+    "init_module", "finit_module", "delete_module", "kexec_load", "reboot", "swapon", "swapoff"
+]
+
+# Limits applied by the driver to every test run
+OUTPUT_FILE_LIMIT = 16 * 1024 * 1024
+OPEN_FILES_LIMIT = 64
+
+
+def _write(path: str, data: str) -> None:
+    with open(path, "w") as f:
+        f.write(data)
+
+
+# HostWorkspace is a per-job directory on the host (tmpfs by default); commands are started
+# through the backend's confine launcher (compiler/confine.c), which sets up the sandbox and execs them.
+class HostWorkspace(Workspace):
+    def __init__(self, path: str, launcher: list[str], env: dict[str, str]):
+        self.path = path
+        self.launcher = launcher
+        self.env = env
+
+    async def write(self, name: str, data: bytes, executable: bool = False) -> None:
+        file = Path(self.path, name)
+        file.write_bytes(data)
+        file.chmod(0o700 if executable else 0o600)
+
+    async def read(self, name: str) -> bytes:
+        return Path(self.path, name).read_bytes()
+
+    async def exec(self, *cmd: str, input_data: Optional[bytes] = None,
+                   timeout: Optional[float] = None) -> tuple[int, bytes, bytes]:
+        return await run_process([*self.launcher, *cmd], input_data=input_data, timeout=timeout,
+                                 cwd=self.path, env=self.env)
+
+    def exec_lines(self, *cmd: str, input_data: Optional[bytes] = None,
+                   timeout: Optional[float] = None) -> AsyncIterator[bytes]:
+        return stream_process_lines([*self.launcher, *cmd], input_data=input_data, timeout=timeout,
+                                    cwd=self.path, env=self.env)
+
+
+# NativeBackend compiles and runs submissions straight on the bot/worker host, skipping the Docker daemon.
+# Every command is started by the confine launcher in fresh user, PID, mount, network, IPC and UTS namespaces,
+# without capabilities, with a seccomp filter denying DENIED_SYSCALLS, and optionally inside a per-job
+# cgroup v2 (memory, CPU and pid limits) created under SANDBOX_CGROUP_ROOT, which must be delegated to
+# the bot's user. Its root filesystem is a read-only tmpfs with HOST_PATHS, the Python installation,
+# the driver and the job's workspace, so submissions see neither the worker's processes nor its files.
+# Test runs also get rlimits on address space, output file size and open files, and may signal only
+# themselves (see compiler/measure.c).
+class NativeBackend(SandboxBackend):
+    def __init__(self, root: str = Config.SANDBOX_NATIVE_ROOT,
+                 namespaces: bool = Config.SANDBOX_NATIVE_NAMESPACES,
+                 use_seccomp: bool = Config.SANDBOX_NATIVE_SECCOMP,
+                 cgroup_root: str = Config.SANDBOX_CGROUP_ROOT):
+        self.root = root
+        self.namespaces = namespaces
+        self.use_seccomp = use_seccomp
+        self.cgroup_root = cgroup_root
+        self.driver_command = [sys.executable, "-I", str(DRIVER_SOURCE)]
+        self.measure_path = os.path.join(root, "measure")
+        self.confine_path = os.path.join(root, "confine")
+        self.seccomp_path = os.path.join(root, "seccomp.bpf")
+        self.rootfs_path = os.path.join(root, "rootfs")
+        self.pch_dir = os.path.join(root, "pch")
+        self.rlimits = {
+            "RLIMIT_AS": parse_size(Config.SANDBOX_MEMORY),
+            "RLIMIT_FSIZE": OUTPUT_FILE_LIMIT,
+            "RLIMIT_NOFILE": OPEN_FILES_LIMIT,
+            "RLIMIT_CORE": 0
+        }
+        self._fingerprint: Optional[str] = None
+
+    async def start(self) -> None:
+        os.makedirs(self.root, mode=0o700, exist_ok=True)
+        os.makedirs(self.rootfs_path, exist_ok=True)
+        if self.use_seccomp:
+            if seccomp is None:
+                raise RuntimeError("The native sandbox needs the seccomp module (libseccomp python bindings); "
+                                   "install it or set SANDBOX_NATIVE_SECCOMP=false")
+            syscall_filter = seccomp.SyscallFilter(defaction=seccomp.ALLOW)
+            for name in DENIED_SYSCALLS:
+                try:
+                    syscall_filter.add_rule(seccomp.ERRNO(errno.EPERM), name)
+                except (RuntimeError, ValueError):
+                    # Not a syscall on this architecture
+                    continue
+            # The confine launcher loads the exported program itself
+            with open(self.seccomp_path, "wb") as f:
+                syscall_filter.export_bpf(f)
+
+        for name, source, path in (("measure", MEASURE_SOURCE, self.measure_path),
+                                   ("confine", CONFINE_SOURCE, self.confine_path)):
+            rc, _, stderr = await run_process(["gcc", "-O2", "-o", path, str(source)])
+            if rc != 0:
+                raise RuntimeError(f"Failed to build the {name} launcher: {stderr.decode(errors='replace')}")
+        await asyncio.to_thread(pch.build, self.pch_dir)
+        logger.info(f"Native sandbox started in {self.root}")
+
+    async def close(self) -> None:
+        shutil.rmtree(self.root, ignore_errors=True)
+
+    async def fingerprint(self) -> str:
+        if self._fingerprint is None:
+            rc, stdout, stderr = await run_process(["gcc", "--version"])
+            if rc != 0:
+                raise RuntimeError(stderr.decode().strip())
+            digest = hashlib.sha256(stdout + platform.machine().encode()).hexdigest()
+            self._fingerprint = f"native:{digest}"
+        return self._fingerprint
+
+    @asynccontextmanager
+    async def workspace(self, job_id: Optional[str] = None):
+        name = f"job-{job_id or uuid.uuid4().hex}"
+        path = os.path.join(self.root, name)
+        os.mkdir(path, 0o700)
+        cgroup = self._create_cgroup(name) if self.cgroup_root else None
+        env = {"PATH": "/usr/local/bin:/usr/bin:/bin", "LANG": "C.UTF-8", "HOME": path, "TMPDIR": path}
+        try:
+            yield HostWorkspace(path, self._launcher(path, cgroup), env)
+        finally:
+            if cgroup:
+                self._remove_cgroup(cgroup)
+            shutil.rmtree(path, ignore_errors=True)
+
+    def _create_cgroup(self, name: str) -> str:
+        cgroup = os.path.join(self.cgroup_root, name)
+        os.mkdir(cgroup)
+        _write(f"{cgroup}/memory.max", str(JOB_MEMORY))
+        _write(f"{cgroup}/memory.swap.max", "0")
+        _write(f"{cgroup}/pids.max", str(Config.SANDBOX_PIDS_LIMIT))
+        _write(f"{cgroup}/cpu.max", f"{int(JOB_CPUS * 100000)} 100000")
+        return cgroup
+
+    @staticmethod
+    def _remove_cgroup(cgroup: str) -> None:
+        try:
+            # Kills anything the job left behind, e.g. compiler subprocesses of a timed out build
+            _write(f"{cgroup}/cgroup.kill", "1")
+            os.rmdir(cgroup)
+        except OSError as e:
+            logger.warning(f"Failed to remove cgroup {cgroup}: {e}")
+
+    def _launcher(self, workspace: str, cgroup: Optional[str]) -> list[str]:
+        """
+        Build the confine command line that every command of a workspace is prefixed with.
+        :param workspace: Job directory, the only writable path in the sandbox.
+        :param cgroup: Per-job cgroup, if any.
+        """
+        launcher = [self.confine_path]
+        if cgroup:
+            launcher += ["-c", cgroup]
+        if self.use_seccomp:
+            launcher += ["-s", self.seccomp_path]
+        if self.namespaces:
+            launcher += ["-n", "-r", self.rootfs_path]
+            bound = []
+            for path in (*HOST_PATHS, sys.base_prefix, sys.prefix, str(COMPILER_DIR), self.measure_path, self.pch_dir):
+                # Paths already visible through an earlier bind, e.g. a Python installed under /usr
+                if not any(path == parent or path.startswith(parent + "/") for parent in bound):
+                    bound.append(path)
+                    launcher += ["-b", path]
+            launcher += ["-w", workspace]
+        return [*launcher, "--"]
@@ -0,0 +1,189 @@
+# Output checkers for the C sandbox.
+# A checker compares a program's stdout with the expected output of a test case as the output is read,
+# chunk by chunk, so the driver can stop a program as soon as its output can no longer be accepted.
+# The checker of a case is selected by its "checker" field (see CHECKERS); "exact" is the default.
+# Copied into the c-sandbox image next to compiler/sandbox_driver.py, so this module must only use
+# the standard library.
+import math
+from collections import Counter
+from typing import Optional
+
+DEFAULT_CHECKER = "exact"
+# Default relative and absolute tolerance of the "float" checker
+DEFAULT_TOLERANCE = 1e-6
+
+WHITESPACE = b" \t\n\r\x0b\x0c"
+
+
+# Checker is fed the output chunk by chunk; feed() returns False once the output can no longer match.
+class Checker:
+    def __init__(self, expected: bytes, **options):
+        self.diverged = False
+
+    def feed(self, chunk: bytes) -> bool:
+        raise NotImplementedError
+
+    def matched(self) -> bool:
+        """
+        Verdict for the whole output, called after the last chunk.
+        """
+        raise NotImplementedError
+
+
+# ExactChecker gives the same verdict as comparing both outputs after strip():
+# leading and trailing whitespace is ignored, everything else must match byte for byte.
+class ExactChecker(Checker):
+    def __init__(self, expected: bytes, **options):
+        super().__init__(expected)
+        self.expected = expected.strip(WHITESPACE)
+        self.pos = 0
+        self.started = False
+
+    def feed(self, chunk: bytes) -> bool:
+        if self.diverged:
+            return False
+        if not self.started:
+            chunk = chunk.lstrip(WHITESPACE)
+            if not chunk:
+                return True
+            self.started = True
+
+        n = min(len(chunk), len(self.expected) - self.pos)
+        # Past the end of the expected output only trailing whitespace may follow
+        if chunk[:n] != self.expected[self.pos:self.pos + n] or chunk[n:].strip(WHITESPACE):
+            self.diverged = True
+            return False
+        self.pos += n
+        return True
+
+    def matched(self) -> bool:
+        return not self.diverged and self.pos == len(self.expected)
+
+
+# TokenChecker compares whitespace-separated tokens, so spacing and line breaks do not matter.
+class TokenChecker(Checker):
+    def __init__(self, expected: bytes, **options):
+        super().__init__(expected)
+        self.expected = expected.split()
+        self.pos = 0
+        self.partial = b""
+
+    def feed(self, chunk: bytes) -> bool:
+        if self.diverged:
+            return False
+        data = self.partial + chunk
+        tokens = data.split()
+        # A token cut by the chunk boundary is completed by the next chunk
+        self.partial = tokens.pop() if tokens and data[-1] not in WHITESPACE else b""
+        return self._compare(tokens)
+
+    def matched(self) -> bool:
+        if self.partial:
+            self._compare([self.partial])
+            self.partial = b""
+        return not self.diverged and self.pos == len(self.expected)
+
+    def _compare(self, tokens: list[bytes]) -> bool:
+        if self.pos + len(tokens) > len(self.expected):
+            self.diverged = True
+            return False
+        for token in tokens:
+            if not self.token_matches(token, self.pos):
+                self.diverged = True
+                return False
+            self.pos += 1
+        return True
+
+    def token_matches(self, token: bytes, index: int) -> bool:
+        return token == self.expected[index]
+
+
+# FloatChecker compares tokens like TokenChecker, but numbers only have to agree within a tolerance
+# (the case's "tolerance" field, relative or absolute, whichever is looser).
+class FloatChecker(TokenChecker):
+    def __init__(self, expected: bytes, tolerance: Optional[float] = None, **options):
+        super().__init__(expected)
+        self.tolerance = DEFAULT_TOLERANCE if tolerance is None else float(tolerance)
+        self.numbers = [_to_float(token) for token in self.expected]
+
+    def token_matches(self, token: bytes, index: int) -> bool:
+        expected = self.numbers[index]
+        if expected is None:
+            return token == self.expected[index]
+        number = _to_float(token)
+        return number is not None and math.isclose(number, expected, rel_tol=self.tolerance, abs_tol=self.tolerance)
+
+
+# UnorderedLinesChecker accepts the expected lines in any order; trailing spaces and blank lines are ignored.
+class UnorderedLinesChecker(Checker):
+    def __init__(self, expected: bytes, **options):
+        super().__init__(expected)
+        self.remaining = Counter(_lines(expected.split(b"\n")))
+        self.left = sum(self.remaining.values())
+        self.partial = b""
+
+    def feed(self, chunk: bytes) -> bool:
+        if self.diverged:
+            return False
+        lines = (self.partial + chunk).split(b"\n")
+        self.partial = lines.pop()
+        return self._take(lines)
+
+    def matched(self) -> bool:
+        if self.partial:
+            self._take([self.partial])
+            self.partial = b""
+        return not self.diverged and self.left == 0
+
+    def _take(self, lines: list[bytes]) -> bool:
+        for line in _lines(lines):
+            if not self.remaining[line]:
+                self.diverged = True
+                return False
+            self.remaining[line] -= 1
+            self.left -= 1
+        return True
+
+
+# Checkers selectable by the "checker" field of a test case
+CHECKERS = {
+    "exact": ExactChecker,
+    "tokens": TokenChecker,
+    "float": FloatChecker,
+    "unordered": UnorderedLinesChecker
+}
+
+
+def _to_float(token: bytes) -> Optional[float]:
+    try:
+        number = float(token)
+    except ValueError:
+        return None
+    return number if math.isfinite(number) else None
+
+
+def _lines(lines: list[bytes]) -> list[bytes]:
+    return [line for line in (raw.rstrip(WHITESPACE) for raw in lines) if line]
+
+
+def make_checker(name: Optional[str], expected: bytes, **options) -> Checker:
+    """
+    Create the checker of a test case.
+    :param name: Checker name from CHECKERS, None for the default one.
+    :param expected: Expected output of the case.
+    :param options: Checker options of the case, e.g. tolerance for "float".
+    :raises ValueError: If there is no checker with this name.
+    """
+    checker = CHECKERS.get(name or DEFAULT_CHECKER)
+    if checker is None:
+        raise ValueError(f"Unknown checker: {name}")
+    return checker(expected, **options)
+
+
+def check(name: Optional[str], expected: str, output: str, **options) -> bool:
+    """
+    Check a complete output at once.
+    """
+    checker = make_checker(name, expected.encode(), **options)
+    checker.feed(output.encode())
+    return checker.matched()
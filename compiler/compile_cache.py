@@ -0,0 +1,99 @@
+import os
+import hashlib
+from typing import Optional
+from functools import lru_cache
+from dataclasses import dataclass
+from config import Config
+from logging_config import setup_logging
+
+logger = setup_logging()
+
+
+# Outcome of a compilation: the binary on success, the compiler log on failure
+@dataclass
+class CompileResult:
+    success: bool
+    binary: bytes = b""
+    log: str = ""
+    timed_out: bool = False
+
+
+# CompileCache is a content-addressed on-disk cache of sandbox builds with LRU size eviction.
+# The directory is the only state: every worker process sharing COMPILE_CACHE_DIR sees the entries of the others,
+# and max_bytes bounds the directory as a whole, recency being the file mtime.
+class CompileCache:
+    def __init__(self, root: str = Config.COMPILE_CACHE_DIR, max_bytes: int = Config.COMPILE_CACHE_MAX_BYTES):
+        self.root = root
+        self.max_bytes = max_bytes
+        os.makedirs(self.root, exist_ok=True)
+
+    @staticmethod
+    def key(source: bytes, flags: list[str], toolchain: str) -> str:
+        digest = hashlib.sha256()
+        digest.update(source)
+        digest.update(b"\0" + " ".join(flags).encode() + b"\0" + toolchain.encode())
+        return digest.hexdigest()
+
+    def get(self, key: str) -> Optional[CompileResult]:
+        for name, success in ((f"{key}.bin", True), (f"{key}.err", False)):
+            path = os.path.join(self.root, name)
+            try:
+                with open(path, "rb") as f:
+                    data = f.read()
+                os.utime(path)
+            except OSError:
+                # Missing, or evicted by another process meanwhile
+                continue
+            if success:
+                return CompileResult(success=True, binary=data)
+            return CompileResult(success=False, log=data.decode(errors="replace"))
+        return None
+
+    def put(self, key: str, result: CompileResult) -> None:
+        name = f"{key}.bin" if result.success else f"{key}.err"
+        data = result.binary if result.success else result.log.encode()
+        path = os.path.join(self.root, name)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        try:
+            with open(tmp_path, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            logger.error(f"Failed to store compile cache entry {name}: {e}")
+            return
+        self._evict()
+
+    def _evict(self) -> None:
+        """
+        Remove the least recently used entries until the directory fits into max_bytes.
+        The directory is scanned on every put; puts only follow cache misses, which cost a whole compilation.
+        """
+        entries = []
+        total = 0
+        for entry in os.scandir(self.root):
+            if not entry.name.endswith((".bin", ".err")):
+                continue
+            try:
+                stat = entry.stat()
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, entry.name, stat.st_size))
+            total += stat.st_size
+
+        for _, name, size in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            total -= size
+            try:
+                os.remove(os.path.join(self.root, name))
+            except OSError:
+                # Another process evicted it first
+                continue
+            logger.info(f"Evicted compile cache entry {name}")
+
+
+# Cache shared by the compilations of this process, created on first use so importing the compiler
+# does not create COMPILE_CACHE_DIR
+@lru_cache(maxsize=1)
+def get_compile_cache() -> CompileCache:
+    return CompileCache()
@@ -1,89 +1,312 @@
-import os
-import shlex
+import json
+import math
+import uuid
 import asyncio
+from typing import AsyncIterator, Hashable, Optional
+from config import Config
 from logging_config import setup_logging
+from compiler.pch import PCH_FLAGS, leading_includes, pch_name
+from compiler.checkers import DEFAULT_CHECKER
+from compiler.scheduler import grading_scheduler
+from compiler.compile_cache import CompileResult, get_compile_cache
+from compiler.workspace import Workspace
+from compiler.backends import SandboxBackend, get_sandbox_backend
 
 logger = setup_logging()
 
+# Limits for a single sandbox step
+COMPILE_TIMEOUT = 30
+RUN_TIMEOUT = 4
+DRIVER_OVERHEAD = 10
 
-async def run_c_task_in_sandbox(filename: str, test_cases: list[dict]) -> dict:
+# Bytes of a program's stdout kept by the driver; a program printing more is killed
+OUTPUT_LIMIT = 1024 * 1024
+# Characters of a program's output shown per test in the log
+LOG_OUTPUT_LIMIT = 500
+TRUNCATION_MARKER = "… [вывод обрезан]"
+
+# gcc flags of every build profile (SANDBOX_BUILD_PROFILE); "fast" also uses the precompiled headers
+BUILD_PROFILES = {
+    "default": [],
+    "fast": PCH_FLAGS
+}
+LINK_FLAGS = ["-lm"]
+
+# Grading policies: max_failures of None runs every test, K stops after K failed tests and skips the rest
+RUN_ALL_TESTS = None
+STOP_ON_FIRST_FAILURE = 1
+
+
+async def run_c_task_in_sandbox(source: bytes, test_cases: list[dict], user_id: Optional[Hashable] = None,
+                                backend: Optional[SandboxBackend] = None,
+                                max_failures: Optional[int] = RUN_ALL_TESTS) -> dict:
     """
-    Run C code in a sandboxed Docker environment and test against provided test cases.
-    :param filename: File path to the C source code.
+    Run C code in a sandbox and test against provided test cases.
+    :param source: C source code.
     :param test_cases: Test cases with 'input' and 'expected_output' keys.
-    :return: Log of results and counts of passed/total tests.
+    :param user_id: Owner of the submission, used for per-user fairness.
+    :param backend: Sandbox backend, the one selected by SANDBOX_BACKEND by default.
+    :param max_failures: Grading policy, see stream_c_task_in_sandbox.
+    :return: Final result of stream_c_task_in_sandbox.
+    """
+    result = {}
+    async for event in stream_c_task_in_sandbox(source, test_cases, user_id, backend, max_failures):
+        if event["type"] == "result":
+            result = event["result"]
+    return result
+
+
+async def stream_c_task_in_sandbox(source: bytes, test_cases: list[dict], user_id: Optional[Hashable] = None,
+                                   backend: Optional[SandboxBackend] = None,
+                                   max_failures: Optional[int] = RUN_ALL_TESTS) -> AsyncIterator[dict]:
+    """
+    Run C code in a sandbox and stream test results as they complete.
+    The code is compiled and tested in an isolated workspace of the sandbox backend;
+    test cases run concurrently within the slots granted by the grading scheduler.
+    :param source: C source code.
+    :param test_cases: Test cases with 'input' and 'expected_output' keys and optional 'checker'
+                       (see compiler/checkers.py) and 'tolerance' keys.
+    :param user_id: Owner of the submission, used for per-user fairness.
+    :param backend: Sandbox backend, the one selected by SANDBOX_BACKEND by default.
+    :param max_failures: Grading policy: stop after this many failed tests and report the tests that did not
+                         run as skipped (STOP_ON_FIRST_FAILURE for quick feedback); RUN_ALL_TESTS runs every test.
+    :return: {"type": "test", "test": {...}} for every finished test, in completion order, followed by
+             {"type": "result", "result": {...}} with the log, counts of passed/total/skipped tests, per-test results
+             with resource usage (CPU time, wall time, peak RSS, exit signal) and whether the result is
+             deterministic enough to be cached (no timeouts, skipped tests or sandbox failures).
+    """
+    backend = backend or get_sandbox_backend()
+    job_id = uuid.uuid4().hex
+    total = len(test_cases)
+    results: list[Optional[dict]] = [None] * total
+
+    async with grading_scheduler.slots(user_id, wanted=total) as jobs, backend.workspace(job_id) as workspace:
+        # Compilation step
+        build = await _compile(backend, workspace, source, job_id)
+        if not build.success:
+            yield {"type": "result", "result": {
+                "log": f"❌ Ошибка компиляции:\n{build.log}",
+                "passed": 0, "total": total, "skipped": 0, "tests": [], "cacheable": not build.timed_out
+            }}
+            return
+
+        # Test cases execution: all cases go to the sandbox driver in one invocation,
+        # which reports every case as soon as it finishes
+        cases = [
+            {
+                "input": str(t["input"]).strip() + "\n",
+                "expected": str(t["expected_output"]).strip(),
+                "checker": t.get("checker", DEFAULT_CHECKER),
+                "tolerance": t.get("tolerance")
+            }
+            for t in test_cases
+        ]
+        try:
+            async for res in _run_driver(backend, workspace, cases, jobs, max_failures):
+                results[res["index"]] = res
+                yield {"type": "test", "test": _test_summary(res["index"], test_cases[res["index"]], res)}
+        except (asyncio.TimeoutError, RuntimeError, ValueError, KeyError, IndexError) as e:
+            logger.error(f"Sandbox driver failed for job {job_id}: {e}")
+            results = None
+
+    if results is None or any(res is None for res in results):
+        yield {"type": "result", "result": {
+            "log": "❌ Ошибка тестирующей системы. Пожалуйста, попробуйте снова позже.",
+            "passed": 0, "total": total, "skipped": 0, "tests": [], "cacheable": False
+        }}
+        return
+
+    yield {"type": "result", "result": _build_result(job_id, test_cases, results)}
+
+
+async def run_c_program(source: bytes, inputs: list[str], user_id: Optional[Hashable] = None,
+                        backend: Optional[SandboxBackend] = None) -> dict:
+    """
+    Compile C code once and run it on every input in one batch, without checking the output.
+    :param source: C source code.
+    :param inputs: Inputs to run the program on.
+    :param user_id: Owner of the run, used for per-user fairness.
+    :param backend: Sandbox backend, the one selected by SANDBOX_BACKEND by default.
+    :return: {"compiled": bool, "log": compiler errors, "results": driver results (status, stdout, resource usage)
+             in input order, or None if the sandbox failed}.
+    """
+    backend = backend or get_sandbox_backend()
+    job_id = uuid.uuid4().hex
+    results: Optional[list[Optional[dict]]] = [None] * len(inputs)
+
+    async with grading_scheduler.slots(user_id, wanted=len(inputs)) as jobs, backend.workspace(job_id) as workspace:
+        build = await _compile(backend, workspace, source, job_id)
+        if not build.success:
+            return {"compiled": False, "log": build.log, "results": None}
+
+        try:
+            async for res in _run_driver(backend, workspace, [{"input": str(i).strip() + "\n"} for i in inputs], jobs):
+                results[res["index"]] = res
+        except (asyncio.TimeoutError, RuntimeError, ValueError, KeyError, IndexError) as e:
+            logger.error(f"Sandbox driver failed for job {job_id}: {e}")
+            results = None
+
+    if results is not None and any(res is None for res in results):
+        results = None
+    return {"compiled": True, "log": "", "results": results}
+
+
+async def _run_driver(backend: SandboxBackend, workspace: Workspace, cases: list[dict], jobs: int,
+                      max_failures: Optional[int] = RUN_ALL_TESTS) -> AsyncIterator[dict]:
+    """
+    Run ./user on all cases with the sandbox driver and yield its per-case results as they arrive.
     """
-    abs_path = os.path.abspath(filename)
-    workdir = os.path.dirname(abs_path)
+    job = {
+        "binary": "./user",
+        "timeout": RUN_TIMEOUT,
+        "jobs": jobs,
+        "rlimits": backend.rlimits,
+        "max_failures": max_failures,
+        "output_limit": OUTPUT_LIMIT,
+        "cases": cases
+    }
+    if backend.measure_path:
+        job["measure"] = backend.measure_path
+    async for line in workspace.exec_lines(
+            *backend.driver_command,
+            input_data=json.dumps(job).encode(),
+            timeout=RUN_TIMEOUT * math.ceil(len(cases) / jobs) + DRIVER_OVERHEAD
+    ):
+        yield json.loads(line)
+
+
+def _test_summary(index: int, test_case: dict, res: dict) -> dict:
+    return {
+        "index": index + 1,
+        "description": test_case.get("description", ""),
+        "passed": res["passed"],
+        "status": res["status"],
+        "exit_code": res["exit_code"],
+        "signal": res["signal"],
+        "cpu_time": res["cpu_time"],
+        "wall_time": res["wall_time"],
+        "max_rss_kb": res["max_rss_kb"]
+    }
+
+
+def _build_result(job_id: str, test_cases: list[dict], results: list[dict]) -> dict:
     log_lines = []
+    tests = []
     passed = 0
+    skipped = 0
     total = len(test_cases)
 
-    # Compilation step
-    compile_cmd = f"docker run --rm --network none --pids-limit 64 --memory 256m --memory-swap 256m " \
-                  f"--cpus 0.5 --read-only --tmpfs /tmp:exec,mode=1777 --security-opt no-new-privileges:true " \
-                  f"--cap-drop ALL -v {workdir}:/sandbox:rw -w /sandbox c-sandbox " \
-                  f"gcc {shlex.quote(os.path.basename(filename))} -o user -lm 2> app.log"
-
-    compile_proc = await asyncio.create_subprocess_shell(
-        compile_cmd,
-        stdout=asyncio.subprocess.PIPE,
-        stderr=asyncio.subprocess.PIPE
-    )
-
-    logger.info(f"Compiling {filename} in sandbox...")
-    await compile_proc.wait()
-
-    if compile_proc.returncode != 0:
-        logger.error(f"Compilation failed for {filename} in sandbox with return code {compile_proc.returncode}.")
-        err_path = os.path.join(workdir, "app.log")
-        err = ""
-        if os.path.exists(err_path):
-            with open(err_path) as f:
-                err = f.read()
-        log_lines.append(f"❌ Ошибка компиляции:\n{err}")
-        return {"log": "\n".join(log_lines), "passed": 0, "total": total}
-    else:
-        logger.info(f"Successfully compiled {filename} in sandbox.")
-
-    # Test cases execution
-    for i, t in enumerate(test_cases, start=1):
+    for i, (t, res) in enumerate(zip(test_cases, results), start=1):
         input_data = str(t["input"]).strip()
         expected = str(t["expected_output"]).strip()
+        test = _test_summary(i - 1, t, res)
+        tests.append(test)
 
-        run_cmd = f'docker run --rm --network none --pids-limit 64 --memory 128m --memory-swap 128m ' \
-                  f'--cpus 0.5 --read-only --tmpfs /tmp:exec,mode=1777 --security-opt no-new-privileges:true ' \
-                  f'--cap-drop ALL -v {workdir}:/sandbox:rw -w /sandbox c-sandbox ' \
-                  f'/bin/bash -c "echo {shlex.quote(input_data)} | ./user"'
-
-        proc = await asyncio.create_subprocess_shell(
-            run_cmd,
-            stdin=asyncio.subprocess.PIPE,
-            stdout=asyncio.subprocess.PIPE,
-            stderr=asyncio.subprocess.PIPE
-        )
+        if res["status"] == "skipped":
+            skipped += 1
+            log_lines.append(f"Тест {i}: {t.get('description', '')}\n    ⏭ Пропущен\n")
+            continue
 
-        try:
-            stdout, stderr = await asyncio.wait_for(proc.communicate(input_data.encode()), timeout=4)
-        except asyncio.TimeoutError:
-            await proc.kill()
+        if res["status"] == "timeout":
             log_lines.append(f"Тест {i}: {t.get('description', '')}\n    ❌ Превышено время выполнения\n")
             continue
 
-        stdout_str = stdout.decode().strip()
-        correct = stdout_str == expected
+        stdout_str = _clip(res["stdout"].strip(), res["stdout_truncated"])
+        correct = test["passed"]
         symbol = "✅" if correct else "❌"
         if correct:
             passed += 1
 
         log_lines.append(f"Тест {i}")
         log_lines.append(f"{symbol} Ввод: {input_data}")
-        log_lines.append(f"Ожидалось: {expected}\n"
+        log_lines.append(f"Ожидалось: {_clip(expected)}\n"
                          f"Получено: {stdout_str}")
-        if stderr:
-            log_lines.append(f"    (stderr): {stderr.decode().strip()}")
+        if res["status"] == "output_limit":
+            log_lines.append(f"    ❌ Превышен лимит вывода ({OUTPUT_LIMIT // 1024} КБ), программа остановлена")
+        elif res["status"] == "wrong_answer":
+            log_lines.append("    Вывод разошёлся с ожидаемым, программа остановлена")
+        if res["stderr"]:
+            log_lines.append(f"    (stderr): {_clip(res['stderr'].strip(), res['stderr_truncated'])}")
+        if res["signal"] and res["status"] == "runtime_error":
+            log_lines.append(f"    Программа завершена сигналом {res['signal']}")
+        if res["cpu_time"] is not None:
+            log_lines.append(f"    ⏱ Время: {res['cpu_time']:.3f} с, память: {res['max_rss_kb'] / 1024:.1f} МБ")
         log_lines.append("")
 
     log_lines.append(f"📊 Результат: {passed}/{total} тестов пройдено.")
+    if skipped:
+        log_lines.append(f"⏭ Проверка остановлена досрочно (неудачных тестов: {total - passed - skipped}), "
+                         f"пропущено тестов: {skipped}.")
+
+    measured = [test for test in tests if test["cpu_time"] is not None]
+    if measured:
+        logger.info(f"Job {job_id}: max CPU time {max(t['cpu_time'] for t in measured):.3f}s, "
+                    f"max wall time {max(t['wall_time'] for t in measured):.3f}s, "
+                    f"peak RSS {max(t['max_rss_kb'] for t in measured)} KB.")
+
+    # Which tests are skipped depends on the order parallel tests finish in
+    cacheable = all(res["status"] not in ("timeout", "skipped") for res in results)
+    return {"log": "\n".join(log_lines), "passed": passed, "total": total, "skipped": skipped, "tests": tests,
+            "cacheable": cacheable}
+
+
+def _clip(text: str, truncated: bool = False) -> str:
+    if len(text) > LOG_OUTPUT_LIMIT:
+        return text[:LOG_OUTPUT_LIMIT] + TRUNCATION_MARKER
+    return text + TRUNCATION_MARKER if truncated else text
+
+
+def build_flags(backend: SandboxBackend, source: bytes, profile: str = Config.SANDBOX_BUILD_PROFILE) -> list[str]:
+    """
+    Build the gcc command line arguments that compile main.c into ./user.
+    :param backend: Sandbox backend the build runs in.
+    :param source: C source code, checked for includes that have precompiled headers.
+    :param profile: Build profile from BUILD_PROFILES.
+    """
+    flags = list(BUILD_PROFILES[profile])
+    headers = leading_includes(source)
+    if profile == "fast" and backend.pch_dir and headers:
+        flags += ["-include", f"{backend.pch_dir}/{pch_name(headers)}"]
+    return [*flags, "main.c", "-o", "user", *LINK_FLAGS]
+
+
+async def _compile(backend: SandboxBackend, workspace: Workspace, source: bytes, job_id: str) -> CompileResult:
+    """
+    Build the source into ./user inside the workspace, reusing a cached build when the same
+    source was already compiled with the same flags and toolchain.
+    :param backend: Sandbox backend the workspace belongs to.
+    :param workspace: Job workspace.
+    :param source: C source code.
+    :param job_id: Job identifier used in log messages.
+    :return: Compilation result.
+    """
+    compile_cache = get_compile_cache()
+    flags = build_flags(backend, source)
+    key = compile_cache.key(source, flags, await backend.fingerprint())
+    cached = compile_cache.get(key)
+    if cached is not None:
+        logger.info(f"Compile cache hit for job {job_id}.")
+        if cached.success:
+            await workspace.write("user", cached.binary, executable=True)
+        return cached
+
+    await workspace.write("main.c", source)
+
+    logger.info(f"Compiling job {job_id} in sandbox workspace {workspace.path}...")
+    try:
+        rc, _, stderr = await workspace.exec("gcc", *flags, timeout=COMPILE_TIMEOUT)
+    except asyncio.TimeoutError:
+        # Timeouts depend on host load, so they are not cached
+        logger.error(f"Compilation timed out for job {job_id} in sandbox.")
+        return CompileResult(success=False, log="Превышено время компиляции", timed_out=True)
+
+    if rc != 0:
+        logger.error(f"Compilation failed for job {job_id} in sandbox with return code {rc}.")
+        result = CompileResult(success=False, log=stderr.decode(errors="replace"))
+    else:
+        logger.info(f"Successfully compiled job {job_id} in sandbox.")
+        result = CompileResult(success=True, binary=await workspace.read("user"))
 
-    return {"log": "\n".join(log_lines), "passed": passed, "total": total}
+    # The eviction scans the cache directory, keep it off the event loop
+    await asyncio.to_thread(compile_cache.put, key, result)
+    return result
@@ -0,0 +1,336 @@
+// Confinement launcher of the native sandbox backend (compiler/backends/native.py).
+// Usage: confine [-c <cgroup>] [-s <seccomp-bpf>] [-n [-r <root> [-b <path>]... [-w <path>]...]] -- <program> [args...]
+// Sets up the sandbox and execs the program (looked up in PATH) with the launcher's stdio, environment
+// and working directory:
+//   -c  moves the launcher into a cgroup v2 directory, so everything the program starts is limited by it;
+//   -n  moves it into fresh user, PID, mount, network, IPC and UTS namespaces. The program runs under a small
+//       init (pid 1 of the new PID namespace) and cannot see or signal processes outside of it; when the
+//       program exits or the launcher is killed, everything left in the namespace is killed too;
+//   -r  with -n, an empty directory that becomes the root filesystem: a read-only tmpfs holding only the
+//       -b paths (bound read-only), the -w paths (bound read-write), /dev/null, /dev/zero, /dev/urandom and
+//       /proc of the new PID namespace, each at its host location;
+//   -s  a seccomp filter (raw BPF as exported by libseccomp) loaded right before exec.
+// The program also loses every capability and gets no_new_privs and RLIMIT_CORE 0. This is a separate
+// executable because the setup cannot safely run in a preexec hook of the multithreaded Python worker.
+// Exits with the program's exit code, 128 + signal if it was killed, or 125 if the setup failed.
+#define _GNU_SOURCE
+#include <errno.h>
+#include <fcntl.h>
+#include <limits.h>
+#include <sched.h>
+#include <signal.h>
+#include <stdio.h>
+#include <stdlib.h>
+#include <string.h>
+#include <linux/capability.h>
+#include <linux/filter.h>
+#include <linux/seccomp.h>
+#include <sys/mount.h>
+#include <sys/prctl.h>
+#include <sys/resource.h>
+#include <sys/stat.h>
+#include <sys/statvfs.h>
+#include <sys/syscall.h>
+#include <sys/wait.h>
+#include <unistd.h>
+
+#define SETUP_FAILED 125
+#define MAX_BINDS 64
+
+static const char *DEVICES[] = {"/dev/null", "/dev/zero", "/dev/urandom"};
+
+static struct { const char *path; int writable; } binds[MAX_BINDS];
+static int bind_count = 0;
+static volatile pid_t child = 0;
+
+static void die(const char *what) {
+    fprintf(stderr, "confine: %s: %s\n", what, strerror(errno));
+    exit(SETUP_FAILED);
+}
+
+static void usage(const char *name) {
+    fprintf(stderr, "usage: %s [-c <cgroup>] [-s <seccomp-bpf>] [-n [-r <root> [-b <path>]... [-w <path>]...]] "
+                    "-- <program> [args...]\n", name);
+    exit(SETUP_FAILED);
+}
+
+static void kill_child(int sig) {
+    (void) sig;
+    if (child > 0) {
+        kill(child, SIGKILL);
+    }
+}
+
+static void write_file(const char *path, const char *data) {
+    int fd = open(path, O_WRONLY | O_CLOEXEC);
+    if (fd < 0 || write(fd, data, strlen(data)) != (ssize_t) strlen(data)) {
+        die(path);
+    }
+    close(fd);
+}
+
+static struct sock_fprog read_filter(const char *path) {
+    struct sock_fprog program = {0};
+    FILE *file = fopen(path, "rb");
+    if (file == NULL) {
+        die(path);
+    }
+    struct stat st;
+    if (fstat(fileno(file), &st) != 0 || st.st_size == 0 || st.st_size % sizeof(struct sock_filter) != 0) {
+        errno = EINVAL;
+        die(path);
+    }
+    program.len = (unsigned short) (st.st_size / sizeof(struct sock_filter));
+    program.filter = malloc(st.st_size);
+    if (program.filter == NULL || fread(program.filter, 1, st.st_size, file) != (size_t) st.st_size) {
+        die(path);
+    }
+    fclose(file);
+    return program;
+}
+
+static void exit_like(int status) {
+    exit(WIFEXITED(status) ? WEXITSTATUS(status) : 128 + WTERMSIG(status));
+}
+
+// mkdir -p of a path inside the new root
+static void make_dirs(char *path) {
+    for (char *p = strchr(path + 1, '/'); p != NULL; p = strchr(p + 1, '/')) {
+        *p = '\0';
+        if (mkdir(path, 0755) != 0 && errno != EEXIST) {
+            die(path);
+        }
+        *p = '/';
+    }
+}
+
+static void bind_path(const char *root, const char *path, int writable) {
+    char source[PATH_MAX], target[PATH_MAX];
+    struct stat st;
+    if (lstat(path, &st) != 0) {
+        // Optional host paths such as /lib32
+        return;
+    }
+    if (S_ISLNK(st.st_mode)) {
+        // Top-level links such as /bin -> usr/bin are recreated as they are
+        char link[PATH_MAX];
+        ssize_t length = readlink(path, link, sizeof(link) - 1);
+        if (length < 0) {
+            die(path);
+        }
+        link[length] = '\0';
+        snprintf(target, sizeof(target), "%s%s", root, path);
+        make_dirs(target);
+        if (symlink(link, target) != 0 && errno != EEXIST) {
+            die(target);
+        }
+        return;
+    }
+    if (realpath(path, source) == NULL || stat(source, &st) != 0) {
+        die(path);
+    }
+    snprintf(target, sizeof(target), "%s%s", root, source);
+    make_dirs(target);
+    if (S_ISDIR(st.st_mode)) {
+        if (mkdir(target, 0755) != 0 && errno != EEXIST) {
+            die(target);
+        }
+    } else {
+        int fd = open(target, O_WRONLY | O_CREAT | O_CLOEXEC, 0644);
+        if (fd < 0) {
+            die(target);
+        }
+        close(fd);
+    }
+    if (mount(source, target, NULL, MS_BIND, NULL) != 0) {
+        die(source);
+    }
+    if (!writable) {
+        // A remount inside a user namespace must keep the flags the host mount is locked with
+        unsigned long flags = MS_BIND | MS_REMOUNT | MS_RDONLY;
+        struct statvfs vfs;
+        if (statvfs(source, &vfs) == 0) {
+            flags |= (vfs.f_flag & ST_NOSUID ? MS_NOSUID : 0) | (vfs.f_flag & ST_NODEV ? MS_NODEV : 0)
+                   | (vfs.f_flag & ST_NOEXEC ? MS_NOEXEC : 0) | (vfs.f_flag & ST_NOATIME ? MS_NOATIME : 0)
+                   | (vfs.f_flag & ST_NODIRATIME ? MS_NODIRATIME : 0) | (vfs.f_flag & ST_RELATIME ? MS_RELATIME : 0);
+        }
+        if (mount(NULL, target, NULL, flags, NULL) != 0) {
+            die(target);
+        }
+    }
+}
+
+static void build_root(const char *root) {
+    char cwd[PATH_MAX], proc[PATH_MAX];
+    if (getcwd(cwd, sizeof(cwd)) == NULL) {
+        die("getcwd");
+    }
+    if (mount(NULL, "/", NULL, MS_REC | MS_PRIVATE, NULL) != 0) {
+        die("make mounts private");
+    }
+    if (mount("tmpfs", root, "tmpfs", MS_NOSUID | MS_NODEV, "mode=755,size=1m") != 0) {
+        die(root);
+    }
+    for (int i = 0; i < bind_count; i++) {
+        bind_path(root, binds[i].path, binds[i].writable);
+    }
+    for (size_t i = 0; i < sizeof(DEVICES) / sizeof(DEVICES[0]); i++) {
+        bind_path(root, DEVICES[i], 1);
+    }
+    snprintf(proc, sizeof(proc), "%s/proc", root);
+    if (mkdir(proc, 0555) != 0 || mount("proc", proc, "proc", MS_NOSUID | MS_NODEV | MS_NOEXEC, NULL) != 0) {
+        die(proc);
+    }
+
+    if (chdir(root) != 0 || syscall(SYS_pivot_root, ".", ".") != 0 || umount2(".", MNT_DETACH) != 0) {
+        die("pivot_root");
+    }
+    if (mount(NULL, "/", NULL, MS_BIND | MS_REMOUNT | MS_RDONLY | MS_NOSUID | MS_NODEV, NULL) != 0) {
+        die("remount / read-only");
+    }
+    if (chdir(cwd) != 0) {
+        die(cwd);
+    }
+}
+
+static void drop_privileges(void) {
+    struct __user_cap_header_struct header = {_LINUX_CAPABILITY_VERSION_3, 0};
+    struct __user_cap_data_struct data[_LINUX_CAPABILITY_U32S_3] = {{0}};
+    if (prctl(PR_SET_NO_NEW_PRIVS, 1, 0, 0, 0) != 0 || syscall(SYS_capset, &header, data) != 0) {
+        die("drop capabilities");
+    }
+}
+
+static void run(char **program, const struct sock_fprog *filter) {
+    drop_privileges();
+    if (filter->len > 0 && prctl(PR_SET_SECCOMP, SECCOMP_MODE_FILTER, filter) != 0) {
+        die("seccomp");
+    }
+    execvp(program[0], program);
+    die(program[0]);
+}
+
+// pid 1 of the new PID namespace: runs the program and reaps everything reparented to it
+static void init(char **program, const struct sock_fprog *filter, const char *root, int parent_alive) {
+    if (prctl(PR_SET_PDEATHSIG, SIGKILL, 0, 0, 0) != 0) {
+        die("prctl");
+    }
+    // The launcher may have been killed before PR_SET_PDEATHSIG took effect
+    char byte;
+    if (read(parent_alive, &byte, 1) == 0) {
+        exit(SETUP_FAILED);
+    }
+    if (root != NULL) {
+        build_root(root);
+    }
+
+    pid_t pid = fork();
+    if (pid < 0) {
+        die("fork");
+    }
+    if (pid == 0) {
+        run(program, filter);
+    }
+    int status;
+    pid_t exited;
+    // Leaving pid 1 kills whatever the program left behind
+    while ((exited = wait(&status)) != pid) {
+        if (exited < 0 && errno != EINTR) {
+            die("wait");
+        }
+    }
+    exit_like(status);
+}
+
+int main(int argc, char **argv) {
+    const char *cgroup = NULL, *root = NULL;
+    struct sock_fprog filter = {0};
+    int namespaces = 0, opt;
+    while ((opt = getopt(argc, argv, "+c:s:nr:b:w:")) != -1) {
+        switch (opt) {
+            case 'c':
+                cgroup = optarg;
+                break;
+            case 's':
+                filter = read_filter(optarg);
+                break;
+            case 'n':
+                namespaces = 1;
+                break;
+            case 'r':
+                root = optarg;
+                break;
+            case 'b':
+            case 'w':
+                if (bind_count == MAX_BINDS) {
+                    usage(argv[0]);
+                }
+                binds[bind_count].path = optarg;
+                binds[bind_count++].writable = opt == 'w';
+                break;
+            default:
+                usage(argv[0]);
+        }
+    }
+    if (optind >= argc || (root != NULL && !namespaces)) {
+        usage(argv[0]);
+    }
+    char **program = argv + optind;
+
+    struct rlimit no_core = {0, 0};
+    if (setrlimit(RLIMIT_CORE, &no_core) != 0) {
+        die("setrlimit");
+    }
+    if (cgroup != NULL) {
+        char procs[PATH_MAX];
+        snprintf(procs, sizeof(procs), "%s/cgroup.procs", cgroup);
+        write_file(procs, "0");
+    }
+    if (!namespaces) {
+        run(program, &filter);
+    }
+
+    uid_t uid = getuid();
+    gid_t gid = getgid();
+    if (unshare(CLONE_NEWUSER | CLONE_NEWPID | CLONE_NEWNS | CLONE_NEWNET | CLONE_NEWIPC | CLONE_NEWUTS) != 0) {
+        die("unshare");
+    }
+    char map[64];
+    write_file("/proc/self/setgroups", "deny");
+    snprintf(map, sizeof(map), "%u %u 1", uid, uid);
+    write_file("/proc/self/uid_map", map);
+    snprintf(map, sizeof(map), "%u %u 1", gid, gid);
+    write_file("/proc/self/gid_map", map);
+
+    int alive[2];
+    if (pipe2(alive, O_CLOEXEC) != 0) {
+        die("pipe");
+    }
+    sigset_t term, old;
+    sigemptyset(&term);
+    sigaddset(&term, SIGTERM);
+    sigprocmask(SIG_BLOCK, &term, &old);
+    signal(SIGTERM, kill_child);
+
+    child = fork();
+    if (child < 0) {
+        die("fork");
+    }
+    if (child == 0) {
+        signal(SIGTERM, SIG_DFL);
+        sigprocmask(SIG_SETMASK, &old, NULL);
+        close(alive[1]);
+        fcntl(alive[0], F_SETFL, O_NONBLOCK);
+        init(program, &filter, root, alive[0]);
+    }
+    sigprocmask(SIG_SETMASK, &old, NULL);
+    close(alive[0]);
+
+    int status;
+    while (waitpid(child, &status, 0) < 0) {
+        if (errno != EINTR) {
+            die("waitpid");
+        }
+    }
+    exit_like(status);
+}
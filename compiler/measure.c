@@ -0,0 +1,193 @@
+// Resource-measuring launcher used by compiler/sandbox_driver.py.
+// Usage: measure [-l <RLIMIT_NAME>=<value>]... <report-fd> <program> [args...]
+// Runs the program with the launcher's stdio and writes "<wait-status> <utime-us> <stime-us> <maxrss-kb>"
+// to <report-fd> when it exits. The program is forked from this small process rather than from the
+// Python driver, so its peak RSS is not inflated by the interpreter's memory. SIGTERM is forwarded
+// to the program as SIGKILL, which lets the driver enforce timeouts and still get a report.
+// Before exec the program gets the -l resource limits and a seccomp filter that lets it signal only
+// itself: kill(), tkill(), tgkill() and sigqueue() aimed at any other process fail with EPERM, and so do
+// pidfd_open() and pidfd_send_signal() on any process, so a submission cannot kill this launcher,
+// the driver or anything else running as the same user.
+#define _GNU_SOURCE
+#include <errno.h>
+#include <signal.h>
+#include <stddef.h>
+#include <stdio.h>
+#include <stdlib.h>
+#include <string.h>
+#include <endian.h>
+#include <linux/audit.h>
+#include <linux/filter.h>
+#include <linux/seccomp.h>
+#include <sys/prctl.h>
+#include <sys/resource.h>
+#include <sys/syscall.h>
+#include <sys/wait.h>
+#include <unistd.h>
+
+#if defined(__x86_64__)
+#define AUDIT_ARCH_CURRENT AUDIT_ARCH_X86_64
+#elif defined(__aarch64__)
+#define AUDIT_ARCH_CURRENT AUDIT_ARCH_AARCH64
+#else
+#error "measure.c: unsupported architecture"
+#endif
+
+#if __BYTE_ORDER == __LITTLE_ENDIAN
+#define ARG0_LOW offsetof(struct seccomp_data, args[0])
+#else
+#define ARG0_LOW (offsetof(struct seccomp_data, args[0]) + sizeof(__u32))
+#endif
+
+// Same numbers on every architecture; older libc headers may lack them
+#ifndef SYS_pidfd_send_signal
+#define SYS_pidfd_send_signal 424
+#endif
+#ifndef SYS_pidfd_open
+#define SYS_pidfd_open 434
+#endif
+
+#define MAX_LIMITS 16
+#define MAX_FILTER 64
+
+static const struct { const char *name; int resource; } RESOURCES[] = {
+    {"RLIMIT_AS", RLIMIT_AS}, {"RLIMIT_CORE", RLIMIT_CORE}, {"RLIMIT_CPU", RLIMIT_CPU},
+    {"RLIMIT_DATA", RLIMIT_DATA}, {"RLIMIT_FSIZE", RLIMIT_FSIZE}, {"RLIMIT_NOFILE", RLIMIT_NOFILE},
+    {"RLIMIT_NPROC", RLIMIT_NPROC}, {"RLIMIT_STACK", RLIMIT_STACK}
+};
+
+// Syscalls whose first argument is the pid (or thread id) being signalled
+static const int SIGNAL_SYSCALLS[] = {SYS_kill, SYS_tkill, SYS_tgkill, SYS_rt_sigqueueinfo, SYS_rt_tgsigqueueinfo};
+
+// Syscalls that signal through a pidfd (or a /proc/<pid> directory fd), which the pid check cannot see
+static const int PIDFD_SYSCALLS[] = {SYS_pidfd_open, SYS_pidfd_send_signal};
+
+static volatile pid_t child = 0;
+
+static void kill_child(int sig) {
+    (void) sig;
+    if (child > 0) {
+        kill(child, SIGKILL);
+    }
+}
+
+static int parse_limit(const char *spec, int *resource, rlim_t *value) {
+    const char *eq = strchr(spec, '=');
+    if (eq == NULL) {
+        return -1;
+    }
+    for (size_t i = 0; i < sizeof(RESOURCES) / sizeof(RESOURCES[0]); i++) {
+        if (strlen(RESOURCES[i].name) == (size_t) (eq - spec) && strncmp(spec, RESOURCES[i].name, eq - spec) == 0) {
+            *resource = RESOURCES[i].resource;
+            *value = strtoull(eq + 1, NULL, 10);
+            return 0;
+        }
+    }
+    return -1;
+}
+
+// Runs in the forked child right before exec; the launcher is single-threaded, so anything goes here
+static int deny_foreign_signals(pid_t self) {
+    size_t signal_count = sizeof(SIGNAL_SYSCALLS) / sizeof(SIGNAL_SYSCALLS[0]);
+    size_t pidfd_count = sizeof(PIDFD_SYSCALLS) / sizeof(PIDFD_SYSCALLS[0]);
+    struct sock_filter filter[MAX_FILTER];
+    size_t n = 0;
+
+    filter[n++] = (struct sock_filter) BPF_STMT(BPF_LD | BPF_W | BPF_ABS, offsetof(struct seccomp_data, arch));
+    filter[n++] = (struct sock_filter) BPF_JUMP(BPF_JMP | BPF_JEQ | BPF_K, AUDIT_ARCH_CURRENT, 1, 0);
+    filter[n++] = (struct sock_filter) BPF_STMT(BPF_RET | BPF_K, SECCOMP_RET_KILL_PROCESS);
+    filter[n++] = (struct sock_filter) BPF_STMT(BPF_LD | BPF_W | BPF_ABS, offsetof(struct seccomp_data, nr));
+#if defined(__x86_64__)
+    // x32 syscall numbers would slip past the checks below
+    filter[n++] = (struct sock_filter) BPF_JUMP(BPF_JMP | BPF_JGE | BPF_K, 0x40000000, signal_count + pidfd_count + 4, 0);
+#endif
+    // A match jumps over the remaining comparisons and the ALLOW to the pid check
+    for (size_t i = 0; i < signal_count; i++) {
+        filter[n++] = (struct sock_filter) BPF_JUMP(BPF_JMP | BPF_JEQ | BPF_K, SIGNAL_SYSCALLS[i],
+                                                    signal_count - i + pidfd_count, 0);
+    }
+    // A match jumps straight to the EPERM at the end
+    for (size_t i = 0; i < pidfd_count; i++) {
+        filter[n++] = (struct sock_filter) BPF_JUMP(BPF_JMP | BPF_JEQ | BPF_K, PIDFD_SYSCALLS[i],
+                                                    pidfd_count - i + 3, 0);
+    }
+    filter[n++] = (struct sock_filter) BPF_STMT(BPF_RET | BPF_K, SECCOMP_RET_ALLOW);
+    // The kernel only looks at the low 32 bits of a pid argument
+    filter[n++] = (struct sock_filter) BPF_STMT(BPF_LD | BPF_W | BPF_ABS, ARG0_LOW);
+    filter[n++] = (struct sock_filter) BPF_JUMP(BPF_JMP | BPF_JEQ | BPF_K, (__u32) self, 0, 1);
+    filter[n++] = (struct sock_filter) BPF_STMT(BPF_RET | BPF_K, SECCOMP_RET_ALLOW);
+    filter[n++] = (struct sock_filter) BPF_STMT(BPF_RET | BPF_K, SECCOMP_RET_ERRNO | (EPERM & SECCOMP_RET_DATA));
+
+    struct sock_fprog program = {.len = (unsigned short) n, .filter = filter};
+    if (prctl(PR_SET_NO_NEW_PRIVS, 1, 0, 0, 0) != 0) {
+        return -1;
+    }
+    return prctl(PR_SET_SECCOMP, SECCOMP_MODE_FILTER, &program);
+}
+
+int main(int argc, char **argv) {
+    int resources[MAX_LIMITS];
+    rlim_t values[MAX_LIMITS];
+    int limit_count = 0;
+    int opt;
+    while ((opt = getopt(argc, argv, "+l:")) != -1) {
+        if (opt != 'l' || limit_count == MAX_LIMITS
+            || parse_limit(optarg, &resources[limit_count], &values[limit_count]) != 0) {
+            fprintf(stderr, "usage: %s [-l <RLIMIT_NAME>=<value>]... <report-fd> <program> [args...]\n", argv[0]);
+            return 2;
+        }
+        limit_count++;
+    }
+    if (argc - optind < 2) {
+        fprintf(stderr, "usage: %s [-l <RLIMIT_NAME>=<value>]... <report-fd> <program> [args...]\n", argv[0]);
+        return 2;
+    }
+    int report_fd = atoi(argv[optind]);
+    char **program = argv + optind + 1;
+
+    sigset_t term, old;
+    sigemptyset(&term);
+    sigaddset(&term, SIGTERM);
+    sigprocmask(SIG_BLOCK, &term, &old);
+    signal(SIGTERM, kill_child);
+
+    child = fork();
+    if (child < 0) {
+        perror("fork");
+        return 2;
+    }
+    if (child == 0) {
+        close(report_fd);
+        signal(SIGTERM, SIG_DFL);
+        sigprocmask(SIG_SETMASK, &old, NULL);
+        for (int i = 0; i < limit_count; i++) {
+            struct rlimit limit = {values[i], values[i]};
+            if (setrlimit(resources[i], &limit) != 0) {
+                perror("setrlimit");
+                _exit(127);
+            }
+        }
+        if (deny_foreign_signals(getpid()) != 0) {
+            perror("seccomp");
+            _exit(127);
+        }
+        execv(program[0], program);
+        _exit(127);
+    }
+    sigprocmask(SIG_SETMASK, &old, NULL);
+
+    int status;
+    struct rusage usage;
+    while (wait4(child, &status, 0, &usage) < 0) {
+        if (errno != EINTR) {
+            perror("wait4");
+            return 2;
+        }
+    }
+
+    dprintf(report_fd, "%d %ld %ld %ld\n", status,
+            (long) usage.ru_utime.tv_sec * 1000000L + usage.ru_utime.tv_usec,
+            (long) usage.ru_stime.tv_sec * 1000000L + usage.ru_stime.tv_usec,
+            usage.ru_maxrss);
+    return 0;
+}
@@ -0,0 +1,63 @@
+# Precompiled headers for the common include set of student programs.
+# For every combination of PCH_HEADERS a wrapper header (e.g. pch-math-stdio.h) and its precompiled .gch
+# are built once per sandbox; submissions whose includes all come first and are all from PCH_HEADERS are
+# compiled with -include of the matching wrapper, so gcc loads the .gch instead of parsing the headers.
+# Because the wrapper includes exactly the submission's own headers ahead of them, the program means the
+# same thing with and without it. Run as a script to build: python3 pch.py <output-dir>
+# Used by the Dockerfile, so this module must only use the standard library.
+import os
+import re
+import sys
+import itertools
+import subprocess
+from typing import Optional
+
+# Standard headers that have precompiled versions
+PCH_HEADERS = ["math.h", "stdio.h", "stdlib.h", "string.h"]
+
+# gcc flags the headers are precompiled with; compilations using the headers must pass the same flags
+PCH_FLAGS = ["-pipe", "-g0"]
+
+_INCLUDE = re.compile(rb"#\s*include\s*<([\w./]+)>")
+_COMMENTS = re.compile(rb"/\*.*?\*/|//[^\n]*", re.DOTALL)
+
+
+def pch_name(headers: tuple[str, ...]) -> str:
+    return "pch-" + "-".join(h[:-2] for h in sorted(headers)) + ".h"
+
+
+def leading_includes(source: bytes) -> Optional[tuple[str, ...]]:
+    """
+    Find the standard headers a source starts with.
+    :return: Sorted headers if the source begins with includes of PCH_HEADERS only, otherwise None.
+    """
+    headers = set()
+    for line in _COMMENTS.sub(b"", source).splitlines():
+        line = line.strip()
+        if not line:
+            continue
+        match = _INCLUDE.fullmatch(line)
+        if match is None:
+            break
+        header = match.group(1).decode()
+        if header not in PCH_HEADERS:
+            return None
+        headers.add(header)
+    return tuple(sorted(headers)) or None
+
+
+def build(output_dir: str, gcc: str = "gcc") -> None:
+    """
+    Write the wrapper header and its .gch for every combination of PCH_HEADERS into output_dir.
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    for size in range(1, len(PCH_HEADERS) + 1):
+        for headers in itertools.combinations(PCH_HEADERS, size):
+            path = os.path.join(output_dir, pch_name(headers))
+            with open(path, "w") as f:
+                f.writelines(f"#include <{header}>\n" for header in headers)
+            subprocess.run([gcc, *PCH_FLAGS, "-x", "c-header", path, "-o", path + ".gch"], check=True)
+
+
+if __name__ == "__main__":
+    build(sys.argv[1])
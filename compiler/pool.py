@@ -0,0 +1,205 @@
+import asyncio
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Optional
+from config import Config
+from logging_config import setup_logging
+from compiler.process import run_process, stream_process_lines
+from compiler.scheduler import JOB_CPUS, JOB_MEMORY
+
+logger = setup_logging()
+
+# Locked-down container settings shared by every sandbox in the pool; CPU and memory cover the test slots of a job
+CONTAINER_OPTIONS = [
+    "--network", "none",
+    "--pids-limit", "64",
+    "--memory", str(JOB_MEMORY),
+    "--memory-swap", str(JOB_MEMORY),
+    "--cpus", f"{JOB_CPUS:g}",
+    "--read-only",
+    "--tmpfs", "/tmp:exec,mode=1777",
+    "--tmpfs", "/sandbox:exec,mode=1777,size=64m",
+    "--security-opt", "no-new-privileges:true",
+    "--cap-drop", "ALL",
+    "-w", "/sandbox",
+]
+
+# Removes everything a submission left behind: stray processes and files in the tmpfs mounts
+RESET_SCRIPT = "kill -9 -1 2>/dev/null; rm -rf /sandbox/* /sandbox/.[!.]* /tmp/* /tmp/.[!.]* 2>/dev/null; true"
+
+
+# SandboxContainer wraps a single pre-started sandbox container and runs commands in it via docker exec.
+class SandboxContainer:
+    def __init__(self, container_id: str):
+        self.container_id = container_id
+        self.uses = 0
+
+    async def exec(self, *cmd: str, input_data: Optional[bytes] = None, timeout: Optional[float] = None,
+                   workdir: Optional[str] = None) -> tuple[int, bytes, bytes]:
+        """
+        Execute a command inside the container.
+        :param cmd: Command and its arguments.
+        :param input_data: Bytes passed to the command's stdin.
+        :param timeout: Host-side timeout in seconds.
+        :param workdir: Working directory of the command inside the container.
+        :return: Return code, stdout and stderr of the command.
+        """
+        args = ["docker", "exec"]
+        if input_data is not None:
+            args.append("-i")
+        if workdir is not None:
+            args += ["-w", workdir]
+        return await run_process([*args, self.container_id, *cmd], input_data=input_data, timeout=timeout)
+
+    def exec_lines(self, *cmd: str, input_data: Optional[bytes] = None, timeout: Optional[float] = None,
+                   workdir: Optional[str] = None) -> AsyncIterator[bytes]:
+        """
+        Execute a command inside the container and yield its stdout line by line as it is produced.
+        :param cmd: Command and its arguments.
+        :param input_data: Bytes passed to the command's stdin.
+        :param timeout: Host-side timeout in seconds for the whole command.
+        :param workdir: Working directory of the command inside the container.
+        """
+        args = ["docker", "exec", "-i"]
+        if workdir is not None:
+            args += ["-w", workdir]
+        return stream_process_lines([*args, self.container_id, *cmd], input_data=input_data, timeout=timeout)
+
+    async def read_file(self, path: str) -> bytes:
+        rc, stdout, stderr = await self.exec("cat", path)
+        if rc != 0:
+            raise RuntimeError(f"Failed to read {path} from sandbox {self.container_id}: {stderr.decode()}")
+        return stdout
+
+    async def write_file(self, path: str, data: bytes, executable: bool = False) -> None:
+        script = 'cat > "$1" && chmod +x "$1"' if executable else 'cat > "$1"'
+        rc, _, stderr = await self.exec("sh", "-c", script, "sh", path, input_data=data)
+        if rc != 0:
+            raise RuntimeError(f"Failed to write {path} to sandbox {self.container_id}: {stderr.decode()}")
+
+    async def is_healthy(self) -> bool:
+        try:
+            rc, _, _ = await self.exec("true", timeout=Config.SANDBOX_HEALTH_CHECK_TIMEOUT)
+            return rc == 0
+        except asyncio.TimeoutError:
+            return False
+
+    async def reset(self) -> bool:
+        try:
+            rc, _, _ = await self.exec("sh", "-c", RESET_SCRIPT, timeout=Config.SANDBOX_HEALTH_CHECK_TIMEOUT)
+            return rc == 0
+        except asyncio.TimeoutError:
+            return False
+
+
+# SandboxPool keeps warm sandbox containers and leases them to grading jobs.
+class SandboxPool:
+    def __init__(self, size: int = Config.SANDBOX_POOL_SIZE, max_uses: int = Config.SANDBOX_MAX_USES,
+                 image: str = Config.SANDBOX_IMAGE):
+        self.size = size
+        self.max_uses = max_uses
+        self.image = image
+        self._idle: asyncio.Queue[SandboxContainer] = asyncio.Queue()
+        self._live = 0
+        self._pending_releases: set[asyncio.Task] = set()
+        self._started = False
+        self._start_lock = asyncio.Lock()
+        self._image_digest: Optional[str] = None
+
+    async def start(self) -> None:
+        async with self._start_lock:
+            if self._started:
+                return
+            containers = await asyncio.gather(
+                *(self._spawn() for _ in range(self.size)),
+                return_exceptions=True
+            )
+            for container in containers:
+                if isinstance(container, Exception):
+                    logger.error(f"Failed to start sandbox container: {container}")
+                else:
+                    self._live += 1
+                    self._idle.put_nowait(container)
+            self._started = True
+            logger.info(f"Sandbox pool started with {self._idle.qsize()}/{self.size} containers.")
+
+    async def close(self) -> None:
+        if self._pending_releases:
+            await asyncio.gather(*self._pending_releases, return_exceptions=True)
+        while not self._idle.empty():
+            await self._remove(self._idle.get_nowait())
+            self._live -= 1
+        self._started = False
+
+    async def image_digest(self) -> str:
+        """
+        Return the content digest of the sandbox image, so cached builds are invalidated when the image changes.
+        """
+        if self._image_digest is None:
+            rc, stdout, stderr = await run_process(["docker", "image", "inspect", "--format", "{{.Id}}", self.image])
+            if rc != 0:
+                raise RuntimeError(stderr.decode().strip())
+            self._image_digest = stdout.decode().strip()
+        return self._image_digest
+
+    @asynccontextmanager
+    async def lease(self):
+        """
+        Lease a healthy container for the duration of one grading job.
+        The container is reset and returned to the pool (or recycled) afterwards.
+        """
+        await self.start()
+        if self._idle.empty() and self._live < self.size:
+            # Containers lost to failed spawns are replaced on demand
+            self._live += 1
+            try:
+                container = await self._spawn()
+            except Exception:
+                self._live -= 1
+                raise
+        else:
+            container = await self._idle.get()
+
+        if not await container.is_healthy():
+            logger.warning(f"Sandbox {container.container_id} failed health check, replacing it.")
+            await self._remove(container)
+            try:
+                container = await self._spawn()
+            except Exception:
+                self._live -= 1
+                raise
+
+        container.uses += 1
+        try:
+            yield container
+        finally:
+            task = asyncio.create_task(self._release(container))
+            self._pending_releases.add(task)
+            task.add_done_callback(self._pending_releases.discard)
+
+    async def _release(self, container: SandboxContainer) -> None:
+        if container.uses < self.max_uses and await container.reset():
+            self._idle.put_nowait(container)
+            return
+
+        logger.info(f"Recycling sandbox {container.container_id} after {container.uses} uses.")
+        await self._remove(container)
+        try:
+            self._idle.put_nowait(await self._spawn())
+        except Exception as e:
+            self._live -= 1
+            logger.error(f"Failed to replace recycled sandbox container: {e}")
+
+    async def _spawn(self) -> SandboxContainer:
+        rc, stdout, stderr = await run_process(
+            ["docker", "run", "-d", "--rm", *CONTAINER_OPTIONS, self.image, "sleep", "infinity"]
+        )
+        if rc != 0:
+            raise RuntimeError(stderr.decode().strip())
+        return SandboxContainer(stdout.decode().strip())
+
+    @staticmethod
+    async def _remove(container: SandboxContainer) -> None:
+        await run_process(["docker", "rm", "-f", container.container_id])
+
+
+sandbox_pool = SandboxPool()
@@ -0,0 +1,78 @@
+import asyncio
+from typing import AsyncIterator, Optional
+
+# Maximum length of a single output line read from a streaming command
+STREAM_LINE_LIMIT = 16 * 1024 * 1024
+
+
+async def run_process(args: list[str], input_data: Optional[bytes] = None, timeout: Optional[float] = None,
+                      **kwargs) -> tuple[int, bytes, bytes]:
+    """
+    Run a process to completion.
+    :param args: Command and its arguments.
+    :param input_data: Bytes passed to the process's stdin.
+    :param timeout: Timeout in seconds; the process is killed when it expires.
+    :param kwargs: Extra arguments for asyncio.create_subprocess_exec (cwd, env, preexec_fn, ...).
+    :return: Return code, stdout and stderr of the process.
+    """
+    proc = await asyncio.create_subprocess_exec(
+        *args,
+        stdin=asyncio.subprocess.PIPE if input_data is not None else asyncio.subprocess.DEVNULL,
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.PIPE,
+        **kwargs
+    )
+    try:
+        stdout, stderr = await asyncio.wait_for(proc.communicate(input_data), timeout=timeout)
+    except asyncio.TimeoutError:
+        proc.kill()
+        await proc.wait()
+        raise
+    return proc.returncode, stdout, stderr
+
+
+async def stream_process_lines(args: list[str], input_data: Optional[bytes] = None, timeout: Optional[float] = None,
+                               **kwargs) -> AsyncIterator[bytes]:
+    """
+    Run a process and yield its stdout line by line as it is produced.
+    :param args: Command and its arguments.
+    :param input_data: Bytes passed to the process's stdin.
+    :param timeout: Timeout in seconds for the whole process.
+    :param kwargs: Extra arguments for asyncio.create_subprocess_exec (cwd, env, preexec_fn, ...).
+    :raises asyncio.TimeoutError: If the process did not finish in time.
+    :raises RuntimeError: If the process exited with a non-zero code.
+    """
+    proc = await asyncio.create_subprocess_exec(
+        *args,
+        stdin=asyncio.subprocess.PIPE,
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.PIPE,
+        limit=STREAM_LINE_LIMIT,
+        **kwargs
+    )
+    stderr = asyncio.create_task(proc.stderr.read())
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + timeout if timeout is not None else None
+    try:
+        proc.stdin.write(input_data or b"")
+        await proc.stdin.drain()
+        proc.stdin.close()
+
+        while True:
+            remaining = deadline - loop.time() if deadline is not None else None
+            if remaining is not None and remaining <= 0:
+                raise asyncio.TimeoutError
+            line = await asyncio.wait_for(proc.stdout.readline(), timeout=remaining)
+            if not line:
+                break
+            yield line
+
+        await proc.wait()
+        if proc.returncode != 0:
+            raise RuntimeError(f"Command {args[0]} failed with code {proc.returncode}: "
+                               f"{(await stderr).decode(errors='replace')}")
+    finally:
+        if proc.returncode is None:
+            proc.kill()
+            await proc.wait()
+        stderr.cancel()
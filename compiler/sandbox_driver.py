@@ -0,0 +1,235 @@
+# In-container test driver for the C sandbox.
+# Reads a JSON job from stdin:
+# {"binary": "./user", "timeout": 4, "jobs": 2, "max_failures": 1,
+#  "cases": [{"input": "...", "expected": "...", "checker": "float", "tolerance": 1e-6}, ...]},
+# runs the binary once per case (up to `jobs` cases at a time) and streams one JSON line per case
+# to stdout as soon as the case finishes. Each result carries the case index, the exit status,
+# whether the output matched the expected one and resource usage of the run: CPU time, wall time,
+# peak RSS and the terminating signal. Once `max_failures` cases have failed, cases that have not
+# started yet are reported as skipped instead of being run.
+# Output is checked by the case's checker (compiler/checkers.py) while it is being read, and at most
+# `output_limit` bytes of it are kept: a program is killed soon after its output diverges ("wrong_answer")
+# or once it exceeds the limit ("output_limit"), so runaway printf loops cost neither time nor memory.
+# An optional "rlimits" object ({"RLIMIT_AS": 268435456, ...}) is applied to every run by the measure launcher;
+# backends without container-level limits use it to cap the program's memory, file sizes and descriptors.
+# The driver is baked into the c-sandbox image (see Dockerfile) and must only use the standard library.
+import os
+import sys
+import json
+import time
+import signal
+import threading
+import subprocess
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+# The checkers live next to this file, which is not on the path when the driver runs with python -I
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from checkers import make_checker  # noqa: E402
+
+# Location of the compiled compiler/measure.c inside the c-sandbox image
+MEASURE_PATH = "/opt/clearn/measure"
+
+# Default cap on the captured stdout of one run and the fixed cap on its stderr, in bytes
+OUTPUT_LIMIT = 1024 * 1024
+STDERR_LIMIT = 64 * 1024
+
+# Output a program may still print after it diverged from the expected one before it is killed
+DIVERGENCE_GRACE = 4 * 1024
+
+READ_CHUNK = 64 * 1024
+
+
+def _feed(stream, data: bytes) -> None:
+    try:
+        stream.write(data)
+    except BrokenPipeError:
+        pass
+    finally:
+        try:
+            stream.close()
+        except BrokenPipeError:
+            pass
+
+
+def _capture(stream, chunks: list, limit: int, checker=None, stop=None) -> bool:
+    """
+    Read the stream to the end, keeping at most `limit` bytes and feeding them to the checker.
+    Without `stop` the rest of an overlong stream is read and dropped; otherwise `stop` is called
+    with the reason ("output_limit" or "wrong_answer") and reading ends. A program whose output
+    diverged is stopped once it prints DIVERGENCE_GRACE more bytes, so short wrong answers are
+    reported in full.
+    :return: Whether the captured output is truncated.
+    """
+    size = 0
+    diverged_at = None
+    while True:
+        chunk = stream.read1(READ_CHUNK)
+        if not chunk:
+            return False
+        if size + len(chunk) > limit:
+            chunks.append(chunk[:limit - size])
+            if stop is None:
+                while stream.read1(READ_CHUNK):
+                    pass
+            else:
+                stop("output_limit")
+            return True
+        size += len(chunk)
+        chunks.append(chunk)
+        if diverged_at is None and checker is not None and not checker.feed(chunk):
+            diverged_at = size
+        if diverged_at is not None and size - diverged_at > DIVERGENCE_GRACE:
+            stop("wrong_answer")
+            return True
+
+
+def run_case(binary: str, case: dict, timeout: float, measure: str, rlimits: dict, output_limit: int) -> dict:
+    """
+    Run the binary on the case's input through the measure launcher (compiler/measure.c),
+    which applies the rlimits, reports the program's wait status, CPU time and peak RSS, and check its output.
+    """
+    checker = None
+    if "expected" in case:
+        options = {"tolerance": case["tolerance"]} if case.get("tolerance") is not None else {}
+        try:
+            checker = make_checker(case.get("checker"), str(case["expected"]).encode(), **options)
+        except (ValueError, TypeError) as e:
+            return _error_result(str(e))
+
+    # The driver runs cases on several threads, so the limits are set by the launcher rather than a preexec_fn
+    limits = [arg for name, value in rlimits.items() for arg in ("-l", f"{name}={value}")]
+    report_r, report_w = os.pipe()
+    started = time.monotonic()
+    try:
+        proc = subprocess.Popen(
+            [measure, *limits, str(report_w), binary],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            pass_fds=(report_w,)
+        )
+    except (OSError, subprocess.SubprocessError) as e:
+        os.close(report_r)
+        return _error_result(str(e))
+    finally:
+        os.close(report_w)
+
+    # The first reason the program was killed for: "timeout", "output_limit" or "wrong_answer"
+    stopped = []
+    stop_lock = threading.Lock()
+
+    def stop(reason: str) -> None:
+        with stop_lock:
+            if not stopped:
+                stopped.append(reason)
+                proc.terminate()
+
+    stdout, stderr, truncated = [], [], {}
+
+    def capture_stdout() -> None:
+        truncated["stdout"] = _capture(proc.stdout, stdout, output_limit, checker, stop)
+
+    def capture_stderr() -> None:
+        truncated["stderr"] = _capture(proc.stderr, stderr, STDERR_LIMIT)
+
+    threads = [
+        threading.Thread(target=_feed, args=(proc.stdin, str(case.get("input", "")).encode()), daemon=True),
+        threading.Thread(target=capture_stdout, daemon=True),
+        threading.Thread(target=capture_stderr, daemon=True)
+    ]
+    for thread in threads:
+        thread.start()
+
+    timer = threading.Timer(timeout, stop, args=("timeout",))
+    timer.start()
+    proc.wait()
+    wall_time = time.monotonic() - started
+    timer.cancel()
+
+    with os.fdopen(report_r) as report:
+        fields = report.read().split()
+
+    # Grandchildren may keep the pipes open; do not wait for them forever
+    for thread in threads:
+        thread.join(timeout=1)
+
+    if len(fields) != 4:
+        return _error_result(b"".join(stderr).decode(errors="replace") or "measure launcher failed")
+
+    status, utime_us, stime_us, max_rss_kb = map(int, fields)
+    exit_code = os.waitstatus_to_exitcode(status)
+
+    if stopped:
+        result_status = stopped[0]
+    elif exit_code == 0:
+        result_status = "ok"
+    else:
+        result_status = "runtime_error"
+
+    return {
+        "status": result_status,
+        "passed": result_status in ("ok", "runtime_error") and checker is not None and checker.matched(),
+        "exit_code": exit_code,
+        "signal": signal.Signals(-exit_code).name if exit_code < 0 else None,
+        "stdout": b"".join(stdout).decode(errors="replace"),
+        "stderr": b"".join(stderr).decode(errors="replace"),
+        "stdout_truncated": truncated.get("stdout", False),
+        "stderr_truncated": truncated.get("stderr", False),
+        "cpu_time": round((utime_us + stime_us) / 1e6, 4),
+        "wall_time": round(wall_time, 4),
+        "max_rss_kb": max_rss_kb
+    }
+
+
+def _error_result(message: str, status: str = "error") -> dict:
+    return {
+        "status": status, "passed": False, "exit_code": None, "signal": None, "stdout": "", "stderr": message,
+        "stdout_truncated": False, "stderr_truncated": False, "cpu_time": None, "wall_time": None, "max_rss_kb": None
+    }
+
+
+def main() -> None:
+    job = json.load(sys.stdin)
+    binary = job.get("binary", "./user")
+    measure = job.get("measure", MEASURE_PATH)
+    timeout = float(job.get("timeout", 4))
+    jobs = max(1, int(job.get("jobs", 1)))
+    cases = job.get("cases", [])
+    rlimits = job.get("rlimits", {})
+    max_failures = job.get("max_failures")
+    output_limit = int(job.get("output_limit", OUTPUT_LIMIT))
+    failures = 0
+
+    def report(index: int, result: dict) -> None:
+        result["index"] = index
+        sys.stdout.write(json.dumps(result, ensure_ascii=False) + "\n")
+        sys.stdout.flush()
+
+    # Cases are started one by one as slots free up, so none is started after the failure limit is hit
+    with ThreadPoolExecutor(max_workers=jobs) as executor:
+        running = {}
+        next_index = 0
+        while running or next_index < len(cases):
+            stopped = max_failures is not None and failures >= max_failures
+            while not stopped and next_index < len(cases) and len(running) < jobs:
+                future = executor.submit(run_case, binary, cases[next_index], timeout, measure, rlimits, output_limit)
+                running[future] = next_index
+                next_index += 1
+            if stopped:
+                for index in range(next_index, len(cases)):
+                    report(index, _error_result("", status="skipped"))
+                next_index = len(cases)
+                if not running:
+                    break
+
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                index = running.pop(future)
+                result = future.result()
+                report(index, result)
+                if not result["passed"]:
+                    failures += 1
+
+
+if __name__ == "__main__":
+    main()
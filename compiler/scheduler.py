@@ -0,0 +1,67 @@
+import asyncio
+from collections import defaultdict
+from contextlib import asynccontextmanager
+from typing import Hashable
+from config import Config
+
+
+def parse_size(value: str) -> int:
+    """
+    Parse a size like "256m" (k, m and g suffixes) into bytes.
+    """
+    units = {"k": 1024, "m": 1024 ** 2, "g": 1024 ** 3}
+    value = value.strip().lower()
+    if value and value[-1] in units:
+        return int(float(value[:-1]) * units[value[-1]])
+    return int(value)
+
+
+# Most test slots a single job can be granted
+MAX_JOB_SLOTS = max(1, min(Config.GRADING_PER_USER_SLOTS, Config.GRADING_MAX_CONCURRENCY))
+
+# A sandbox runs one job at a time and gets SANDBOX_CPUS and SANDBOX_MEMORY for every slot the job may hold,
+# so tests running in parallel each get the CPU share and memory of a test running alone
+JOB_CPUS = float(Config.SANDBOX_CPUS) * MAX_JOB_SLOTS
+JOB_MEMORY = parse_size(Config.SANDBOX_MEMORY) * MAX_JOB_SLOTS
+
+
+# GradingScheduler hands out test execution slots: a global pool sized to the host CPUs
+# and a per-user cap, so one heavy submission cannot starve everyone else.
+class GradingScheduler:
+    def __init__(self, capacity: int = Config.GRADING_MAX_CONCURRENCY,
+                 per_user: int = Config.GRADING_PER_USER_SLOTS):
+        self.capacity = capacity
+        self.per_user = per_user
+        self._free = capacity
+        self._used_by: dict[Hashable, int] = defaultdict(int)
+        self._cond = asyncio.Condition()
+
+    @asynccontextmanager
+    async def slots(self, user_id: Hashable, wanted: int):
+        """
+        Acquire between 1 and `wanted` slots for a user.
+        Waits until at least one slot is free for this user, then takes as many as are available right away.
+        :param user_id: Owner of the submission.
+        :param wanted: Desired number of concurrently running test cases.
+        :return: Number of granted slots.
+        """
+        wanted = max(1, min(wanted, self.per_user, self.capacity))
+        async with self._cond:
+            # get() rather than [] on the defaultdict, so checking a waiting user never inserts an entry for it
+            await self._cond.wait_for(lambda: self._free > 0 and self._used_by.get(user_id, 0) < self.per_user)
+            granted = min(wanted, self._free, self.per_user - self._used_by.get(user_id, 0))
+            self._free -= granted
+            self._used_by[user_id] += granted
+
+        try:
+            yield granted
+        finally:
+            async with self._cond:
+                self._free += granted
+                self._used_by[user_id] -= granted
+                if not self._used_by[user_id]:
+                    del self._used_by[user_id]
+                self._cond.notify_all()
+
+
+grading_scheduler = GradingScheduler()
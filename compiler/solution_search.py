@@ -0,0 +1,103 @@
+import asyncio
+from dataclasses import dataclass
+from typing import Awaitable, Callable, Optional
+from config import Config
+from logging_config import setup_logging
+from compiler.compiler import STOP_ON_FIRST_FAILURE
+from compiler.validation import VALIDATION_USER
+from grading.broker import GradingBroker, GradingJobError, get_broker
+
+logger = setup_logging()
+
+# Generates one candidate solution, returns {"success": ..., "solution_code": ...} like regenerate_task_solution
+SolutionGenerator = Callable[[], Awaitable[dict]]
+
+
+@dataclass
+class SolutionSearchResult:
+    solution_code: Optional[str]
+    verified: bool
+    candidates: int = 0
+
+
+async def passes_tests(solution_code: str, test_cases: list[dict], broker: Optional[GradingBroker] = None) -> bool:
+    """
+    Check on a grading worker whether a solution passes all test cases, stopping at the first failed one.
+    If the check is cancelled, e.g. by the search deadline, the queued job is withdrawn.
+    """
+    broker = broker or get_broker()
+    job_id = await broker.enqueue(
+        source=solution_code.encode(),
+        test_cases=test_cases,
+        user_id=VALIDATION_USER,
+        max_failures=STOP_ON_FIRST_FAILURE
+    )
+    try:
+        result = await broker.wait_result(job_id)
+    except asyncio.CancelledError:
+        await broker.cancel(job_id)
+        raise
+    except GradingJobError as e:
+        logger.error(f"Solution check {job_id} failed: {e}")
+        return False
+    return bool(result) and result["total"] > 0 and result["passed"] == result["total"]
+
+
+async def search_solution(generate: SolutionGenerator, test_cases: list[dict], solution_code: Optional[str] = None,
+                          candidates: int = Config.SOLUTION_SEARCH_CANDIDATES,
+                          timeout: float = Config.SOLUTION_SEARCH_TIMEOUT,
+                          broker: Optional[GradingBroker] = None) -> SolutionSearchResult:
+    """
+    Find a solution that passes the stored test cases of a task.
+    The stored solution is checked first. If it fails, `candidates` solutions are generated concurrently and each
+    one is checked on a grading worker as soon as it is ready; the first passing one wins and the rest are cancelled.
+    The search gives up after `timeout` seconds, so the LLM spend and latency of one request are bounded.
+    :param generate: Candidate generator.
+    :param test_cases: Stored test cases of the task.
+    :param solution_code: Stored solution of the task.
+    :param candidates: Number of candidates generated concurrently.
+    :param timeout: Deadline of the whole search in seconds.
+    :param broker: Grading broker the checks are queued on, the one selected by GRADING_BROKER by default.
+    :return: Verified solution, or the stored one with verified=False if no candidate passed in time.
+    """
+    if not test_cases:
+        return SolutionSearchResult(solution_code=solution_code, verified=False)
+
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + timeout
+
+    if solution_code:
+        try:
+            if await asyncio.wait_for(passes_tests(solution_code, test_cases, broker), timeout):
+                return SolutionSearchResult(solution_code=solution_code, verified=True)
+        except asyncio.TimeoutError:
+            logger.warning("Stored solution could not be checked in time")
+            return SolutionSearchResult(solution_code=solution_code, verified=False)
+
+    async def try_candidate() -> Optional[str]:
+        result = await generate()
+        code = result.get("solution_code") if result.get("success") else None
+        if not code:
+            logger.warning(f"Solution candidate was not generated: {result.get('error')}")
+            return None
+        return code if await passes_tests(code, test_cases, broker) else None
+
+    pending = {asyncio.create_task(try_candidate()) for _ in range(candidates)}
+    try:
+        while pending:
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                break
+            done, pending = await asyncio.wait(pending, timeout=remaining, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                if task.exception() is not None:
+                    logger.error(f"Solution candidate failed: {task.exception()}")
+                elif task.result():
+                    logger.info(f"Found a passing solution among {candidates} candidates")
+                    return SolutionSearchResult(solution_code=task.result(), verified=True, candidates=candidates)
+    finally:
+        for task in pending:
+            task.cancel()
+
+    logger.warning(f"No passing solution among {candidates} candidates within {timeout}s")
+    return SolutionSearchResult(solution_code=solution_code, verified=False, candidates=candidates)
@@ -0,0 +1,104 @@
+import asyncio
+from dataclasses import dataclass, field
+from typing import Optional
+from logging_config import setup_logging
+from compiler.checkers import DEFAULT_CHECKER, check
+from grading.broker import GradingBroker, GradingJobError, get_broker
+
+logger = setup_logging()
+
+# Scheduler key of validation runs, so they share fairness slots instead of competing with students
+VALIDATION_USER = "task-validation"
+
+# Share of usable cases the reference solution must agree on before it is trusted to repair the rest:
+# an LLM-written reference that is wrong on more cases would overwrite correct expected outputs
+MIN_AGREEMENT = 0.8
+
+
+@dataclass
+class ValidationResult:
+    test_cases: list[dict]
+    verified: bool
+    repaired: int = 0
+    dropped: list[int] = field(default_factory=list)
+
+
+async def validate_test_cases(solution_code: str, test_cases: list[dict],
+                              broker: Optional[GradingBroker] = None) -> ValidationResult:
+    """
+    Check generated test cases against the reference solution before the task is stored.
+    The solution runs on all inputs as one "run" job of the grading queue, so the caller needs no sandbox,
+    and the outputs are reconciled with the cases by reconcile_with_reference.
+    :param solution_code: Reference C solution.
+    :param test_cases: Generated test cases with 'input' and 'expected_output' keys.
+    :param broker: Grading broker, the one selected by GRADING_BROKER by default.
+    :return: Validated test cases with counts of repaired and indexes of dropped cases.
+    """
+    if not solution_code or not test_cases:
+        return ValidationResult(test_cases=test_cases, verified=False)
+
+    broker = broker or get_broker()
+    try:
+        job_id = await broker.enqueue(
+            source=solution_code.encode(),
+            test_cases=[{"input": str(t.get("input", ""))} for t in test_cases],
+            user_id=VALIDATION_USER,
+            kind="run"
+        )
+        run = await broker.wait_result(job_id)
+    except (GradingJobError, asyncio.TimeoutError) as e:
+        logger.warning(f"Reference solution could not be run, test cases are left unverified: {e}")
+        return ValidationResult(test_cases=test_cases, verified=False)
+    return reconcile_with_reference(test_cases, run)
+
+
+def reconcile_with_reference(test_cases: list[dict], run: dict) -> ValidationResult:
+    """
+    Reconcile test cases with the outputs of the reference solution (a run_c_program result).
+    A case is usable if the solution printed a complete output for it, exiting normally or with an error
+    (error-path cases expect the output printed before a non-zero exit). If the solution agrees with at least
+    MIN_AGREEMENT of the usable cases, it is trusted: mismatching expected outputs of normally exiting runs are
+    replaced by its output (the generated one is kept in "generated_output"), and cases it crashes, times out or
+    disagrees on with an error exit are dropped. Kept cases are marked "verified".
+    Otherwise the solution is likely wrong itself and the cases are returned unchanged.
+    """
+    if not run["compiled"] or run["results"] is None:
+        logger.warning(f"Reference solution could not be run, test cases are left unverified: {run['log'][:200]}")
+        return ValidationResult(test_cases=test_cases, verified=False)
+
+    # Cases the solution produced a usable output for: (index, case, result, whether it matches)
+    usable = []
+    for i, (t, res) in enumerate(zip(test_cases, run["results"])):
+        expected = str(t.get("expected_output", ""))
+        if res["status"] not in ("ok", "runtime_error") or res["stdout_truncated"]:
+            continue
+        if not res["stdout"].strip() and expected.strip():
+            continue
+        options = {"tolerance": t["tolerance"]} if t.get("tolerance") is not None else {}
+        matches = check(t.get("checker", DEFAULT_CHECKER), expected, res["stdout"], **options)
+        usable.append((i, t, res, matches))
+
+    agreed = sum(matches for _, _, _, matches in usable)
+    if not usable or agreed < MIN_AGREEMENT * len(usable):
+        logger.warning(f"Reference solution agrees with {agreed}/{len(usable)} usable test cases, "
+                       f"test cases are left unverified")
+        return ValidationResult(test_cases=test_cases, verified=False)
+
+    validated = []
+    kept = set()
+    repaired = 0
+    for i, t, res, matches in usable:
+        case = {**t, "verified": True}
+        if not matches:
+            # The output of a crashed run is no reference
+            if res["status"] != "ok":
+                continue
+            case["generated_output"] = t.get("expected_output")
+            case["expected_output"] = res["stdout"].strip()
+            repaired += 1
+        validated.append(case)
+        kept.add(i)
+    dropped = [i for i in range(len(test_cases)) if i not in kept]
+
+    logger.info(f"Validated test cases: {len(validated)} kept ({repaired} repaired), {len(dropped)} dropped")
+    return ValidationResult(test_cases=validated, verified=True, repaired=repaired, dropped=dropped)
@@ -0,0 +1,74 @@
+import uuid
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Optional
+from compiler.pool import SandboxContainer
+
+# Root of the per-job directories; a tmpfs mount in every pooled container
+WORKSPACE_ROOT = "/sandbox"
+
+
+# Workspace is an isolated per-job directory of a sandbox backend.
+# Compilation and test runs happen inside it; backends decide how files and commands get there.
+class Workspace:
+    path: str
+
+    async def write(self, name: str, data: bytes, executable: bool = False) -> None:
+        raise NotImplementedError
+
+    async def read(self, name: str) -> bytes:
+        raise NotImplementedError
+
+    async def exec(self, *cmd: str, input_data: Optional[bytes] = None,
+                   timeout: Optional[float] = None) -> tuple[int, bytes, bytes]:
+        """
+        Run a command with the workspace as its working directory.
+        :return: Return code, stdout and stderr of the command.
+        """
+        raise NotImplementedError
+
+    def exec_lines(self, *cmd: str, input_data: Optional[bytes] = None,
+                   timeout: Optional[float] = None) -> AsyncIterator[bytes]:
+        """
+        Run a command with the workspace as its working directory and yield its stdout line by line.
+        """
+        raise NotImplementedError
+
+
+# ContainerWorkspace is a per-job directory in a leased sandbox's tmpfs.
+# Files are streamed in and out through docker exec, so nothing touches the host disk.
+class ContainerWorkspace(Workspace):
+    def __init__(self, container: SandboxContainer, path: str):
+        self.container = container
+        self.path = path
+
+    @classmethod
+    @asynccontextmanager
+    async def create(cls, container: SandboxContainer, job_id: Optional[str] = None):
+        """
+        Create a unique workspace directory and remove it when the job is done.
+        :param container: Leased sandbox container.
+        :param job_id: Optional job identifier used in the directory name.
+        """
+        path = f"{WORKSPACE_ROOT}/job-{job_id or uuid.uuid4().hex}"
+        rc, _, stderr = await container.exec("mkdir", "-m", "700", path)
+        if rc != 0:
+            raise RuntimeError(f"Failed to create workspace {path}: {stderr.decode()}")
+
+        try:
+            yield cls(container, path)
+        finally:
+            await container.exec("rm", "-rf", path)
+
+    async def write(self, name: str, data: bytes, executable: bool = False) -> None:
+        await self.container.write_file(f"{self.path}/{name}", data, executable=executable)
+
+    async def read(self, name: str) -> bytes:
+        return await self.container.read_file(f"{self.path}/{name}")
+
+    async def exec(self, *cmd: str, input_data: Optional[bytes] = None,
+                   timeout: Optional[float] = None) -> tuple[int, bytes, bytes]:
+        return await self.container.exec(*cmd, input_data=input_data, timeout=timeout, workdir=self.path)
+
+    def exec_lines(self, *cmd: str, input_data: Optional[bytes] = None,
+                   timeout: Optional[float] = None) -> AsyncIterator[bytes]:
+        return self.container.exec_lines(*cmd, input_data=input_data, timeout=timeout, workdir=self.path)
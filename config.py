@@ -16,6 +16,13 @@ class Config:
 
     # Database Configuration
     MONGO_URI = os.getenv('MONGO_URI', 'your-default-mongo-uri')
+    MONGO_MAX_POOL_SIZE = int(os.getenv('MONGO_MAX_POOL_SIZE', '50'))
+    MONGO_MIN_POOL_SIZE = int(os.getenv('MONGO_MIN_POOL_SIZE', '0'))
+    MONGO_MAX_IDLE_TIME_MS = int(os.getenv('MONGO_MAX_IDLE_TIME_MS', '300000'))
+    MONGO_CONNECT_TIMEOUT_MS = int(os.getenv('MONGO_CONNECT_TIMEOUT_MS', '10000'))
+    MONGO_SERVER_SELECTION_TIMEOUT_MS = int(os.getenv('MONGO_SERVER_SELECTION_TIMEOUT_MS', '10000'))
+    MONGO_READ_PREFERENCE = os.getenv('MONGO_READ_PREFERENCE', 'primary')  # e.g. "primaryPreferred", "nearest"
+    MONGO_MIGRATE_ON_STARTUP = os.getenv('MONGO_MIGRATE_ON_STARTUP', 'true').lower() == 'true'  # data migrations and indexes
 
     # API Configuration
     DEEPSEEK_API_KEY = os.getenv("DEEPSEEK_API_KEY", "your-api-key-here")
@@ -23,6 +30,52 @@ class Config:
     DEEPSEEK_BASE_URL = "https://api.deepseek.com/v1/chat/completions"
     DEEPSEEK_TEMPERATURE = 0.7
     DEEPSEEK_MAX_TOKENS = 4096
+    AGENT_MAX_WORKERS = int(os.getenv('AGENT_MAX_WORKERS', '8'))  # concurrent blocking LLM calls
+    TASK_GENERATION_TIMEOUT = float(os.getenv('TASK_GENERATION_TIMEOUT', '120'))
+
+    # Task Inventory Configuration
+    TASK_INVENTORY_SIZE = int(os.getenv('TASK_INVENTORY_SIZE', '2'))  # ready tasks per slot, 0 disables the inventory
+    TASK_INVENTORY_CONCURRENCY = int(os.getenv('TASK_INVENTORY_CONCURRENCY', '2'))
+    TASK_INVENTORY_REFILL_INTERVAL = float(os.getenv('TASK_INVENTORY_REFILL_INTERVAL', '300'))
+    QUIZ_POOL_SIZE = int(os.getenv('QUIZ_POOL_SIZE', '3'))  # ready quizzes per (topic, type), 0 disables the pool
+    QUIZ_POOL_LOW_WATER = int(os.getenv('QUIZ_POOL_LOW_WATER', '1'))  # refill a slot once it has fewer quizzes
+    QUIZ_POOL_WORKERS = int(os.getenv('QUIZ_POOL_WORKERS', '2'))
+    QUIZ_POOL_CHECK_INTERVAL = float(os.getenv('QUIZ_POOL_CHECK_INTERVAL', '300'))
+
+    # Sandbox Configuration
+    SANDBOX_BACKEND = os.getenv('SANDBOX_BACKEND', 'docker')  # "docker" or "native"
+    SANDBOX_IMAGE = os.getenv('SANDBOX_IMAGE', 'c-sandbox')
+    SANDBOX_POOL_SIZE = int(os.getenv('SANDBOX_POOL_SIZE', '4'))
+    SANDBOX_MAX_USES = int(os.getenv('SANDBOX_MAX_USES', '50'))
+    SANDBOX_CPUS = os.getenv('SANDBOX_CPUS', '0.5')  # per test slot, see compiler/scheduler.py
+    SANDBOX_MEMORY = os.getenv('SANDBOX_MEMORY', '256m')  # per test slot
+    SANDBOX_HEALTH_CHECK_TIMEOUT = float(os.getenv('SANDBOX_HEALTH_CHECK_TIMEOUT', '5'))
+    SANDBOX_BUILD_PROFILE = os.getenv('SANDBOX_BUILD_PROFILE', 'fast')  # "fast" or "default"
+    SANDBOX_NATIVE_ROOT = os.getenv('SANDBOX_NATIVE_ROOT', '/dev/shm/clearn-sandbox')
+    SANDBOX_NATIVE_NAMESPACES = os.getenv('SANDBOX_NATIVE_NAMESPACES', 'true').lower() == 'true'
+    SANDBOX_NATIVE_SECCOMP = os.getenv('SANDBOX_NATIVE_SECCOMP', 'true').lower() == 'true'
+    SANDBOX_CGROUP_ROOT = os.getenv('SANDBOX_CGROUP_ROOT', '')  # delegated cgroup v2 directory, empty to disable
+    SANDBOX_PIDS_LIMIT = int(os.getenv('SANDBOX_PIDS_LIMIT', '64'))
+    COMPILE_CACHE_DIR = os.getenv('COMPILE_CACHE_DIR', 'cache/compile')
+    COMPILE_CACHE_MAX_BYTES = int(os.getenv('COMPILE_CACHE_MAX_MB', '256')) * 1024 * 1024
+
+    # Grading Configuration
+    GRADING_MAX_CONCURRENCY = int(os.getenv('GRADING_MAX_CONCURRENCY', str(os.cpu_count() or 1)))
+    GRADING_PER_USER_SLOTS = int(os.getenv('GRADING_PER_USER_SLOTS', '2'))
+    GRADING_RESUBMIT_MAX_FAILURES = int(os.getenv('GRADING_RESUBMIT_MAX_FAILURES', '1'))  # 0 runs all tests
+    RESULT_CACHE_SIZE = int(os.getenv('RESULT_CACHE_SIZE', '1024'))
+    SOLUTIONS_PAGE_SIZE = int(os.getenv('SOLUTIONS_PAGE_SIZE', '20'))
+    STATISTICS_SOLUTIONS_LIMIT = int(os.getenv('STATISTICS_SOLUTIONS_LIMIT', '100'))  # latest solutions summarized
+    GRADING_BROKER = os.getenv('GRADING_BROKER', 'mongo')  # "mongo" or "local"
+    GRADING_WORKER_CONCURRENCY = int(os.getenv('GRADING_WORKER_CONCURRENCY', '4'))
+    GRADING_JOB_TIMEOUT = float(os.getenv('GRADING_JOB_TIMEOUT', '300'))
+    GRADING_JOB_LEASE = float(os.getenv('GRADING_JOB_LEASE', '120'))
+    GRADING_MAX_ATTEMPTS = int(os.getenv('GRADING_MAX_ATTEMPTS', '3'))
+    GRADING_JOB_RETENTION = int(os.getenv('GRADING_JOB_RETENTION', '3600'))  # seconds a finished job is kept
+    GRADING_POLL_INTERVAL = float(os.getenv('GRADING_POLL_INTERVAL', '0.5'))
+    PROGRESS_EDIT_INTERVAL_MS = int(os.getenv('PROGRESS_EDIT_INTERVAL_MS', '1500'))
+    SOLUTION_SEARCH_CANDIDATES = int(os.getenv('SOLUTION_SEARCH_CANDIDATES', '3'))
+    SOLUTION_SEARCH_TIMEOUT = float(os.getenv('SOLUTION_SEARCH_TIMEOUT', '90'))
 
     # Bot states for managing conversation flow
     class BotStates(StatesGroup):
@@ -1,9 +1,18 @@
-from config import Config
-from pymongo import MongoClient
+from pymongo import AsyncMongoClient, MongoClient
 from pymongo.database import Database
+from pymongo.asynchronous.database import AsyncDatabase
+from database.client import get_async_client, get_client
 
-# BaseDB sets up the MongoDB connection and provides access to the database.
+
+# BaseDB provides access to the database through the shared MongoDB client.
 class BaseDB:
     def __init__(self):
-        self.client = MongoClient(Config.MONGO_URI)
-        self.db: Database = self.client['clearn_db']
\ No newline at end of file
+        self.client: MongoClient = get_client()
+        self.db: Database = self.client['clearn_db']
+
+
+# AsyncBaseDB is the asyncio counterpart of BaseDB, used by the bot handlers' repositories.
+class AsyncBaseDB:
+    def __init__(self):
+        self.client: AsyncMongoClient = get_async_client()
+        self.db: AsyncDatabase = self.client['clearn_db']
@@ -0,0 +1,66 @@
+import threading
+from pymongo import AsyncMongoClient, MongoClient
+from config import Config
+
+# Process-wide MongoDB clients by connection URI. A MongoClient owns a connection pool and monitor threads,
+# so every DB class shares one instead of opening its own.
+_clients: dict[str, MongoClient] = {}
+_async_clients: dict[str, AsyncMongoClient] = {}
+_lock = threading.Lock()
+
+
+def _client_options() -> dict:
+    return {
+        "maxPoolSize": Config.MONGO_MAX_POOL_SIZE,
+        "minPoolSize": Config.MONGO_MIN_POOL_SIZE,
+        "maxIdleTimeMS": Config.MONGO_MAX_IDLE_TIME_MS,
+        "connectTimeoutMS": Config.MONGO_CONNECT_TIMEOUT_MS,
+        "serverSelectionTimeoutMS": Config.MONGO_SERVER_SELECTION_TIMEOUT_MS,
+        "readPreference": Config.MONGO_READ_PREFERENCE
+    }
+
+
+def get_client(uri: str = Config.MONGO_URI) -> MongoClient:
+    """
+    Get the shared client of the URI, creating it with the pool settings of Config on first use.
+    """
+    with _lock:
+        client = _clients.get(uri)
+        if client is None:
+            client = MongoClient(uri, **_client_options())
+            _clients[uri] = client
+        return client
+
+
+def get_async_client(uri: str = Config.MONGO_URI) -> AsyncMongoClient:
+    """
+    Get the shared asyncio client of the URI for the bot handlers.
+    It connects lazily and is bound to the event loop it is first used on.
+    """
+    with _lock:
+        client = _async_clients.get(uri)
+        if client is None:
+            client = AsyncMongoClient(uri, **_client_options())
+            _async_clients[uri] = client
+        return client
+
+
+def close_clients() -> None:
+    """
+    Close all shared clients, e.g. on shutdown.
+    """
+    with _lock:
+        for client in _clients.values():
+            client.close()
+        _clients.clear()
+
+
+async def close_async_clients() -> None:
+    """
+    Close all shared asyncio clients, on the event loop they were used on.
+    """
+    with _lock:
+        clients = list(_async_clients.values())
+        _async_clients.clear()
+    for client in clients:
+        await client.close()
@@ -0,0 +1,42 @@
+from typing import Optional
+from datetime import datetime, timezone
+from pymongo import ASCENDING
+from pymongo.collection import Collection
+from database.base_db import BaseDB
+from logging_config import setup_logging
+from models.database_models import TaskModel
+
+logger = setup_logging()
+
+
+# TaskInventoryDB keeps pre-generated tasks for each (topic, difficulty) slot.
+# A task is removed when it is taken, so every task is served to one user only.
+class TaskInventoryDB(BaseDB):
+    def __init__(self):
+        super().__init__()
+        self.tasks: Collection = self.db['task_inventory']
+
+    def add_task(self, task: TaskModel) -> None:
+        self.tasks.insert_one({**task.model_dump(by_alias=True), "created_at": datetime.now(timezone.utc)})
+        logger.info(f"Added task {task.task_id} to the inventory (topic {task.topic_id}, difficulty {task.difficulty})")
+
+    def take_task(self, topic_id: str, difficulty: int) -> Optional[TaskModel]:
+        """
+        Remove and return the oldest task of the slot.
+        """
+        doc = self.tasks.find_one_and_delete(
+            {"topic_id": topic_id, "difficulty": difficulty},
+            sort=[("created_at", ASCENDING)]
+        )
+        return TaskModel(**doc) if doc else None
+
+    def count_tasks(self) -> dict[tuple[str, int], int]:
+        """
+        Number of tasks in every non-empty slot.
+        """
+        return {
+            (doc["_id"]["topic_id"], doc["_id"]["difficulty"]): doc["count"]
+            for doc in self.tasks.aggregate([
+                {"$group": {"_id": {"topic_id": "$topic_id", "difficulty": "$difficulty"}, "count": {"$sum": 1}}}
+            ])
+        }
@@ -0,0 +1,182 @@
+import argparse
+from typing import Optional
+from datetime import datetime, timedelta, timezone
+from pymongo import ASCENDING, DESCENDING, IndexModel, MongoClient, UpdateOne
+from pymongo.errors import OperationFailure
+from config import Config
+from database.client import get_client
+from logging_config import setup_logging
+
+logger = setup_logging()
+
+# Indexes of every collection by database and collection name, created on startup by ensure_indexes.
+# Unique indexes back the ids the bot looks documents up by; compound ones follow the filter and sort of a query.
+INDEXES: dict[str, dict[str, list[IndexModel]]] = {
+    "clearn_db": {
+        "users": [
+            IndexModel([("user_id", ASCENDING)], name="user_id", unique=True)
+        ],
+        "solutions": [
+            # Solution ids are only unique per user
+            IndexModel([("user_id", ASCENDING), ("solution_id", ASCENDING)], name="user_id_solution_id", unique=True),
+            # AsyncSolutionDB.get_user_solutions pages by (created_at, solution_id), newest first
+            IndexModel([("user_id", ASCENDING), ("created_at", DESCENDING), ("solution_id", DESCENDING)],
+                       name="user_id_created_at_solution_id"),
+            # AsyncSolutionDB.has_solution
+            IndexModel([("user_id", ASCENDING), ("task_id", ASCENDING)], name="user_id_task_id"),
+            # Per-task reads, e.g. everyone who solved a task
+            IndexModel([("task_id", ASCENDING)], name="task_id")
+        ],
+        "tasks": [
+            IndexModel([("task_id", ASCENDING)], name="task_id", unique=True)
+        ],
+        "quizzes": [
+            IndexModel([("quiz_id", ASCENDING)], name="quiz_id", unique=True),
+            # QuizDB.take_pooled_quiz and the pool counts only ever look at pooled quizzes
+            IndexModel([("topic", ASCENDING), ("type", ASCENDING), ("created_at", ASCENDING)], name="pooled_slot",
+                       partialFilterExpression={"pooled": True})
+        ],
+        "feedbacks": [
+            IndexModel([("message_id", ASCENDING)], name="message_id", unique=True)
+        ],
+        "grading_results": [
+            IndexModel([("key", ASCENDING)], name="key", unique=True)
+        ],
+        "grading_jobs": [
+            IndexModel([("job_id", ASCENDING)], name="job_id", unique=True),
+            # MongoBroker._claim takes the oldest queued or expired job
+            IndexModel([("status", ASCENDING), ("created_at", ASCENDING)], name="status_created_at"),
+            # Finished jobs expire; queued and running ones have no finished_at
+            IndexModel([("finished_at", ASCENDING)], name="finished_at_ttl",
+                       expireAfterSeconds=Config.GRADING_JOB_RETENTION)
+        ],
+        "task_inventory": [
+            IndexModel([("topic_id", ASCENDING), ("difficulty", ASCENDING), ("created_at", ASCENDING)], name="slot")
+        ]
+    },
+    "coordinator_memory": {
+        "sessions": [
+            # CoordinatorMemoryManager.get_recent_context: latest interactions of a session
+            IndexModel([("session_id", ASCENDING), ("timestamp", DESCENDING)], name="session_id_timestamp")
+        ]
+    }
+}
+
+
+def ensure_indexes(client: Optional[MongoClient] = None) -> dict[str, list[str]]:
+    """
+    Create the missing indexes of INDEXES; existing ones are left as they are.
+    An index that cannot be built, e.g. a unique one over duplicated legacy data, is logged and skipped.
+    :param client: MongoDB client, the shared one by default.
+    :return: Names of the indexes that are in place, by "database.collection".
+    """
+    client = client or get_client()
+    created = {}
+    for database, collections in INDEXES.items():
+        for collection, indexes in collections.items():
+            names = []
+            for index in indexes:
+                try:
+                    names += client[database][collection].create_indexes([index])
+                except OperationFailure as e:
+                    logger.error(f"Could not create index {index.document['name']} on {database}.{collection}: "
+                                 f"{e.details.get('errmsg', e) if e.details else e}")
+            created[f"{database}.{collection}"] = names
+    logger.info(f"Ensured {sum(len(names) for names in created.values())} indexes")
+    return created
+
+
+def _unique_solution_ids(ids: list[str]) -> list[str]:
+    seen: dict[str, int] = {}
+    unique = []
+    for solution_id in ids:
+        seen[solution_id] = seen.get(solution_id, 0) + 1
+        unique.append(solution_id if seen[solution_id] == 1 else f"{solution_id}-{seen[solution_id]}")
+    return unique
+
+
+def migrate_embedded_solutions(client: Optional[MongoClient] = None) -> int:
+    """
+    Move the solutions embedded in user documents into the solutions collection and drop the arrays.
+    Solutions are upserted by user and solution id, so an interrupted run can simply be repeated.
+    The legacy random ids may repeat within a user's array; a repeated id gets the suffix "-<n>" for its n-th
+    occurrence instead of being dropped. The suffix is derived from the array, so a repeated run yields the same ids,
+    and it cannot clash with other ids: the legacy ones are digits only and database.ids has no "-".
+    The legacy entries have no timestamps; they get created_at values 1 ms apart (BSON dates keep milliseconds)
+    in their array order.
+    :return: Number of solutions moved.
+    """
+    client = client or get_client()
+    db = client["clearn_db"]
+    started = datetime.now(timezone.utc)
+    moved = 0
+    for user in db.users.find({"solutions": {"$exists": True}}, {"user_id": 1, "solutions": 1}):
+        solutions = user["solutions"] or []
+        ids = _unique_solution_ids([solution["solution_id"] for solution in solutions])
+        requests = [
+            UpdateOne(
+                {"user_id": user["user_id"], "solution_id": solution_id},
+                {"$setOnInsert": {
+                    "user_id": user["user_id"],
+                    "solution_id": solution_id,
+                    "task_id": solution.get("task_id", ""),
+                    "solution_code": solution.get("solution_code", ""),
+                    "score": solution.get("score", 0),
+                    "log": solution.get("log", ""),
+                    "created_at": started + timedelta(milliseconds=i)
+                }},
+                upsert=True
+            )
+            for i, (solution, solution_id) in enumerate(zip(solutions, ids))
+        ]
+        if requests:
+            db.solutions.bulk_write(requests, ordered=False)
+        db.users.update_one({"_id": user["_id"]}, {"$unset": {"solutions": ""}})
+        moved += len(requests)
+    if moved:
+        logger.info(f"Moved {moved} embedded solutions into the solutions collection")
+    return moved
+
+
+def run_migrations(client: Optional[MongoClient] = None) -> None:
+    """
+    Bring the database up to date: data migrations first, so unique indexes are built over the migrated data.
+    """
+    client = client or get_client()
+    migrate_embedded_solutions(client)
+    ensure_indexes(client)
+
+
+def index_usage(client: Optional[MongoClient] = None) -> list[dict]:
+    """
+    Usage of every index of the collections in INDEXES since the server started or the index was built.
+    :return: Rows with database, collection, index, ops (number of uses) and since.
+    """
+    client = client or get_client()
+    rows = []
+    for database, collections in INDEXES.items():
+        for collection in collections:
+            for stats in client[database][collection].aggregate([{"$indexStats": {}}]):
+                rows.append({
+                    "database": database,
+                    "collection": collection,
+                    "index": stats["name"],
+                    "ops": stats["accesses"]["ops"],
+                    "since": stats["accesses"]["since"]
+                })
+    return rows
+
+
+# Run the migrations and print the index usage: python -m database.migrations [--report]
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Migrate the MongoDB data and indexes of CLearn")
+    parser.add_argument("--report", action="store_true", help="only print the index usage")
+    args = parser.parse_args()
+
+    if not args.report:
+        run_migrations()
+    print(f"{'collection':<36}{'index':<28}{'ops':>10}  since")
+    for row in index_usage():
+        unused = "  (unused)" if row["ops"] == 0 and row["index"] != "_id_" else ""
+        print(f"{row['database'] + '.' + row['collection']:<36}{row['index']:<28}{row['ops']:>10}  "
+              f"{row['since']:%Y-%m-%d %H:%M}{unused}")
@@ -1,6 +1,8 @@
 from typing import Optional
+from pymongo import ASCENDING, ReturnDocument
 from pymongo.collection import Collection
-from database.base_db import BaseDB
+from pymongo.asynchronous.collection import AsyncCollection
+from database.base_db import AsyncBaseDB, BaseDB
 from logging_config import setup_logging
 from models.database_models import QuizModel
 
@@ -19,4 +21,58 @@ class QuizDB(BaseDB):
 
     def get_quiz(self, quiz_id: str) -> Optional[QuizModel]:
         doc = self.tasks.find_one({"quiz_id": quiz_id})
-        return QuizModel(**doc) if doc else None
\ No newline at end of file
+        return QuizModel(**doc) if doc else None
+
+    def take_pooled_quiz(self, topic: str, quiz_type: str) -> Optional[QuizModel]:
+        """
+        Take the oldest pooled quiz of the slot out of the pool; it stays stored for answering.
+        """
+        doc = self.tasks.find_one_and_update(
+            {"topic": topic, "type": quiz_type, "pooled": True},
+            {"$set": {"pooled": False}},
+            sort=[("created_at", ASCENDING)],
+            return_document=ReturnDocument.AFTER
+        )
+        return QuizModel(**doc) if doc else None
+
+    def count_pooled(self, topic: Optional[str] = None, quiz_type: Optional[str] = None) -> dict[tuple[str, str], int]:
+        """
+        Number of pooled quizzes in every non-empty slot, optionally of one topic and type only.
+        """
+        match = {"pooled": True}
+        if topic is not None:
+            match["topic"] = topic
+        if quiz_type is not None:
+            match["type"] = quiz_type
+        return {
+            (doc["_id"]["topic"], doc["_id"]["type"]): doc["count"]
+            for doc in self.tasks.aggregate([
+                {"$match": match},
+                {"$group": {"_id": {"topic": "$topic", "type": "$type"}, "count": {"$sum": 1}}}
+            ])
+        }
+
+    def pooled_questions(self, topic: str) -> list[str]:
+        """
+        Question texts of all pooled quizzes of the topic.
+        """
+        return [
+            question.get("question_text", "")
+            for doc in self.tasks.find({"topic": topic, "pooled": True}, {"questions.question_text": 1})
+            for question in doc.get("questions", [])
+        ]
+
+
+# AsyncQuizDB is the non-blocking counterpart of QuizDB used by the bot handlers.
+class AsyncQuizDB(AsyncBaseDB):
+    def __init__(self):
+        super().__init__()
+        self.tasks: AsyncCollection = self.db['quizzes']
+
+    async def add_quiz(self, quiz: QuizModel) -> None:
+        await self.tasks.insert_one(quiz.model_dump(by_alias=True))
+        logger.info(f"Added quiz id: {quiz.quiz_id}")
+
+    async def get_quiz(self, quiz_id: str) -> Optional[QuizModel]:
+        doc = await self.tasks.find_one({"quiz_id": quiz_id})
+        return QuizModel(**doc) if doc else None
@@ -0,0 +1,56 @@
+import json
+import hashlib
+from typing import Optional
+from collections import OrderedDict
+from pymongo.asynchronous.collection import AsyncCollection
+from config import Config
+from database.base_db import AsyncBaseDB
+from logging_config import setup_logging
+from models.database_models import GradingResultModel
+
+logger = setup_logging()
+
+
+# AsyncResultDB memoizes grading results of identical (task, test cases, source) submissions.
+# Results are stored in MongoDB and fronted by an in-process LRU shared by all instances.
+class AsyncResultDB(AsyncBaseDB):
+    _memory: OrderedDict[str, GradingResultModel] = OrderedDict()
+
+    def __init__(self):
+        super().__init__()
+        self.results: AsyncCollection = self.db['grading_results']
+
+    @staticmethod
+    def make_key(task_id: str, test_cases: list[dict], source: bytes) -> str:
+        cases_hash = hashlib.sha256(
+            json.dumps(test_cases, sort_keys=True, ensure_ascii=False, default=str).encode()
+        ).hexdigest()
+        source_hash = hashlib.sha256(source).hexdigest()
+        return f"{task_id}:{cases_hash}:{source_hash}"
+
+    async def get_result(self, key: str) -> Optional[GradingResultModel]:
+        if key in self._memory:
+            self._memory.move_to_end(key)
+            return self._memory[key]
+
+        doc = await self.results.find_one({"key": key})
+        if not doc:
+            return None
+        result = GradingResultModel(**doc)
+        self._remember(result)
+        return result
+
+    async def add_result(self, result: GradingResultModel) -> None:
+        await self.results.update_one(
+            {"key": result.key},
+            {"$setOnInsert": result.model_dump(by_alias=True)},
+            upsert=True
+        )
+        self._remember(result)
+        logger.info(f"Cached grading result for task: {result.task_id}")
+
+    def _remember(self, result: GradingResultModel) -> None:
+        self._memory[result.key] = result
+        self._memory.move_to_end(result.key)
+        while len(self._memory) > Config.RESULT_CACHE_SIZE:
+            self._memory.popitem(last=False)
@@ -0,0 +1,59 @@
+from typing import Optional
+from pymongo import DESCENDING
+from pymongo.asynchronous.collection import AsyncCollection
+from config import Config
+from database.base_db import AsyncBaseDB
+from database.ids import new_id
+from logging_config import setup_logging
+from models.database_models import SolutionModel
+
+logger = setup_logging()
+
+# Fields of a solution listing; the code and the grading log are only loaded for a single solution
+SUMMARY_PROJECTION = {"_id": 0, "solution_code": 0, "log": 0}
+
+
+# Newest first; the id breaks ties between solutions saved within the same millisecond
+PAGE_SORT = [("created_at", DESCENDING), ("solution_id", DESCENDING)]
+
+
+# AsyncSolutionDB handles submitted solutions, one document per submission.
+class AsyncSolutionDB(AsyncBaseDB):
+    def __init__(self):
+        super().__init__()
+        self.solutions: AsyncCollection = self.db['solutions']
+
+    async def add_solution(self, user_id: int, task_id: str, solution_code: str, score: Optional[float], log: str) -> str:
+        solution = SolutionModel(
+            solution_id=new_id(),
+            user_id=user_id,
+            task_id=task_id,
+            solution_code=solution_code,
+            score=score,
+            log=log
+        )
+        await self.solutions.insert_one(solution.model_dump(by_alias=True))
+        logger.info(f"Added solution for user: {user_id}, task: {task_id}")
+        return solution.solution_id
+
+    async def get_solution(self, user_id: int, solution_id: str) -> Optional[SolutionModel]:
+        doc = await self.solutions.find_one({"user_id": user_id, "solution_id": solution_id})
+        return SolutionModel(**doc) if doc else None
+
+    async def has_solution(self, user_id: int, task_id: str) -> bool:
+        return await self.solutions.count_documents({"user_id": user_id, "task_id": task_id}, limit=1) > 0
+
+    async def get_user_solutions(self, user_id: int, limit: int = Config.SOLUTIONS_PAGE_SIZE,
+                                 before: Optional[SolutionModel] = None) -> list[SolutionModel]:
+        """
+        Page of the user's solutions, newest first, without code and logs.
+        :param before: Last solution of the previous page.
+        """
+        query = {"user_id": user_id}
+        if before is not None:
+            query["$or"] = [
+                {"created_at": {"$lt": before.created_at}},
+                {"created_at": before.created_at, "solution_id": {"$lt": before.solution_id}}
+            ]
+        cursor = self.solutions.find(query, SUMMARY_PROJECTION)
+        return [SolutionModel(**doc) async for doc in cursor.sort(PAGE_SORT).limit(limit)]
@@ -1,29 +1,39 @@
 from typing import Optional
-from pymongo.collection import Collection
-from database.base_db import BaseDB
+from pymongo.asynchronous.collection import AsyncCollection
+from database.base_db import AsyncBaseDB
 from logging_config import setup_logging
 from models.database_models import TaskModel
 
 logger = setup_logging()
 
+# Fields of a task listing
+SUMMARY_PROJECTION = {"_id": 0, "task_id": 1, "topic_id": 1, "difficulty": 1}
 
-# TaskDB handles tasks in the database.
-class TaskDB(BaseDB):
+
+# AsyncTaskDB handles tasks in the database.
+class AsyncTaskDB(AsyncBaseDB):
     def __init__(self):
         super().__init__()
-        self.tasks: Collection = self.db['tasks']
+        self.tasks: AsyncCollection = self.db['tasks']
 
-    def add_task(self, task: TaskModel) -> None:
-        self.tasks.insert_one(task.model_dump(by_alias=True))
+    async def add_task(self, task: TaskModel) -> None:
+        await self.tasks.insert_one(task.model_dump(by_alias=True))
         logger.info(f"Added task number: {task.task_id}")
 
-    def get_task(self, task_id: int) -> Optional[TaskModel]:
-        doc = self.tasks.find_one({"task_id": task_id})
+    async def get_task(self, task_id: str) -> Optional[TaskModel]:
+        doc = await self.tasks.find_one({"task_id": task_id})
         return TaskModel(**doc) if doc else None
 
-    def update_task_solution(self, task_id: int, solution_code: str) -> None:
-        self.tasks.update_one(
+    async def get_task_summaries(self, task_ids: list[str]) -> dict[str, dict]:
+        """
+        Topic and difficulty of several tasks in one query.
+        """
+        cursor = self.tasks.find({"task_id": {"$in": task_ids}}, SUMMARY_PROJECTION)
+        return {doc["task_id"]: doc async for doc in cursor}
+
+    async def update_task_solution(self, task_id: str, solution_code: str, verified: bool = False) -> None:
+        await self.tasks.update_one(
             {"task_id": task_id},
-            {"$set": {"solution_code": solution_code}}
+            {"$set": {"solution_code": solution_code, "solution_verified": verified}}
         )
         logger.info(f"Updated solution for task number: {task_id}")
@@ -1,53 +1,37 @@
-import random
 from typing import Optional
-from pymongo.collection import Collection
-from database.base_db import BaseDB
+from pymongo.asynchronous.collection import AsyncCollection
+from database.base_db import AsyncBaseDB
 from logging_config import setup_logging
 from models.database_models import UserModel
 
 logger = setup_logging()
 
+# Solutions live in their own collection; documents not migrated yet may still embed them
+USER_PROJECTION = {"solutions": 0}
 
-# UserDB handles operations related to users in the database.
-class UserDB(BaseDB):
+
+# AsyncUserDB handles operations related to users in the database.
+class AsyncUserDB(AsyncBaseDB):
     def __init__(self):
         super().__init__()
-        self.users: Collection = self.db['users']
+        self.users: AsyncCollection = self.db['users']
 
-    def add_user(self, user: UserModel) -> None:
-        if not self.users.find_one({"user_id": user.user_id}):
-            self.users.insert_one(user.model_dump(by_alias=True))
+    async def add_user(self, user: UserModel) -> None:
+        if not await self.users.find_one({"user_id": user.user_id}, {"_id": 1}):
+            await self.users.insert_one(user.model_dump(by_alias=True))
             logger.info(f"Added new user: {user.user_id} ({user.username})")
 
-    def get_user(self, user_id: int) -> Optional[UserModel]:
-        doc = self.users.find_one({"user_id": user_id})
+    async def get_user(self, user_id: int) -> Optional[UserModel]:
+        doc = await self.users.find_one({"user_id": user_id}, USER_PROJECTION)
         return UserModel(**doc) if doc else None
 
-    def delete_user(self, user_id: int) -> None:
-        result = self.users.delete_one({"user_id": user_id})
+    async def delete_user(self, user_id: int) -> None:
+        result = await self.users.delete_one({"user_id": user_id})
         if result.deleted_count:
             logger.info(f"Deleted user: {user_id}")
 
-    def add_solution(self, user_id: int, task_id: str, solution_code: str, score: int, log: str) -> str:
-        solution_id = str(random.randint(100000, 999999))
-        self.users.update_one(
-            {"user_id": user_id},
-            {"$push":
-                {"solutions": {
-                    "solution_id": solution_id,
-                    "task_id": task_id,
-                    "solution_code": solution_code,
-                    "score": score,
-                    "log": log
-                }
-                }
-            }
-        )
-        logger.info(f"Added solution for user: {user_id}, task: {task_id}")
-        return solution_id
-
-    def add_solved_quiz(self, user_id: int, quiz_id: str, score: int) -> None:
-        self.users.update_one(
+    async def add_solved_quiz(self, user_id: int, quiz_id: str, score: int) -> None:
+        await self.users.update_one(
             {"user_id": user_id},
             {"$push":
                 {"solved_quizzes": {
@@ -0,0 +1,303 @@
+import asyncio
+from functools import lru_cache
+from typing import AsyncIterator, Hashable, Optional
+from datetime import datetime, timezone, timedelta
+from pymongo import ReturnDocument
+from pymongo.collection import Collection
+from config import Config
+from database.base_db import BaseDB
+from database.ids import new_id
+from logging_config import setup_logging
+from models.database_models import GradingJobModel
+
+logger = setup_logging()
+
+# Maximum number of progress events fetched per poll
+EVENTS_BATCH = 100
+
+
+# Raised to the submitter when a worker could not grade the job
+class GradingJobError(Exception):
+    pass
+
+
+# GradingBroker is the queue between the bot, which enqueues submissions, and the grading workers.
+class GradingBroker:
+    async def enqueue(self, source: bytes, test_cases: list[dict], user_id: Optional[Hashable] = None,
+                      max_failures: Optional[int] = None, kind: str = "grade") -> str:
+        """
+        Put a submission into the grading queue.
+        :param max_failures: Grading policy, see stream_c_task_in_sandbox.
+        :param kind: "grade" checks the outputs against the test cases (result of stream_c_task_in_sandbox),
+                     "run" only runs the program on their inputs (result of run_c_program),
+                     e.g. a reference solution.
+        :return: Job id to wait on.
+        """
+        raise NotImplementedError
+
+    async def claim(self, worker_id: str) -> Optional[GradingJobModel]:
+        """
+        Take the oldest queued job, waiting up to GRADING_POLL_INTERVAL seconds for one to appear.
+        :return: Claimed job or None if the queue is empty.
+        """
+        raise NotImplementedError
+
+    async def cancel(self, job_id: str) -> None:
+        """
+        Withdraw a job nobody waits for anymore. A job already being graded finishes, its result is unused.
+        """
+        raise NotImplementedError
+
+    async def renew(self, job: GradingJobModel) -> bool:
+        """
+        Extend the lease of a claimed job by GRADING_JOB_LEASE seconds.
+        :return: False if the job was handed to another worker meanwhile.
+        """
+        raise NotImplementedError
+
+    async def publish(self, job: GradingJobModel, event: dict) -> None:
+        """
+        Post a progress event (e.g. a finished test) of a running job.
+        Like complete and fail, it is ignored once the job was handed to another worker.
+        """
+        raise NotImplementedError
+
+    async def complete(self, job: GradingJobModel, result: dict) -> None:
+        raise NotImplementedError
+
+    async def fail(self, job: GradingJobModel, error: str) -> None:
+        raise NotImplementedError
+
+    def events(self, job_id: str, timeout: float = Config.GRADING_JOB_TIMEOUT) -> AsyncIterator[dict]:
+        """
+        Stream the progress events of a job, ending with {"type": "result", "result": {...}}.
+        {"type": "restart"} means the job was handed to another worker and its tests are reported again.
+        :raises GradingJobError: If the job failed.
+        :raises asyncio.TimeoutError: If the job did not finish in time.
+        """
+        raise NotImplementedError
+
+    async def wait_result(self, job_id: str, timeout: float = Config.GRADING_JOB_TIMEOUT) -> dict:
+        """
+        Wait until a worker posts the result of the job.
+        """
+        async for event in self.events(job_id, timeout):
+            if event["type"] == "result":
+                return event["result"]
+        raise GradingJobError(f"Grading job {job_id} finished without a result")
+
+
+# LocalBroker keeps the queue in process memory; used for tests and single-process deployments.
+class LocalBroker(GradingBroker):
+    def __init__(self):
+        self._queue: asyncio.Queue[str] = asyncio.Queue()
+        self._jobs: dict[str, GradingJobModel] = {}
+        self._events: dict[str, asyncio.Queue[dict]] = {}
+
+    async def enqueue(self, source: bytes, test_cases: list[dict], user_id: Optional[Hashable] = None,
+                      max_failures: Optional[int] = None, kind: str = "grade") -> str:
+        job = GradingJobModel(job_id=new_id(), kind=kind, user_id=user_id, source=source, test_cases=test_cases,
+                              max_failures=max_failures)
+        self._jobs[job.job_id] = job
+        self._events[job.job_id] = asyncio.Queue()
+        await self._queue.put(job.job_id)
+        return job.job_id
+
+    async def claim(self, worker_id: str) -> Optional[GradingJobModel]:
+        while True:
+            try:
+                job_id = await asyncio.wait_for(self._queue.get(), timeout=Config.GRADING_POLL_INTERVAL)
+            except asyncio.TimeoutError:
+                return None
+            job = self._jobs.get(job_id)
+            # Jobs are forgotten once their submitter stops waiting
+            if job is not None:
+                break
+        job.status = "running"
+        job.worker_id = worker_id
+        job.attempts += 1
+        job.claimed_at = datetime.now(timezone.utc)
+        return job
+
+    async def cancel(self, job_id: str) -> None:
+        self._jobs.pop(job_id, None)
+        self._events.pop(job_id, None)
+
+    def _holds(self, job: GradingJobModel) -> bool:
+        current = self._jobs.get(job.job_id)
+        return current is not None and current.status == "running" and current.attempts == job.attempts
+
+    async def renew(self, job: GradingJobModel) -> bool:
+        # Jobs of a single process are never handed over
+        return self._holds(job)
+
+    async def publish(self, job: GradingJobModel, event: dict) -> None:
+        if self._holds(job):
+            self._events[job.job_id].put_nowait(event)
+
+    async def complete(self, job: GradingJobModel, result: dict) -> None:
+        if self._holds(job):
+            self._jobs[job.job_id].status = "done"
+            self._jobs[job.job_id].result = result
+            self._events[job.job_id].put_nowait({"type": "result", "result": result})
+
+    async def fail(self, job: GradingJobModel, error: str) -> None:
+        if self._holds(job):
+            self._jobs[job.job_id].status = "failed"
+            self._jobs[job.job_id].error = error
+            self._events[job.job_id].put_nowait({"type": "error", "error": error})
+
+    async def events(self, job_id: str, timeout: float = Config.GRADING_JOB_TIMEOUT) -> AsyncIterator[dict]:
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout
+        try:
+            while True:
+                event = await asyncio.wait_for(self._events[job_id].get(), timeout=max(0.0, deadline - loop.time()))
+                if event["type"] == "error":
+                    raise GradingJobError(event["error"])
+                yield event
+                if event["type"] == "result":
+                    return
+        finally:
+            self._jobs.pop(job_id, None)
+            self._events.pop(job_id, None)
+
+
+# MongoBroker stores jobs in the grading_jobs collection so workers on other hosts can consume them.
+# A worker renews the lease of its job while grading; jobs whose worker went silent for GRADING_JOB_LEASE seconds
+# are handed to another worker. Every claim increments `attempts`, and the writes of a worker are filtered on
+# the attempt it claimed, so a worker that lost its job cannot overwrite the progress or result of the next one.
+# Finished jobs are removed GRADING_JOB_RETENTION seconds after finished_at by a TTL index.
+class MongoBroker(BaseDB, GradingBroker):
+    def __init__(self):
+        super().__init__()
+        self.jobs: Collection = self.db['grading_jobs']
+
+    async def enqueue(self, source: bytes, test_cases: list[dict], user_id: Optional[Hashable] = None,
+                      max_failures: Optional[int] = None, kind: str = "grade") -> str:
+        job = GradingJobModel(job_id=new_id(), kind=kind, user_id=user_id, source=source, test_cases=test_cases,
+                              max_failures=max_failures)
+        await asyncio.to_thread(self.jobs.insert_one, job.model_dump(by_alias=True))
+        logger.info(f"Enqueued grading job: {job.job_id}")
+        return job.job_id
+
+    async def claim(self, worker_id: str) -> Optional[GradingJobModel]:
+        doc = await asyncio.to_thread(self._claim, worker_id)
+        if doc is None:
+            await asyncio.sleep(Config.GRADING_POLL_INTERVAL)
+            return None
+        return GradingJobModel(**doc)
+
+    def _claim(self, worker_id: str) -> Optional[dict]:
+        now = datetime.now(timezone.utc)
+        expired = now - timedelta(seconds=Config.GRADING_JOB_LEASE)
+
+        # Give up on jobs that keep killing their workers
+        self.jobs.update_many(
+            {"status": "running", "claimed_at": {"$lt": expired}, "attempts": {"$gte": Config.GRADING_MAX_ATTEMPTS}},
+            {"$set": {"status": "failed", "error": "Grading job exceeded the maximum number of attempts",
+                      "finished_at": now}}
+        )
+
+        return self.jobs.find_one_and_update(
+            {"$or": [
+                {"status": "queued"},
+                {"status": "running", "claimed_at": {"$lt": expired}}
+            ]},
+            {
+                "$set": {"status": "running", "worker_id": worker_id, "claimed_at": now, "events": []},
+                "$inc": {"attempts": 1}
+            },
+            sort=[("created_at", 1)],
+            return_document=ReturnDocument.AFTER
+        )
+
+    async def cancel(self, job_id: str) -> None:
+        await asyncio.to_thread(
+            self.jobs.update_one,
+            {"job_id": job_id, "status": "queued"},
+            {"$set": {"status": "failed", "error": "Cancelled", "finished_at": datetime.now(timezone.utc)}}
+        )
+
+    @staticmethod
+    def _lease_filter(job: GradingJobModel) -> dict:
+        return {"job_id": job.job_id, "status": "running", "attempts": job.attempts}
+
+    async def _update_leased(self, job: GradingJobModel, update: dict) -> bool:
+        outcome = await asyncio.to_thread(self.jobs.update_one, self._lease_filter(job), update)
+        if outcome.matched_count == 0:
+            logger.warning(f"Ignored a write of worker {job.worker_id} to grading job {job.job_id}: "
+                           f"attempt {job.attempts} no longer holds the job")
+            return False
+        return True
+
+    async def renew(self, job: GradingJobModel) -> bool:
+        outcome = await asyncio.to_thread(
+            self.jobs.update_one,
+            self._lease_filter(job),
+            {"$set": {"claimed_at": datetime.now(timezone.utc)}}
+        )
+        return outcome.matched_count == 1
+
+    async def publish(self, job: GradingJobModel, event: dict) -> None:
+        await self._update_leased(job, {"$push": {"events": event}})
+
+    async def complete(self, job: GradingJobModel, result: dict) -> None:
+        if await self._update_leased(job, {
+            "$set": {"status": "done", "result": result, "finished_at": datetime.now(timezone.utc)},
+            "$unset": {"source": ""}
+        }):
+            logger.info(f"Completed grading job: {job.job_id}")
+
+    async def fail(self, job: GradingJobModel, error: str) -> None:
+        if await self._update_leased(job, {
+            "$set": {"status": "failed", "error": error, "finished_at": datetime.now(timezone.utc)}
+        }):
+            logger.error(f"Grading job {job.job_id} failed: {error}")
+
+    async def events(self, job_id: str, timeout: float = Config.GRADING_JOB_TIMEOUT) -> AsyncIterator[dict]:
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout
+        seen = 0
+        attempt = None
+        while True:
+            doc = await asyncio.to_thread(
+                self.jobs.find_one,
+                {"job_id": job_id},
+                {"status": 1, "result": 1, "error": 1, "attempts": 1, "events": {"$slice": [seen, EVENTS_BATCH]}}
+            )
+            if doc is None:
+                raise GradingJobError(f"Grading job {job_id} not found")
+
+            if doc["attempts"] != attempt:
+                if seen:
+                    # Another worker took over and started the events from scratch: read them again
+                    seen = 0
+                    attempt = doc["attempts"]
+                    yield {"type": "restart"}
+                    continue
+                attempt = doc["attempts"]
+
+            new_events = doc.get("events", [])
+            seen += len(new_events)
+            for event in new_events:
+                yield event
+            if len(new_events) == EVENTS_BATCH:
+                continue
+
+            if doc["status"] == "done":
+                yield {"type": "result", "result": doc["result"]}
+                return
+            if doc["status"] == "failed":
+                raise GradingJobError(doc.get("error"))
+            if loop.time() >= deadline:
+                raise asyncio.TimeoutError(f"Grading job {job_id} timed out")
+            await asyncio.sleep(Config.GRADING_POLL_INTERVAL)
+
+
+# Singleton broker selected by GRADING_BROKER
+@lru_cache(maxsize=1)
+def get_broker() -> GradingBroker:
+    if Config.GRADING_BROKER == "local":
+        return LocalBroker()
+    return MongoBroker()
@@ -0,0 +1,118 @@
+import os
+import socket
+import asyncio
+import argparse
+from config import Config
+from logging_config import setup_logging
+from compiler.backends import get_sandbox_backend
+from compiler.compiler import run_c_program, stream_c_task_in_sandbox
+from database.client import close_clients
+from grading.broker import GradingBroker, get_broker
+from models.database_models import GradingJobModel
+
+logger = setup_logging()
+
+
+async def process_job(broker: GradingBroker, worker_id: str) -> None:
+    job = await broker.claim(worker_id)
+    if job is None:
+        return
+
+    logger.info(f"Worker {worker_id} grading job {job.job_id} (attempt {job.attempts})")
+    grading = asyncio.create_task(_grade(broker, job))
+    lease = asyncio.create_task(_hold_lease(broker, job, grading))
+    try:
+        await grading
+    except asyncio.CancelledError:
+        # _hold_lease only returns once the job was handed to another worker
+        if lease.done() and not lease.cancelled():
+            logger.warning(f"Worker {worker_id} lost the lease of job {job.job_id}, grading stopped")
+            return
+        raise
+    finally:
+        lease.cancel()
+
+
+async def _grade(broker: GradingBroker, job: GradingJobModel) -> None:
+    result = None
+    try:
+        if job.kind == "run":
+            result = await run_c_program(
+                source=job.source,
+                inputs=[str(t.get("input", "")) for t in job.test_cases],
+                user_id=job.user_id
+            )
+        else:
+            async for event in stream_c_task_in_sandbox(
+                    source=job.source,
+                    test_cases=job.test_cases,
+                    user_id=job.user_id,
+                    max_failures=job.max_failures
+            ):
+                if event["type"] == "result":
+                    result = event["result"]
+                else:
+                    await broker.publish(job, event)
+    except Exception as e:
+        logger.error(f"Error while grading job {job.job_id}: {e}")
+        await broker.fail(job, str(e))
+        return
+
+    await broker.complete(job, result)
+
+
+async def _hold_lease(broker: GradingBroker, job: GradingJobModel, grading: asyncio.Task) -> None:
+    """
+    Renew the lease of the job while it is graded, waiting for scheduler slots included,
+    and stop the grading once the job was handed to another worker.
+    """
+    while True:
+        await asyncio.sleep(Config.GRADING_JOB_LEASE / 3)
+        try:
+            if await broker.renew(job):
+                continue
+        except Exception as e:
+            # A missed renewal is retried; the lease only expires after GRADING_JOB_LEASE
+            logger.error(f"Failed to renew the lease of job {job.job_id}: {e}")
+            continue
+        grading.cancel()
+        return
+
+
+async def worker_loop(broker: GradingBroker, worker_id: str) -> None:
+    while True:
+        try:
+            await process_job(broker, worker_id)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            # Broker hiccups must not kill the worker
+            logger.error(f"Worker {worker_id} failed to process a job: {e}")
+            await asyncio.sleep(Config.GRADING_POLL_INTERVAL)
+
+
+async def run_workers(broker: GradingBroker, concurrency: int = Config.GRADING_WORKER_CONCURRENCY) -> None:
+    """
+    Consume grading jobs with `concurrency` parallel loops until cancelled.
+    """
+    prefix = f"{socket.gethostname()}-{os.getpid()}"
+    await asyncio.gather(*(worker_loop(broker, f"{prefix}-{i}") for i in range(concurrency)))
+
+
+# Entry point of a standalone grading worker process: python -m grading.worker
+async def main(concurrency: int) -> None:
+    backend = get_sandbox_backend()
+    await backend.start()
+    try:
+        logger.info(f"Grading worker started with concurrency {concurrency} ({Config.SANDBOX_BACKEND} sandbox)")
+        await run_workers(get_broker(), concurrency)
+    finally:
+        await backend.close()
+        close_clients()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="CLearn grading worker")
+    parser.add_argument("--concurrency", type=int, default=Config.GRADING_WORKER_CONCURRENCY)
+    args = parser.parse_args()
+    asyncio.run(main(args.concurrency))
@@ -0,0 +1,182 @@
+import re
+import asyncio
+from functools import lru_cache
+from typing import Optional
+from config import Config
+from logging_config import setup_logging
+from database.quiz_db import QuizDB
+from database.ids import new_id
+from models.database_models import QuizModel
+from agents.quiz_generator.agent_instance import blitz, mini, full
+
+logger = setup_logging()
+
+# Quiz generators by quiz type
+QUIZ_GENERATORS = {
+    "blitz": blitz,
+    "mini": mini,
+    "full": full
+}
+
+# Questions whose word sets overlap at least this much (Jaccard index) are considered the same question
+QUESTION_SIMILARITY = 0.8
+
+# A generated quiz is discarded if fewer of its questions are new to the pool
+MIN_UNIQUE_SHARE = 0.8
+
+_WORD = re.compile(r"\w+")
+
+
+def _words(text: str) -> frozenset[str]:
+    return frozenset(_WORD.findall(text.lower()))
+
+
+def _similar(a: frozenset[str], b: frozenset[str]) -> bool:
+    if not a or not b:
+        return a == b
+    return len(a & b) / len(a | b) >= QUESTION_SIMILARITY
+
+
+def unique_questions(questions: list[dict], existing: list[str]) -> list[dict]:
+    """
+    Drop questions that are near-identical to an existing one or to an earlier question of the list.
+    """
+    seen = [_words(text) for text in existing]
+    unique = []
+    for question in questions:
+        words = _words(question.get("question_text", ""))
+        if any(_similar(words, other) for other in seen):
+            continue
+        seen.append(words)
+        unique.append(question)
+    return unique
+
+
+async def generate_quiz(topic_id: str, quiz_type: str) -> QuizModel:
+    """
+    Generate a quiz of the type for a topic of Config.C_TOPICS.
+    :raises Exception: If the quiz could not be generated.
+    """
+    generator = QUIZ_GENERATORS.get(quiz_type)
+    if generator is None:
+        raise ValueError(f"Unknown quiz type: {quiz_type}")
+
+    quiz = await generator(topic=Config.C_TOPICS.get(topic_id, "Неизвестная тема"))
+    if not quiz.get("questions"):
+        raise Exception(quiz.get("error") or "Generated quiz has no questions")
+
+    return QuizModel(
+        quiz_id=new_id(),
+        topic=topic_id,
+        type=quiz_type,
+        quiz_title=quiz.get("quiz_title", "Викторина"),
+        questions=quiz.get("questions", [])
+    )
+
+
+# QuizPool keeps pre-generated quizzes in QuizDB for every (topic, quiz type) slot.
+# A slot is refilled up to QUIZ_POOL_SIZE once it drops below QUIZ_POOL_LOW_WATER;
+# QUIZ_POOL_WORKERS background workers generate the quizzes.
+class QuizPool:
+    def __init__(self, db: Optional[QuizDB] = None, size: int = Config.QUIZ_POOL_SIZE,
+                 low_water: int = Config.QUIZ_POOL_LOW_WATER, workers: int = Config.QUIZ_POOL_WORKERS):
+        self.db = db or QuizDB()
+        self.size = size
+        self.low_water = low_water
+        self.workers = workers
+        self._slots: asyncio.Queue[tuple[str, str]] = asyncio.Queue()
+        self._queued: set[tuple[str, str]] = set()
+
+    async def take(self, topic_id: str, quiz_type: str) -> Optional[QuizModel]:
+        """
+        Take a ready quiz of the slot, it will not be served again.
+        :return: Quiz or None if the slot is empty.
+        """
+        quiz = await asyncio.to_thread(self.db.take_pooled_quiz, topic_id, quiz_type)
+        counts = await asyncio.to_thread(self.db.count_pooled, topic_id, quiz_type)
+        if counts.get((topic_id, quiz_type), 0) < self.low_water:
+            self._schedule(topic_id, quiz_type)
+        return quiz
+
+    def _schedule(self, topic_id: str, quiz_type: str) -> None:
+        slot = (topic_id, quiz_type)
+        if slot not in self._queued:
+            self._queued.add(slot)
+            self._slots.put_nowait(slot)
+
+    async def check(self) -> None:
+        """
+        Schedule the refill of every slot below the low-water mark.
+        """
+        counts = await asyncio.to_thread(self.db.count_pooled)
+        for topic_id in Config.C_TOPICS:
+            for quiz_type in QUIZ_GENERATORS:
+                if counts.get((topic_id, quiz_type), 0) < self.low_water:
+                    self._schedule(topic_id, quiz_type)
+
+    async def fill(self, topic_id: str, quiz_type: str) -> int:
+        """
+        Generate quizzes for the slot until it holds `size` of them.
+        Near-duplicate questions of the topic's pooled quizzes are dropped, and so are quizzes with too few new ones.
+        Gives up after 2 * size attempts, so a topic that keeps producing duplicates does not burn LLM calls forever.
+        :return: Number of quizzes added.
+        """
+        added = 0
+        for _ in range(2 * self.size):
+            counts = await asyncio.to_thread(self.db.count_pooled, topic_id, quiz_type)
+            if counts.get((topic_id, quiz_type), 0) >= self.size:
+                break
+            try:
+                quiz = await generate_quiz(topic_id, quiz_type)
+            except Exception as e:
+                logger.error(f"Pool quiz generation failed (topic {topic_id}, type {quiz_type}): {e}")
+                continue
+
+            existing = await asyncio.to_thread(self.db.pooled_questions, topic_id)
+            questions = unique_questions(quiz.questions, existing)
+            if len(questions) < MIN_UNIQUE_SHARE * len(quiz.questions):
+                logger.warning(f"Pool quiz {quiz.quiz_id} repeats {len(quiz.questions) - len(questions)} questions "
+                               f"of topic {topic_id}, discarded")
+                continue
+
+            quiz.questions = questions
+            quiz.pooled = True
+            await asyncio.to_thread(self.db.add_quiz, quiz)
+            added += 1
+        logger.info(f"Quiz pool slot (topic {topic_id}, type {quiz_type}) refilled with {added} quizzes")
+        return added
+
+    async def _worker(self) -> None:
+        while True:
+            slot = await self._slots.get()
+            try:
+                await self.fill(*slot)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                # Database hiccups must not kill the worker
+                logger.error(f"Quiz pool refill of {slot} failed: {e}")
+            finally:
+                self._queued.discard(slot)
+
+    async def run(self, interval: float = Config.QUIZ_POOL_CHECK_INTERVAL) -> None:
+        """
+        Run the generation workers and check all slots every `interval` seconds, until cancelled.
+        """
+        workers = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+        try:
+            while True:
+                try:
+                    await self.check()
+                except Exception as e:
+                    logger.error(f"Quiz pool check failed: {e}")
+                await asyncio.sleep(interval)
+        finally:
+            for worker in workers:
+                worker.cancel()
+
+
+# Singleton pool shared by the bot handlers and the refill workers
+@lru_cache(maxsize=1)
+def get_quiz_pool() -> QuizPool:
+    return QuizPool()
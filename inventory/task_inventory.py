@@ -0,0 +1,119 @@
+import asyncio
+from functools import lru_cache
+from typing import Optional
+from config import Config
+from logging_config import setup_logging
+from database.inventory_db import TaskInventoryDB
+from database.ids import new_id
+from models.database_models import TaskModel
+from compiler.validation import validate_test_cases
+from agents.task_generator.agent_instance import generate_task_full
+
+logger = setup_logging()
+
+
+async def generate_task(topic_id: str, difficulty: int) -> TaskModel:
+    """
+    Generate a task and check its test cases against the reference solution.
+    :raises Exception: If the task could not be generated.
+    """
+    task = await generate_task_full(topic_id=topic_id, difficulty=difficulty)
+    if not task.get("success"):
+        raise Exception(task.get("error", "Unknown error during task generation"))
+
+    # Run the reference solution on the generated inputs to catch wrong expected outputs
+    validation = await validate_test_cases(
+        solution_code=task.get("solution_code", ""),
+        test_cases=task.get("test_cases", [])
+    )
+
+    return TaskModel(
+        task_id=new_id(),
+        topic_id=topic_id,
+        difficulty=difficulty,
+        task_text=task.get("task_text", ""),
+        test_cases=validation.test_cases,
+        solution_code=task.get("solution_code", ""),
+        tests_verified=validation.verified
+    )
+
+
+# TaskInventory serves pre-generated tasks and keeps TASK_INVENTORY_SIZE validated tasks
+# for every (topic, difficulty) slot of Config.C_TOPICS x Config.TASK_DIFFICULTIES.
+class TaskInventory:
+    def __init__(self, db: Optional[TaskInventoryDB] = None, size: int = Config.TASK_INVENTORY_SIZE,
+                 concurrency: int = Config.TASK_INVENTORY_CONCURRENCY):
+        self.db = db or TaskInventoryDB()
+        self.size = size
+        self.concurrency = concurrency
+        self._drained = asyncio.Event()
+
+    async def take(self, topic_id: str, difficulty: int) -> Optional[TaskModel]:
+        """
+        Take a ready task of the slot, it will not be served again.
+        :return: Task or None if the slot is empty.
+        """
+        task = await asyncio.to_thread(self.db.take_task, topic_id, int(difficulty))
+        # Wake the refiller up to replace the task
+        self._drained.set()
+        return task
+
+    async def refill(self) -> int:
+        """
+        Generate the tasks missing in every slot, `concurrency` at a time.
+        Tasks whose test cases could not be verified are not stored.
+        :return: Number of tasks added.
+        """
+        counts = await asyncio.to_thread(self.db.count_tasks)
+        missing = [
+            (topic_id, int(difficulty))
+            for topic_id in Config.C_TOPICS
+            for difficulty in Config.TASK_DIFFICULTIES
+            for _ in range(self.size - counts.get((topic_id, int(difficulty)), 0))
+        ]
+        if not missing:
+            return 0
+
+        logger.info(f"Refilling the task inventory with {len(missing)} tasks")
+        semaphore = asyncio.Semaphore(self.concurrency)
+
+        async def add(topic_id: str, difficulty: int) -> bool:
+            async with semaphore:
+                try:
+                    task = await generate_task(topic_id, difficulty)
+                except Exception as e:
+                    logger.error(f"Inventory task generation failed (topic {topic_id}, difficulty {difficulty}): {e}")
+                    return False
+            if not task.tests_verified:
+                logger.warning(f"Inventory task {task.task_id} has unverified test cases, discarded")
+                return False
+            await asyncio.to_thread(self.db.add_task, task)
+            return True
+
+        added = sum(await asyncio.gather(*(add(topic_id, difficulty) for topic_id, difficulty in missing)))
+        logger.info(f"Task inventory refilled: {added}/{len(missing)} tasks added")
+        return added
+
+    async def run(self, interval: float = Config.TASK_INVENTORY_REFILL_INTERVAL) -> None:
+        """
+        Refill the inventory every `interval` seconds, or as soon as a task is taken, until cancelled.
+        """
+        while True:
+            self._drained.clear()
+            try:
+                await self.refill()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                # Database hiccups must not kill the refiller
+                logger.error(f"Task inventory refill failed: {e}")
+            try:
+                await asyncio.wait_for(self._drained.wait(), timeout=interval)
+            except asyncio.TimeoutError:
+                pass
+
+
+# Singleton inventory shared by the bot handlers and the refiller
+@lru_cache(maxsize=1)
+def get_task_inventory() -> TaskInventory:
+    return TaskInventory()
@@ -3,6 +3,15 @@ import asyncio
 from telebot.types import BotCommand
 from logging_config import setup_logging
 from bot.bot import bot, register_handlers
+from config import Config
+from agents.executor import agent_executor
+from compiler.backends import get_sandbox_backend
+from database.client import close_async_clients, close_clients
+from database.migrations import run_migrations
+from grading.broker import get_broker
+from grading.worker import run_workers
+from inventory.task_inventory import get_task_inventory
+from inventory.quiz_pool import get_quiz_pool
 from telebot.async_telebot import asyncio_filters
 
 
@@ -28,10 +37,41 @@ async def main():
         ]
     )
 
+    # Collections are queried by id, create the indexes before serving users
+    if Config.MONGO_MIGRATE_ON_STARTUP:
+        await asyncio.to_thread(run_migrations)
+
+    # With the local broker submissions, reference runs and solution checks are graded inside the bot process,
+    # which then needs a sandbox; otherwise standalone workers (python -m grading.worker) consume the queue
+    workers = None
+    if Config.GRADING_BROKER == "local":
+        await get_sandbox_backend().start()
+        workers = asyncio.create_task(run_workers(get_broker()))
+
+    # Keep pre-generated tasks ready so users do not wait for generation
+    refiller = None
+    if Config.TASK_INVENTORY_SIZE > 0:
+        refiller = asyncio.create_task(get_task_inventory().run())
+    quiz_pool = None
+    if Config.QUIZ_POOL_SIZE > 0:
+        quiz_pool = asyncio.create_task(get_quiz_pool().run())
+
     # Start bot polling
     logger.info("Starting the bot...")
     logger.info(f"Bot started as @{bot_info.username}")
-    await bot.infinity_polling()
+    try:
+        await bot.infinity_polling()
+    finally:
+        if workers:
+            workers.cancel()
+            await get_sandbox_backend().close()
+        if refiller:
+            refiller.cancel()
+        if quiz_pool:
+            quiz_pool.cancel()
+        agent_executor.shutdown(wait=False, cancel_futures=True)
+        close_clients()
+        await close_async_clients()
 
 
 # Run the main function if this script is executed
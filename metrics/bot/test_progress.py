@@ -0,0 +1,68 @@
+import asyncio
+from bot.progress import ProgressMessage
+
+# python -m pytest metrics/bot
+
+INTERVAL_MS = 50
+
+
+# FakeBot records the texts of edit_message_text in the order the edits complete;
+# edits of texts in `slow` wait until `release` is set
+class FakeBot:
+    def __init__(self, slow: tuple[str, ...] = ()):
+        self.edits: list[str] = []
+        self.slow = slow
+        self.release = asyncio.Event()
+        self.started: list[str] = []
+
+    async def edit_message_text(self, chat_id: int, message_id: int, text: str, reply_markup=None) -> None:
+        self.started.append(text)
+        if text in self.slow:
+            await self.release.wait()
+        self.edits.append(text)
+
+
+def test_updates_are_throttled_and_coalesced():
+    async def run():
+        bot = FakeBot()
+        progress = ProgressMessage(bot, 1, 1, interval_ms=INTERVAL_MS)
+        for text in ("1", "2", "3"):
+            await progress.update(text)
+        await asyncio.sleep(3 * INTERVAL_MS / 1000)
+        return bot.edits
+
+    assert asyncio.run(run()) == ["1", "3"]
+
+
+def test_finish_drops_a_throttled_edit():
+    async def run():
+        bot = FakeBot()
+        progress = ProgressMessage(bot, 1, 1, interval_ms=INTERVAL_MS)
+        await progress.update("1")
+        await progress.update("2")
+        await progress.finish("done")
+        await progress.update("3")
+        await asyncio.sleep(3 * INTERVAL_MS / 1000)
+        return bot.edits
+
+    assert asyncio.run(run()) == ["1", "done"]
+
+
+def test_finish_waits_for_an_edit_in_flight():
+    async def run():
+        bot = FakeBot(slow=("2",))
+        progress = ProgressMessage(bot, 1, 1, interval_ms=INTERVAL_MS)
+        await progress.update("1")
+        await progress.update("2")
+        # The throttled edit of "2" is sent and hangs in Telegram
+        while "2" not in bot.started:
+            await asyncio.sleep(INTERVAL_MS / 1000)
+
+        finish = asyncio.create_task(progress.finish("done"))
+        await asyncio.sleep(INTERVAL_MS / 1000)
+        assert not finish.done()
+        bot.release.set()
+        await finish
+        return bot.edits
+
+    assert asyncio.run(run()) == ["1", "2", "done"]
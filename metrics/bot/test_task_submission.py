@@ -0,0 +1,104 @@
+import asyncio
+from contextlib import asynccontextmanager
+from types import SimpleNamespace
+import bot.handlers.messages.messages.task_messages as task_messages
+from grading.broker import LocalBroker
+
+# python -m pytest metrics/bot
+
+CASES = [{"input": "1", "expected_output": "1"}, {"input": "2", "expected_output": "2"}]
+ERROR_TEXT = "❗ Произошла ошибка при обработке вашего решения. Пожалуйста, попробуйте снова позже."
+
+
+# FakeBot captures the submission handler and records the messages it sends and edits
+class FakeBot:
+    def __init__(self):
+        self.handler = None
+        self.sent: list[str] = []
+        self.edits: list[tuple[int, str]] = []
+
+    def message_handler(self, **kwargs):
+        def register(func):
+            self.handler = func
+            return func
+        return register
+
+    @asynccontextmanager
+    async def retrieve_data(self, chat_id: int, user_id: int):
+        yield {"current_task_id": "task"}
+
+    async def get_file(self, file_id: str):
+        return SimpleNamespace(file_path="solution.c")
+
+    async def download_file(self, file_path: str) -> bytes:
+        return b"int main() { return 0; }"
+
+    async def send_message(self, chat_id: int, text: str, reply_markup=None):
+        self.sent.append(text)
+        return SimpleNamespace(message_id=len(self.sent))
+
+    async def edit_message_text(self, chat_id: int, message_id: int, text: str, reply_markup=None) -> None:
+        self.edits.append((message_id, text))
+
+    async def delete_state(self, chat_id: int, user_id: int) -> None:
+        pass
+
+
+# SilentBroker is a queue nobody grades: events time out, and cancelled jobs are recorded
+class SilentBroker(LocalBroker):
+    def __init__(self):
+        super().__init__()
+        self.cancelled: list[str] = []
+
+    async def cancel(self, job_id: str) -> None:
+        self.cancelled.append(job_id)
+        await super().cancel(job_id)
+
+    def events(self, job_id: str, timeout: float = 0.05):
+        return super().events(job_id, timeout=timeout)
+
+
+def submit(monkeypatch, broker: LocalBroker, grade=None) -> FakeBot:
+    async def get_task(task_id: str):
+        return SimpleNamespace(test_cases=CASES)
+
+    async def get_result(key: str):
+        return None
+
+    async def has_solution(user_id: int, task_id: str) -> bool:
+        return False
+
+    monkeypatch.setattr(task_messages, "broker", broker)
+    monkeypatch.setattr(task_messages.task_db, "get_task", get_task)
+    monkeypatch.setattr(task_messages.result_db, "get_result", get_result)
+    monkeypatch.setattr(task_messages.solution_db, "has_solution", has_solution)
+
+    async def run() -> FakeBot:
+        bot = FakeBot()
+        await task_messages.messages_handler(bot)
+        message = SimpleNamespace(content_type="document", chat=SimpleNamespace(id=1),
+                                  document=SimpleNamespace(file_name="solution.c", file_id="file"))
+        worker = asyncio.create_task(grade(broker)) if grade else None
+        await bot.handler(message)
+        if worker:
+            await worker
+        return bot
+
+    return asyncio.run(run())
+
+
+def test_timed_out_job_is_cancelled_and_the_progress_shows_the_error(monkeypatch):
+    broker = SilentBroker()
+    bot = submit(monkeypatch, broker)
+    assert len(broker.cancelled) == 1
+    assert bot.edits[-1] == (1, ERROR_TEXT)
+    assert ERROR_TEXT not in bot.sent
+
+
+def test_failed_job_replaces_the_progress_with_the_error(monkeypatch):
+    async def fail(broker: LocalBroker) -> None:
+        await broker.fail(await broker.claim("w"), "sandbox down")
+
+    bot = submit(monkeypatch, LocalBroker(), grade=fail)
+    assert bot.edits[-1] == (1, ERROR_TEXT)
+    assert bot.sent == ["⏳ Решение отправлено на проверку, пожалуйста подождите..."]
@@ -0,0 +1,112 @@
+import re
+import time
+import asyncio
+import argparse
+import statistics
+from pathlib import Path
+from compiler.compiler import BUILD_PROFILES, COMPILE_TIMEOUT, build_flags
+from compiler.backends import SandboxBackend, get_sandbox_backend
+
+# Compile latency of every build profile over the sample tasks of the task generator:
+# python -m metrics.compiler.bench_compile_profiles [--repeat 3]
+# The sample tasks come without solutions, so each one is compiled as a program that reads the example
+# input and uses the headers typical for the task's topic; the header parsing is what the profiles differ in.
+
+TASKS_PATH = Path(__file__).resolve().parents[2] / "agents" / "task_generator" / "c_knowledge_data" / "Tasks_examples.md"
+
+# Headers students usually include for each topic of Tasks_examples.md
+TOPIC_HEADERS = {
+    1: ["stdio.h"],
+    2: ["stdio.h"],
+    3: ["stdio.h"],
+    4: ["stdio.h", "string.h"],
+    5: ["stdio.h", "math.h"],
+    6: ["stdio.h", "stdlib.h"],
+    7: ["stdio.h", "stdlib.h", "string.h"],
+    8: ["stdio.h", "stdlib.h", "string.h"],
+    9: ["stdio.h", "stdlib.h", "string.h"],
+    10: ["stdio.h", "stdlib.h", "string.h", "math.h"]
+}
+
+PROGRAM = """{includes}
+
+/* {title} */
+int main(void) {{
+    char token[256];
+    long total = 0;
+    while (scanf("%255s", token) == 1) {{
+        total += (long) strlen(token);
+    }}
+    printf("%ld\\n", total);
+    return 0;
+}}
+"""
+
+_TASK = re.compile(r"^#### (\d+)\.(\d+)\.(\d+) — (.+)$", re.MULTILINE)
+
+
+def load_sample_sources() -> list[tuple[str, bytes]]:
+    """
+    Build one C program per sample task of Tasks_examples.md.
+    :return: Task ids with program sources.
+    """
+    sources = []
+    for match in _TASK.finditer(TASKS_PATH.read_text(encoding="utf-8")):
+        topic, title = int(match.group(1)), match.group(4)
+        headers = TOPIC_HEADERS.get(topic, ["stdio.h"])
+        # strlen is used by every program
+        if "string.h" not in headers:
+            headers = [*headers, "string.h"]
+        includes = "\n".join(f"#include <{header}>" for header in headers)
+        task_id = ".".join(match.group(i) for i in (1, 2, 3))
+        sources.append((task_id, PROGRAM.format(includes=includes, title=title.replace("*/", "")).encode()))
+    return sources
+
+
+async def measure_profile(backend: SandboxBackend, profile: str, sources: list[tuple[str, bytes]],
+                          repeat: int) -> list[float]:
+    """
+    Compile every source `repeat` times with the profile, bypassing the compile cache.
+    :return: Compile latencies in seconds.
+    """
+    latencies = []
+    async with backend.workspace(f"bench-{profile}") as workspace:
+        for task_id, source in sources:
+            await workspace.write("main.c", source)
+            flags = build_flags(backend, source, profile)
+            for _ in range(repeat):
+                started = time.perf_counter()
+                rc, _, stderr = await workspace.exec("gcc", *flags, timeout=COMPILE_TIMEOUT)
+                latencies.append(time.perf_counter() - started)
+                if rc != 0:
+                    raise RuntimeError(f"Task {task_id} failed to compile with the {profile} profile: "
+                                       f"{stderr.decode(errors='replace')}")
+    return latencies
+
+
+async def main(repeat: int) -> None:
+    sources = load_sample_sources()
+    backend = get_sandbox_backend()
+    await backend.start()
+    try:
+        results = {profile: await measure_profile(backend, profile, sources, repeat) for profile in BUILD_PROFILES}
+    finally:
+        await backend.close()
+
+    print(f"{len(sources)} sample tasks, {repeat} compilations each, {type(backend).__name__}")
+    print(f"{'profile':<10}{'mean, ms':>10}{'median, ms':>12}{'p95, ms':>10}")
+    for profile, latencies in results.items():
+        p95 = statistics.quantiles(latencies, n=20)[-1]
+        print(f"{profile:<10}{statistics.mean(latencies) * 1000:>10.1f}"
+              f"{statistics.median(latencies) * 1000:>12.1f}{p95 * 1000:>10.1f}")
+    baseline = statistics.median(results["default"])
+    for profile, latencies in results.items():
+        if profile != "default":
+            print(f"{profile}: {baseline / statistics.median(latencies):.2f}x faster than default (median)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compile latency of the sandbox build profiles")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+    asyncio.run(main(args.repeat))
@@ -0,0 +1,269 @@
+import shutil
+import asyncio
+import subprocess
+import config
+from typing import Optional
+import pytest
+from config import Config
+from compiler.compiler import RUN_TIMEOUT, STOP_ON_FIRST_FAILURE, TRUNCATION_MARKER, run_c_task_in_sandbox
+from compiler.pool import SandboxPool
+from compiler.backends.docker import DockerBackend
+from compiler.backends.native import NativeBackend, seccomp
+
+# Every sandbox backend must pass this suite: python -m pytest metrics/compiler
+
+SUM_SOURCE = b"""
+#include <stdio.h>
+int main() {
+    int a, b;
+    scanf("%d %d", &a, &b);
+    printf("%d\\n", a + b);
+    return 0;
+}
+"""
+
+SUM_CASES = [
+    {"input": "2 3", "expected_output": "5", "description": "small"},
+    {"input": "-7 7", "expected_output": "0", "description": "negative"},
+    {"input": "100000 200000", "expected_output": "300000", "description": "large"}
+]
+
+WRONG_SOURCE = b"""
+#include <stdio.h>
+int main() { printf("42\\n"); return 0; }
+"""
+
+BROKEN_SOURCE = b"int main() { return }"
+
+LOOP_SOURCE = b"int main() { for (;;) {} }"
+
+ABORT_SOURCE = b"""
+#include <stdlib.h>
+int main() { abort(); }
+"""
+
+MEMORY_SOURCE = b"""
+#include <stdlib.h>
+#include <string.h>
+int main() {
+    size_t size = (size_t) 1 << 30;
+    char *p = malloc(size);
+    if (p == NULL) return 3;
+    memset(p, 1, size);
+    return 0;
+}
+"""
+
+NETWORK_SOURCE = b"""
+#include <stdio.h>
+#include <string.h>
+#include <arpa/inet.h>
+#include <sys/socket.h>
+int main() {
+    int fd = socket(AF_INET, SOCK_STREAM, 0);
+    struct sockaddr_in addr;
+    memset(&addr, 0, sizeof(addr));
+    addr.sin_family = AF_INET;
+    addr.sin_port = htons(53);
+    inet_pton(AF_INET, "1.1.1.1", &addr.sin_addr);
+    printf(fd < 0 || connect(fd, (struct sockaddr *) &addr, sizeof(addr)) < 0 ? "blocked\\n" : "open\\n");
+    return 0;
+}
+"""
+
+SIGNAL_SOURCE = b"""
+#define _GNU_SOURCE
+#include <fcntl.h>
+#include <signal.h>
+#include <stdio.h>
+#include <sys/syscall.h>
+#include <unistd.h>
+#ifndef SYS_pidfd_send_signal
+#define SYS_pidfd_send_signal 424
+#endif
+#ifndef SYS_pidfd_open
+#define SYS_pidfd_open 434
+#endif
+int main() {
+    char proc[64];
+    snprintf(proc, sizeof(proc), "/proc/%d", getppid());
+    int pidfd = syscall(SYS_pidfd_open, getppid(), 0);
+    int procfd = open(proc, O_RDONLY | O_DIRECTORY);
+    int reachable = kill(getppid(), 0) == 0 || kill(-1, 0) == 0 || kill(1, 0) == 0
+        || (pidfd >= 0 && syscall(SYS_pidfd_send_signal, pidfd, 0, NULL, 0) == 0)
+        || (procfd >= 0 && syscall(SYS_pidfd_send_signal, procfd, 0, NULL, 0) == 0);
+    printf(reachable ? "reachable\\n" : "blocked\\n");
+    return 0;
+}
+"""
+
+READ_FILE_SOURCE = b"""
+#include <stdio.h>
+int main() {
+    char path[4096];
+    scanf("%4095s", path);
+    printf(fopen(path, "r") == NULL ? "hidden\\n" : "visible\\n");
+    return 0;
+}
+"""
+
+CHECKERS_SOURCE = b"""
+#include <stdio.h>
+int main() { printf("%.5f\\nb\\na\\n", 3.14159265); return 0; }
+"""
+
+SPAM_SOURCE = b"""
+#include <stdio.h>
+int main() { for (;;) printf("5\\n"); }
+"""
+
+BLANK_SPAM_SOURCE = b"""
+#include <stdio.h>
+int main() { for (;;) printf("  \\n"); }
+"""
+
+MARKER_SOURCE = b"""
+#include <stdio.h>
+#include <unistd.h>
+int main() {
+    if (access("marker", F_OK) == 0) { printf("leak\\n"); return 0; }
+    FILE *f = fopen("marker", "w");
+    if (f == NULL) { printf("readonly\\n"); return 0; }
+    fclose(f);
+    sleep(1);
+    printf("clean\\n");
+    return 0;
+}
+"""
+
+
+def _docker_available() -> bool:
+    if shutil.which("docker") is None:
+        return False
+    return subprocess.run(["docker", "image", "inspect", Config.SANDBOX_IMAGE], capture_output=True).returncode == 0
+
+
+@pytest.fixture(params=["docker", "native"])
+def make_backend(request, tmp_path):
+    if request.param == "docker":
+        if not _docker_available():
+            pytest.skip(f"docker or the {Config.SANDBOX_IMAGE} image is not available")
+        return lambda: DockerBackend(SandboxPool(size=2))
+    if shutil.which("gcc") is None:
+        pytest.skip("gcc is not available")
+    return lambda: NativeBackend(root=str(tmp_path / "sandbox"), use_seccomp=seccomp is not None)
+
+
+def grade(make_backend, *submissions: tuple[bytes, list[dict]], max_failures: Optional[int] = None) -> list[dict]:
+    """
+    Grade the submissions concurrently on a freshly started backend.
+    """
+    async def run() -> list[dict]:
+        backend = make_backend()
+        await backend.start()
+        try:
+            return await asyncio.gather(*(
+                run_c_task_in_sandbox(source, cases, backend=backend, max_failures=max_failures)
+                for source, cases in submissions
+            ))
+        finally:
+            await backend.close()
+
+    return asyncio.run(run())
+
+
+def test_correct_solution_passes(make_backend):
+    [result] = grade(make_backend, (SUM_SOURCE, SUM_CASES))
+    assert result["passed"] == result["total"] == 3
+    assert result["cacheable"]
+    for test in result["tests"]:
+        assert test["status"] == "ok"
+        assert test["cpu_time"] is not None and test["max_rss_kb"] > 0
+
+
+def test_wrong_answer_fails(make_backend):
+    [result] = grade(make_backend, (WRONG_SOURCE, SUM_CASES))
+    assert result["passed"] == 0
+    assert all(test["status"] == "ok" and not test["passed"] for test in result["tests"])
+
+
+def test_early_exit_skips_remaining_tests(make_backend):
+    cases = SUM_CASES * 3
+    [result] = grade(make_backend, (WRONG_SOURCE, cases), max_failures=STOP_ON_FIRST_FAILURE)
+    statuses = [test["status"] for test in result["tests"]]
+    assert result["passed"] == 0
+    assert "skipped" in statuses and statuses.count("ok") < len(cases)
+    assert result["skipped"] == statuses.count("skipped")
+    assert "Пропущен" in result["log"]
+    assert not result["cacheable"]
+
+
+def test_checkers_are_applied_per_case(make_backend):
+    cases = [
+        {"input": "", "expected_output": "3.1416 b a", "checker": "float", "tolerance": 1e-3},
+        {"input": "", "expected_output": "3.14159  b  a", "checker": "tokens"},
+        {"input": "", "expected_output": "a\n3.14159\nb", "checker": "unordered"},
+        {"input": "", "expected_output": "3.1416\nb\na", "checker": "exact"}
+    ]
+    [result] = grade(make_backend, (CHECKERS_SOURCE, cases))
+    assert [test["passed"] for test in result["tests"]] == [True, True, True, False]
+
+
+def test_compile_error_is_reported(make_backend):
+    [result] = grade(make_backend, (BROKEN_SOURCE, SUM_CASES))
+    assert result["log"].startswith("❌ Ошибка компиляции")
+    assert result["passed"] == 0 and result["tests"] == []
+    assert result["cacheable"]
+
+
+def test_infinite_loop_times_out(make_backend):
+    [result] = grade(make_backend, (LOOP_SOURCE, SUM_CASES[:1]))
+    assert result["tests"][0]["status"] == "timeout"
+    assert not result["cacheable"]
+
+
+def test_crash_reports_signal(make_backend):
+    [result] = grade(make_backend, (ABORT_SOURCE, SUM_CASES[:1]))
+    assert result["tests"][0]["status"] == "runtime_error"
+    assert result["tests"][0]["signal"] == "SIGABRT"
+
+
+def test_memory_limit_is_enforced(make_backend):
+    [result] = grade(make_backend, (MEMORY_SOURCE, [{"input": "", "expected_output": ""}]))
+    assert result["tests"][0]["status"] == "runtime_error"
+
+
+def test_diverging_output_is_cut_short(make_backend):
+    [result] = grade(make_backend, (SPAM_SOURCE, SUM_CASES[:1]))
+    test = result["tests"][0]
+    assert test["status"] == "wrong_answer" and not test["passed"]
+    assert test["wall_time"] < RUN_TIMEOUT
+    assert TRUNCATION_MARKER in result["log"]
+
+
+def test_output_limit_is_enforced(make_backend):
+    [result] = grade(make_backend, (BLANK_SPAM_SOURCE, [{"input": "", "expected_output": ""}]))
+    assert result["tests"][0]["status"] == "output_limit"
+    assert result["tests"][0]["wall_time"] < RUN_TIMEOUT
+
+
+def test_network_is_unavailable(make_backend):
+    [result] = grade(make_backend, (NETWORK_SOURCE, [{"input": "", "expected_output": "blocked"}]))
+    assert result["passed"] == 1
+
+
+def test_submission_cannot_signal_other_processes(make_backend):
+    [result] = grade(make_backend, (SIGNAL_SOURCE, [{"input": "", "expected_output": "blocked"}]))
+    assert result["passed"] == 1
+
+
+def test_worker_files_are_hidden(make_backend):
+    case = [{"input": config.__file__, "expected_output": "hidden"}]
+    [result] = grade(make_backend, (READ_FILE_SOURCE, case))
+    assert result["passed"] == 1
+
+
+def test_concurrent_jobs_do_not_share_files(make_backend):
+    case = [{"input": "", "expected_output": "clean"}]
+    results = grade(make_backend, (MARKER_SOURCE, case), (MARKER_SOURCE, case))
+    assert [result["passed"] for result in results] == [1, 1]
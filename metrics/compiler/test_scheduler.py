@@ -0,0 +1,84 @@
+import asyncio
+from compiler.scheduler import GradingScheduler, parse_size
+
+# python -m pytest metrics/compiler/test_scheduler.py
+
+
+async def hold(scheduler: GradingScheduler, user_id, wanted: int, granted: list, release: asyncio.Event) -> None:
+    async with scheduler.slots(user_id, wanted) as slots:
+        granted.append((user_id, slots))
+        await release.wait()
+
+
+async def settle() -> None:
+    for _ in range(5):
+        await asyncio.sleep(0)
+
+
+def test_per_user_cap():
+    async def run():
+        scheduler = GradingScheduler(capacity=8, per_user=2)
+        granted, release = [], asyncio.Event()
+        first = asyncio.create_task(hold(scheduler, 1, 5, granted, release))
+        await settle()
+        # The same user waits for their slots while another user is served right away
+        second = asyncio.create_task(hold(scheduler, 1, 1, granted, asyncio.Event()))
+        other = asyncio.create_task(hold(scheduler, 2, 1, granted, release))
+        await settle()
+        waiting = list(granted)
+        release.set()
+        await asyncio.gather(first, other)
+        await settle()
+        second.cancel()
+        return waiting, granted
+
+    waiting, granted = asyncio.run(run())
+    assert waiting == [(1, 2), (2, 1)]
+    assert granted[-1] == (1, 1)
+
+
+def test_global_capacity():
+    async def run():
+        scheduler = GradingScheduler(capacity=3, per_user=2)
+        granted, release = [], asyncio.Event()
+        tasks = [asyncio.create_task(hold(scheduler, 1, 2, granted, release))]
+        await settle()
+        # Only one slot is left, so the next job gets fewer than it wants and the third waits
+        tasks.append(asyncio.create_task(hold(scheduler, 2, 2, granted, release)))
+        await settle()
+        tasks.append(asyncio.create_task(hold(scheduler, 3, 2, granted, release)))
+        await settle()
+        waiting = list(granted)
+        release.set()
+        await asyncio.gather(*tasks)
+        return waiting, granted, scheduler._free
+
+    waiting, granted, free = asyncio.run(run())
+    assert waiting == [(1, 2), (2, 1)]
+    assert granted[-1] == (3, 2)
+    assert free == 3
+
+
+def test_cancelled_waiter_leaves_no_entry():
+    async def run():
+        scheduler = GradingScheduler(capacity=1, per_user=1)
+        granted, release = [], asyncio.Event()
+        holder = asyncio.create_task(hold(scheduler, 1, 1, granted, release))
+        await settle()
+        waiter = asyncio.create_task(hold(scheduler, 2, 1, granted, release))
+        await settle()
+        waiter.cancel()
+        await settle()
+        release.set()
+        await holder
+        return dict(scheduler._used_by), granted
+
+    used_by, granted = asyncio.run(run())
+    assert used_by == {}
+    assert granted == [(1, 1)]
+
+
+def test_parse_size():
+    assert parse_size("256m") == 256 * 1024 ** 2
+    assert parse_size("1G") == 1024 ** 3
+    assert parse_size("4096") == 4096
@@ -0,0 +1,90 @@
+import asyncio
+from compiler.solution_search import search_solution
+from grading.broker import LocalBroker
+
+# python -m pytest metrics/compiler/test_solution_search.py
+
+CASES = [{"input": "1", "expected_output": "1"}, {"input": "2", "expected_output": "2"}]
+
+
+async def fake_worker(broker: LocalBroker, checked: list[bytes], delay: float = 0.0) -> None:
+    """
+    Grades the queued solution checks: only the source b"good" passes.
+    """
+    while True:
+        job = await broker.claim("w")
+        if job is None:
+            continue
+        checked.append(job.source)
+        await asyncio.sleep(delay)
+        passed = len(job.test_cases) if job.source == b"good" else 0
+        await broker.complete(job, {"passed": passed, "total": len(job.test_cases)})
+
+
+def generator(*codes: str, delays: tuple[float, ...] = (), cancelled: list = None):
+    """
+    Candidate generator returning the codes in turn, each after its delay.
+    """
+    calls = iter(range(len(codes)))
+
+    async def generate() -> dict:
+        i = next(calls)
+        try:
+            await asyncio.sleep(delays[i] if i < len(delays) else 0)
+        except asyncio.CancelledError:
+            if cancelled is not None:
+                cancelled.append(codes[i])
+            raise
+        return {"success": True, "solution_code": codes[i]}
+    return generate
+
+
+def search(generate, solution_code=None, timeout: float = 5, worker_delay: float = 0.0, candidates: int = 2):
+    async def run():
+        broker = LocalBroker()
+        checked = []
+        worker = asyncio.create_task(fake_worker(broker, checked, worker_delay))
+        try:
+            started = asyncio.get_running_loop().time()
+            result = await search_solution(generate, CASES, solution_code=solution_code, candidates=candidates,
+                                           timeout=timeout, broker=broker)
+            return result, checked, asyncio.get_running_loop().time() - started, broker
+        finally:
+            worker.cancel()
+    return asyncio.run(run())
+
+
+def test_passing_stored_solution_skips_generation():
+    result, checked, _, _ = search(generator(), solution_code="good")
+    assert result.verified and result.solution_code == "good" and result.candidates == 0
+    assert checked == [b"good"]
+
+
+def test_first_passing_candidate_wins_and_the_rest_are_cancelled():
+    cancelled = []
+    result, _, _, _ = search(generator("good", "slow", delays=(0, 10), cancelled=cancelled), solution_code="bad")
+    assert result.verified and result.solution_code == "good"
+    assert cancelled == ["slow"]
+
+
+def test_failing_candidates_keep_the_stored_solution():
+    result, checked, _, _ = search(generator("bad1", "bad2"), solution_code="bad")
+    assert not result.verified and result.solution_code == "bad"
+    assert sorted(checked) == [b"bad", b"bad1", b"bad2"]
+
+
+def test_search_gives_up_at_the_deadline():
+    cancelled = []
+    result, _, elapsed, _ = search(generator("a", "b", delays=(10, 10), cancelled=cancelled), solution_code="bad",
+                                   timeout=0.5)
+    assert not result.verified and result.solution_code == "bad"
+    assert elapsed < 2
+    assert sorted(cancelled) == ["a", "b"]
+
+
+def test_slow_stored_check_is_withdrawn_at_the_deadline():
+    # The worker takes longer than the whole search, so the check of the stored solution is abandoned
+    result, _, elapsed, broker = search(generator(), solution_code="good", timeout=0.3, worker_delay=2)
+    assert not result.verified and result.solution_code == "good"
+    assert elapsed < 1.5
+    assert broker._jobs == {}
@@ -0,0 +1,83 @@
+import asyncio
+from compiler.validation import VALIDATION_USER, reconcile_with_reference, validate_test_cases
+from grading.broker import LocalBroker
+
+# python -m pytest metrics/compiler/test_validation.py
+
+
+def case(input_: str, expected: str) -> dict:
+    return {"input": input_, "expected_output": expected}
+
+
+def res(stdout: str, status: str = "ok", truncated: bool = False) -> dict:
+    return {"status": status, "stdout": stdout, "stdout_truncated": truncated}
+
+
+def run(*results: dict) -> dict:
+    return {"compiled": True, "log": "", "results": list(results)}
+
+
+def test_agreeing_reference_verifies_all_cases():
+    cases = [case(str(i), str(i)) for i in range(5)]
+    result = reconcile_with_reference(cases, run(*(res(f"{i}\n") for i in range(5))))
+    assert result.verified and result.repaired == 0 and result.dropped == []
+    assert all(t["verified"] for t in result.test_cases)
+
+
+def test_near_full_agreement_repairs_a_wrong_expected_output():
+    cases = [case(str(i), str(i)) for i in range(4)] + [case("4", "wrong")]
+    result = reconcile_with_reference(cases, run(*(res(f"{i}\n") for i in range(5))))
+    assert result.verified and result.repaired == 1
+    assert result.test_cases[4]["expected_output"] == "4"
+    assert result.test_cases[4]["generated_output"] == "wrong"
+
+
+def test_partial_agreement_leaves_cases_unchanged():
+    # A reference that is wrong on 2 of 5 cases is not trusted to overwrite them
+    cases = [case(str(i), str(i)) for i in range(5)]
+    outputs = ["0", "1", "2", "x", "y"]
+    result = reconcile_with_reference(cases, run(*(res(output) for output in outputs)))
+    assert not result.verified and result.repaired == 0
+    assert result.test_cases == cases
+
+
+def test_error_path_cases_are_kept_when_the_output_matches():
+    cases = [case("1", "1"), case("2", "2"), case("-1", "invalid input"), case("3", "3"), case("4", "4")]
+    results = [res("1"), res("2"), res("invalid input\n", status="runtime_error"), res("3"), res("4")]
+    result = reconcile_with_reference(cases, run(*results))
+    assert result.verified and result.dropped == []
+    assert result.test_cases[2]["expected_output"] == "invalid input"
+
+
+def test_crashes_and_timeouts_are_dropped_not_repaired():
+    cases = [case(str(i), str(i)) for i in range(5)] + [case("5", "5"), case("6", "6")]
+    results = [res(str(i)) for i in range(5)] + [res("boom", status="runtime_error"), res("", status="timeout")]
+    result = reconcile_with_reference(cases, run(*results))
+    assert result.verified and result.repaired == 0
+    assert result.dropped == [5, 6]
+
+
+def test_unusable_runs_leave_cases_unverified():
+    cases = [case("1", "1")]
+    assert not reconcile_with_reference(cases, {"compiled": False, "log": "error", "results": None}).verified
+    assert not reconcile_with_reference(cases, run(res("1", truncated=True))).verified
+
+
+def test_reference_runs_go_through_the_grading_queue():
+    cases = [case("1", "1"), case("2", "wrong"), case("3", "3"), case("4", "4"), case("5", "5")]
+
+    async def fake_worker(broker: LocalBroker) -> dict:
+        job = await broker.claim("w")
+        await broker.complete(job, run(*(res(t["input"]) for t in job.test_cases)))
+        return job.model_dump()
+
+    async def main():
+        broker = LocalBroker()
+        worker = asyncio.create_task(fake_worker(broker))
+        result = await validate_test_cases("int main() {}", cases, broker=broker)
+        return result, await worker
+
+    result, job = asyncio.run(main())
+    assert job["kind"] == "run" and job["user_id"] == VALIDATION_USER
+    assert job["test_cases"] == [{"input": t["input"]} for t in cases]
+    assert result.verified and result.repaired == 1
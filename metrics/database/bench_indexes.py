@@ -0,0 +1,125 @@
+import time
+import random
+import argparse
+import statistics
+from datetime import datetime, timedelta, timezone
+from pymongo import MongoClient
+from database.client import close_clients, get_client
+from database.migrations import INDEXES
+
+# Latency of the bot's lookups without and with the indexes of database/migrations.py:
+# python -m metrics.database.bench_indexes [--documents 20000] [--queries 300]
+# The collections are seeded into scratch databases (BENCH_PREFIX + name) on MONGO_URI, which are dropped afterwards.
+
+BENCH_PREFIX = "bench_"
+
+
+def seed(client: MongoClient, documents: int) -> None:
+    db = client[BENCH_PREFIX + "clearn_db"]
+    memory = client[BENCH_PREFIX + "coordinator_memory"]
+    now = datetime.now(timezone.utc)
+
+    db.users.insert_many([
+        {
+            "user_id": i,
+            "username": f"user{i}",
+            "solved_quizzes": []
+        }
+        for i in range(documents)
+    ])
+    db.solutions.insert_many([
+        {"solution_id": str(j), "user_id": i, "task_id": str(random.randrange(documents)), "solution_code": "x" * 500,
+         "score": 1, "log": "", "created_at": now + timedelta(seconds=j)}
+        for i in range(documents) for j in range(5)
+    ])
+    db.tasks.insert_many([
+        {"task_id": str(i), "topic_id": str(i % 10 + 1), "difficulty": i % 3 + 1, "task_text": "x" * 500,
+         "test_cases": [], "solution_code": "int main() { return 0; }"}
+        for i in range(documents)
+    ])
+    db.quizzes.insert_many([
+        {"quiz_id": str(i), "topic": str(i % 10 + 1), "type": ("blitz", "mini", "full")[i % 3], "quiz_title": "q",
+         "questions": [], "pooled": i % 50 == 0, "created_at": now - timedelta(seconds=i)}
+        for i in range(documents)
+    ])
+    db.feedbacks.insert_many([
+        {"user_id": i, "message_id": i, "status": "new", "date": now}
+        for i in range(documents)
+    ])
+    memory.sessions.insert_many([
+        {"session_id": f"session{i % (documents // 10 or 1)}", "timestamp": (now + timedelta(seconds=i)).isoformat(),
+         "agent_name": "tutor", "user_input": "q", "agent_output": "a"}
+        for i in range(documents)
+    ])
+
+
+def queries(client: MongoClient, documents: int) -> dict:
+    """
+    The lookups of the bot, each taking a random key.
+    """
+    db = client[BENCH_PREFIX + "clearn_db"]
+    memory = client[BENCH_PREFIX + "coordinator_memory"]
+    key = lambda: random.randrange(documents)
+    return {
+        "users.get_user": lambda: db.users.find_one({"user_id": key()}),
+        "solutions.has_solution": lambda: db.solutions.count_documents(
+            {"user_id": key(), "task_id": str(key())}, limit=1),
+        "solutions.user_page": lambda: list(db.solutions.find(
+            {"user_id": key()}, {"_id": 0, "solution_code": 0, "log": 0}).sort("created_at", -1).limit(20)),
+        "tasks.get_task": lambda: db.tasks.find_one({"task_id": str(key())}),
+        "quizzes.get_quiz": lambda: db.quizzes.find_one({"quiz_id": str(key())}),
+        "quizzes.pooled": lambda: db.quizzes.find_one(
+            {"topic": str(key() % 10 + 1), "type": "blitz", "pooled": True}, sort=[("created_at", 1)]),
+        "feedbacks.get_feedback": lambda: db.feedbacks.find_one({"message_id": key()}),
+        "sessions.recent_context": lambda: list(memory.sessions.find(
+            {"session_id": f"session{key() % (documents // 10 or 1)}"}).sort("timestamp", -1).limit(5))
+    }
+
+
+def measure(client: MongoClient, documents: int, repeat: int) -> dict[str, float]:
+    """
+    :return: Median latency of every query in milliseconds.
+    """
+    latencies = {}
+    for name, query in queries(client, documents).items():
+        samples = []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            query()
+            samples.append(time.perf_counter() - started)
+        latencies[name] = statistics.median(samples) * 1000
+    return latencies
+
+
+def create_indexes(client: MongoClient) -> None:
+    for database, collections in INDEXES.items():
+        for collection, indexes in collections.items():
+            client[BENCH_PREFIX + database][collection].create_indexes(indexes)
+
+
+def main(documents: int, repeat: int) -> None:
+    client = get_client()
+    for database in INDEXES:
+        client.drop_database(BENCH_PREFIX + database)
+    try:
+        seed(client, documents)
+        before = measure(client, documents, repeat)
+        create_indexes(client)
+        after = measure(client, documents, repeat)
+    finally:
+        for database in INDEXES:
+            client.drop_database(BENCH_PREFIX + database)
+        close_clients()
+
+    print(f"{documents} documents per collection, median of {repeat} queries")
+    print(f"{'query':<26}{'no index, ms':>14}{'indexed, ms':>14}{'speedup':>10}")
+    for name in before:
+        print(f"{name:<26}{before[name]:>14.2f}{after[name]:>14.2f}{before[name] / after[name]:>9.1f}x")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Query latency without and with the MongoDB indexes")
+    parser.add_argument("--documents", type=int, default=20000)
+    parser.add_argument("--queries", type=int, default=300)
+    args = parser.parse_args()
+    main(args.documents, args.queries)
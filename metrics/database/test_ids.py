@@ -0,0 +1,34 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+import pytest
+from database.ids import ALPHABET, ID_LENGTH, id_time, new_id
+
+# python -m pytest metrics/database
+
+
+def test_ids_are_unique_and_ordered():
+    ids = [new_id() for _ in range(20000)]
+    assert len(set(ids)) == len(ids)
+    assert ids == sorted(ids)
+
+
+def test_ids_are_unique_across_threads():
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        ids = [id_ for batch in pool.map(lambda _: [new_id() for _ in range(2000)], range(8)) for id_ in batch]
+    assert len(set(ids)) == len(ids)
+
+
+def test_ids_fit_callback_data():
+    id_ = new_id()
+    assert len(id_) == ID_LENGTH
+    assert set(id_) <= set(ALPHABET)
+    assert "_" not in id_
+    assert len(f"quiz_answer_{id_}_99_3_99".encode()) <= 64
+
+
+def test_id_time():
+    before = time.time()
+    id_ = new_id()
+    assert before - 0.001 <= id_time(id_) <= time.time()
+    with pytest.raises(ValueError):
+        id_time("123456")
@@ -0,0 +1,163 @@
+import asyncio
+import pytest
+import grading.worker as worker
+from config import Config
+from grading.broker import GradingJobError, LocalBroker
+
+# python -m pytest metrics/grading
+
+CASES = [{"input": "1", "expected_output": "1"}, {"input": "2", "expected_output": "2"}]
+RESULT = {"log": "ok", "passed": 2, "total": 2, "skipped": 0, "tests": [], "cacheable": True}
+
+
+def fake_grading(delay: float = 0.0, error: Exception = None):
+    """
+    Stand-in for stream_c_task_in_sandbox that reports every test case and then RESULT.
+    """
+    async def stream(source: bytes, test_cases: list[dict], user_id=None, max_failures=None):
+        for index, _ in enumerate(test_cases, start=1):
+            await asyncio.sleep(delay)
+            if error:
+                raise error
+            yield {"type": "test", "test": {"index": index, "passed": True, "status": "ok"}}
+        yield {"type": "result", "result": RESULT}
+    return stream
+
+
+async def collect(broker: LocalBroker, job_id: str, timeout: float = 5) -> list[dict]:
+    return [event async for event in broker.events(job_id, timeout=timeout)]
+
+
+def test_local_broker_streams_events_and_result():
+    async def run():
+        broker = LocalBroker()
+        job_id = await broker.enqueue(b"int main() {}", CASES, user_id=1)
+        job = await broker.claim("w")
+        assert job.job_id == job_id and job.status == "running" and job.attempts == 1
+        await broker.publish(job, {"type": "test", "test": {"index": 1}})
+        await broker.complete(job, RESULT)
+        return await collect(broker, job_id)
+
+    assert asyncio.run(run()) == [{"type": "test", "test": {"index": 1}}, {"type": "result", "result": RESULT}]
+
+
+def test_local_broker_ignores_writes_of_a_stale_attempt():
+    async def run():
+        broker = LocalBroker()
+        job_id = await broker.enqueue(b"", CASES)
+        job = await broker.claim("w")
+        stale = job.model_copy(update={"attempts": job.attempts - 1})
+        assert await broker.renew(job) and not await broker.renew(stale)
+        await broker.publish(stale, {"type": "test", "test": {"index": 1}})
+        await broker.complete(stale, {"log": "stale"})
+        await broker.complete(job, RESULT)
+        return await broker.wait_result(job_id)
+
+    assert asyncio.run(run()) == RESULT
+
+
+def test_local_broker_reports_failures():
+    async def run():
+        broker = LocalBroker()
+        job_id = await broker.enqueue(b"", CASES)
+        await broker.fail(await broker.claim("w"), "boom")
+        await broker.wait_result(job_id)
+
+    with pytest.raises(GradingJobError, match="boom"):
+        asyncio.run(run())
+
+
+def test_worker_grades_a_job(monkeypatch):
+    monkeypatch.setattr(worker, "stream_c_task_in_sandbox", fake_grading())
+
+    async def run():
+        broker = LocalBroker()
+        job_id = await broker.enqueue(b"", CASES)
+        await worker.process_job(broker, "w")
+        return await collect(broker, job_id)
+
+    events = asyncio.run(run())
+    assert [event["type"] for event in events] == ["test", "test", "result"]
+    assert events[-1]["result"] == RESULT
+
+
+def test_worker_fails_a_job_that_cannot_be_graded(monkeypatch):
+    monkeypatch.setattr(worker, "stream_c_task_in_sandbox", fake_grading(error=RuntimeError("sandbox down")))
+
+    async def run():
+        broker = LocalBroker()
+        job_id = await broker.enqueue(b"", CASES)
+        await worker.process_job(broker, "w")
+        await broker.wait_result(job_id, timeout=1)
+
+    with pytest.raises(GradingJobError, match="sandbox down"):
+        asyncio.run(run())
+
+
+def test_worker_renews_the_lease_while_grading(monkeypatch):
+    monkeypatch.setattr(worker, "stream_c_task_in_sandbox", fake_grading(delay=0.1))
+    monkeypatch.setattr(Config, "GRADING_JOB_LEASE", 0.03)
+    renewals = []
+
+    class RenewingBroker(LocalBroker):
+        async def renew(self, job) -> bool:
+            renewals.append(job.job_id)
+            return await super().renew(job)
+
+    async def run():
+        broker = RenewingBroker()
+        job_id = await broker.enqueue(b"", CASES)
+        await worker.process_job(broker, "w")
+        return await broker.wait_result(job_id, timeout=1)
+
+    assert asyncio.run(run()) == RESULT
+    assert len(renewals) >= 2
+
+
+def test_worker_stops_grading_a_job_it_lost(monkeypatch):
+    monkeypatch.setattr(worker, "stream_c_task_in_sandbox", fake_grading(delay=10))
+    monkeypatch.setattr(Config, "GRADING_JOB_LEASE", 0.03)
+
+    # The job is handed to another worker right after the claim
+    class HandedOverBroker(LocalBroker):
+        async def renew(self, job) -> bool:
+            return False
+
+    async def run():
+        broker = HandedOverBroker()
+        job_id = await broker.enqueue(b"", CASES)
+        await asyncio.wait_for(worker.process_job(broker, "w"), timeout=1)
+        return broker._jobs[job_id].status
+
+    assert asyncio.run(run()) == "running"
+
+
+def test_worker_runs_a_reference_job(monkeypatch):
+    runs = []
+
+    async def run_c_program(source: bytes, inputs: list[str], user_id=None):
+        runs.append(inputs)
+        return {"compiled": True, "log": "", "results": []}
+
+    monkeypatch.setattr(worker, "run_c_program", run_c_program)
+
+    async def run():
+        broker = LocalBroker()
+        job_id = await broker.enqueue(b"", CASES, kind="run")
+        await worker.process_job(broker, "w")
+        return await broker.wait_result(job_id, timeout=1)
+
+    assert asyncio.run(run()) == {"compiled": True, "log": "", "results": []}
+    assert runs == [["1", "2"]]
+
+
+def test_local_broker_skips_cancelled_jobs():
+    async def run():
+        broker = LocalBroker()
+        cancelled = await broker.enqueue(b"cancelled", CASES)
+        queued = await broker.enqueue(b"queued", CASES)
+        await broker.cancel(cancelled)
+        job = await broker.claim("w")
+        return job.job_id == queued
+
+    assert asyncio.run(run())
@@ -1,6 +1,6 @@
 from pydantic import BaseModel, Field, field_validator
 from datetime import datetime, timezone
-from typing import Literal, Optional, List, Dict, Any
+from typing import Literal, Optional, List, Dict, Any, Union
 
 
 # Model representing user feedback
@@ -30,7 +30,6 @@ class UserModel(BaseModel):
     user_id: int
     username: str
     register_date: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
-    solutions: List[Dict[str, Any]] = []
     solved_quizzes: List[Dict[str, Any]] = []
 
     @field_validator("register_date", mode="before")
@@ -48,6 +47,17 @@ class UserModel(BaseModel):
         return value
 
 
+# Model representing a submitted solution of a task
+class SolutionModel(BaseModel):
+    solution_id: str
+    user_id: int
+    task_id: str
+    solution_code: str = ""
+    score: Optional[float] = 0  # None if grading stopped early and the remaining tests were skipped
+    log: str = ""
+    created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
+
+
 # Model representing a task
 class TaskModel(BaseModel):
     task_id: str
@@ -56,6 +66,8 @@ class TaskModel(BaseModel):
     task_text: str
     test_cases: List[Dict[str, Any]]
     solution_code: str
+    tests_verified: bool = False
+    solution_verified: bool = False
 
 
 # Model representing a quiz
@@ -65,6 +77,36 @@ class QuizModel(BaseModel):
     type: str
     quiz_title: str
     questions: List[Dict[str, Any]]
+    pooled: bool = False
+    created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
+
+
+# Model representing a memoized grading result
+class GradingResultModel(BaseModel):
+    key: str
+    task_id: str
+    log: str
+    passed: int
+    total: int
+    created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
+
+
+# Model representing a queued grading job
+class GradingJobModel(BaseModel):
+    job_id: str
+    kind: Literal["grade", "run"] = "grade"
+    user_id: Optional[Union[int, str]] = None  # a chat id, or a service key such as VALIDATION_USER
+    source: bytes
+    test_cases: List[Dict[str, Any]]
+    max_failures: Optional[int] = None
+    status: Literal["queued", "running", "done", "failed"] = "queued"
+    result: Optional[Dict[str, Any]] = None
+    error: Optional[str] = None
+    worker_id: Optional[str] = None
+    attempts: int = 0
+    created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
+    claimed_at: Optional[datetime] = None  # start of the current lease, renewed by the worker
+    finished_at: Optional[datetime] = None
 
 
 # Base model for MongoDB documents